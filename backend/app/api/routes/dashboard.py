@@ -2,10 +2,11 @@
 Dashboard API endpoint - Provides comprehensive dashboard summary.
 Combines macro data, sector rankings, recommendations, and portfolio suggestions.
 """
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from app.models.schemas import DashboardSummary
 from app.services import demo_data
-from app.services.recommendation_engine import RecommendationEngine
+from app.services.recommendation_engine import get_recommendation_engine
+from app.services.response_cache import cached_json_response
 from app.config import get_data_source
 import logging
 
@@ -14,7 +15,7 @@ router = APIRouter(prefix="/api/dashboard", tags=["dashboard"])
 
 
 @router.get("", response_model=DashboardSummary)
-async def get_dashboard():
+async def get_dashboard(request: Request):
     """
     Returns complete dashboard summary with all key data.
     
@@ -27,7 +28,7 @@ async def get_dashboard():
     - Suggested portfolio allocation
     - Market regime classification
     """
-    try:
+    async def build_dashboard() -> DashboardSummary:
         # Get all data components
         macro_snapshot = demo_data.get_demo_macro_snapshot()
         sector_analyses = demo_data.get_demo_sector_analyses()
@@ -35,7 +36,7 @@ async def get_dashboard():
         market_regime = demo_data.get_demo_market_regime()
         
         # Get top recommendations
-        rec_engine = RecommendationEngine()
+        rec_engine = await get_recommendation_engine()
         top_recommendations = rec_engine.get_top_opportunities(n=5)
         
         # Get suggested allocation (moderate by default)
@@ -60,6 +61,9 @@ async def get_dashboard():
             market_regime=market_regime,
             data_source=data_source
         )
+    
+    try:
+        return await cached_json_response(request, build_dashboard, DashboardSummary)
         
     except Exception as e:
         logger.error(f"Error generating dashboard: {e}")
@@ -0,0 +1,35 @@
+"""
+Debug API endpoints - Operational introspection (not part of the public API schema).
+"""
+from fastapi import APIRouter, Query
+from app.config import settings
+from app.services import startup_profile, refresh_trace, price_history
+
+router = APIRouter(prefix="/api/debug", tags=["debug"], include_in_schema=False)
+
+
+@router.get("/startup")
+async def get_startup_profile():
+    """
+    Returns this worker's startup timing breakdown:
+    module imports, DB init, HTTP client, scheduler start and each warmup step.
+    """
+    return startup_profile.report()
+
+
+@router.get("/refreshes")
+async def get_refresh_reports(
+    limit: int = Query(5, ge=1, le=max(1, settings.REFRESH_TRACE_HISTORY), description="Number of reports")
+):
+    """
+    Returns the most recent recommendation refresh reports, newest first:
+    duration, per-stage totals (fetch, ai_cache, prompt, llm_wait, llm,
+    parse, build), refresh-level stages and the slowest tickers.
+    """
+    return refresh_trace.reports(limit)
+
+
+@router.get("/price-history")
+async def get_price_history_status():
+    """Returns the stored daily bar count and date range per symbol"""
+    return price_history.status()
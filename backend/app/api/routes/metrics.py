@@ -0,0 +1,48 @@
+"""
+Metrics endpoint - Prometheus text format (not part of the public API schema).
+"""
+from fastapi import APIRouter, Response
+from app.services import metrics, snapshots
+from app.services.ai_analysis_service import get_usage_stats
+from app.services.analysis_cache import analysis_cache
+from app.services.request_scheduler import request_scheduler
+from app.services.response_cache import response_cache
+
+router = APIRouter(tags=["metrics"], include_in_schema=False)
+
+CONTENT_TYPE = "text/plain; version=0.0.4"  # Starlette appends the charset
+
+
+def _collect():
+    """Mirrors totals kept by other modules into the registry"""
+    for name, cache in (("response", response_cache), ("ai_analysis", analysis_cache)):
+        stats = cache.stats()
+        metrics.cache_lookups.set_total(stats["hits"], cache=name, result=metrics.HIT)
+        metrics.cache_lookups.set_total(stats["misses"], cache=name, result=metrics.MISS)
+        metrics.cache_entries.set(stats.get("entries", stats.get("memory_entries", 0)), cache=name)
+    metrics.update_cache_hit_ratios()
+
+    for provider, status in request_scheduler.status().items():
+        metrics.upstream_queue_depth.set(status["queued"], provider=provider)
+        metrics.upstream_throttled.set_total(status["throttled"], provider=provider)
+
+    usage = get_usage_stats()
+    metrics.openai_tokens.set_total(usage["prompt_tokens"], kind="prompt")
+    metrics.openai_tokens.set_total(usage["completion_tokens"], kind="completion")
+
+    for name in (snapshots.RECOMMENDATIONS, snapshots.SECTOR_PERFORMANCE, snapshots.ECONOMIC_INDICATORS):
+        snapshot = snapshots.get(name)
+        if snapshot is not None:
+            metrics.snapshot_age.set(round(snapshot.age_seconds(), 3), snapshot=name)
+            metrics.snapshot_version.set(snapshot.version, snapshot=name)
+
+
+@router.get("/metrics")
+async def get_metrics():
+    """
+    Route latency histograms, cache hit/miss/stale totals, upstream call
+    counts, latencies and errors per provider, refresh durations and
+    snapshot ages.
+    """
+    _collect()
+    return Response(content=metrics.render(), media_type=CONTENT_TYPE)
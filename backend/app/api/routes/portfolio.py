@@ -1,11 +1,12 @@
 """
 Portfolio API endpoints - Portfolio allocation suggestions.
 """
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Request
 from typing import List
 from app.models.schemas import PortfolioAllocation, RiskTolerance, StockRecommendation
 from app.services import demo_data
-from app.services.recommendation_engine import RecommendationEngine
+from app.services.recommendation_engine import get_recommendation_engine
+from app.services.response_cache import cached_json_response
 import logging
 
 logger = logging.getLogger(__name__)
@@ -70,6 +71,7 @@ async def get_portfolio_allocation(
 
 @router.get("/recommendations", response_model=List[StockRecommendation])
 async def get_portfolio_recommendations(
+    request: Request,
     risk_tolerance: RiskTolerance = Query(
         RiskTolerance.MODERATE,
         description="Risk tolerance: conservative, moderate, or aggressive"
@@ -93,14 +95,15 @@ async def get_portfolio_recommendations(
     
     Returns actual stock picks with full analysis for each position.
     """
-    try:
-        rec_engine = RecommendationEngine()
-        recommendations = rec_engine.get_portfolio_ideas(
+    async def build_portfolio_recommendations() -> List[StockRecommendation]:
+        rec_engine = await get_recommendation_engine()
+        return rec_engine.get_portfolio_ideas(
             risk_tolerance=risk_tolerance.value,
             n=n
         )
-        
-        return recommendations
+    
+    try:
+        return await cached_json_response(request, build_portfolio_recommendations, List[StockRecommendation])
         
     except Exception as e:
         logger.error(f"Error generating portfolio recommendations: {e}")
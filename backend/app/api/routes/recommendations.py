@@ -1,10 +1,11 @@
 """
 Recommendations API endpoints - Stock recommendations and filters.
 """
-from fastapi import APIRouter, HTTPException, Query, Path
+from fastapi import APIRouter, HTTPException, Query, Path, Request
 from typing import List, Optional
 from app.models.schemas import StockRecommendation, Strategy
-from app.services.recommendation_engine import RecommendationEngine
+from app.services.recommendation_engine import get_recommendation_engine
+from app.services.response_cache import cached_json_response
 import logging
 
 logger = logging.getLogger(__name__)
@@ -13,6 +14,7 @@ router = APIRouter(prefix="/api/recommendations", tags=["recommendations"])
 
 @router.get("", response_model=List[StockRecommendation])
 async def get_recommendations(
+    request: Request,
     strategy: Optional[Strategy] = Query(
         Strategy.ALL,
         description="Investment strategy: all, growth, value, defensive, contrarian"
@@ -52,17 +54,18 @@ async def get_recommendations(
     - Headwinds and tailwinds
     - Detailed investment rationale
     """
-    try:
-        rec_engine = RecommendationEngine()
+    async def build_recommendations() -> List[StockRecommendation]:
+        rec_engine = await get_recommendation_engine()
         
-        recommendations = rec_engine.filter_recommendations(
+        return rec_engine.filter_recommendations(
             strategy=strategy,
             sector=sector,
             min_conviction=min_conviction,
             limit=limit
         )
-        
-        return recommendations
+    
+    try:
+        return await cached_json_response(request, build_recommendations, List[StockRecommendation])
         
     except Exception as e:
         logger.error(f"Error fetching recommendations: {e}")
@@ -70,7 +73,7 @@ async def get_recommendations(
 
 
 @router.get("/screaming-buys", response_model=List[StockRecommendation])
-async def get_screaming_buys():
+async def get_screaming_buys(request: Request):
     """
     Returns AI-identified 'screaming buy' opportunities:
     - Conviction score >= 80
@@ -82,7 +85,7 @@ async def get_screaming_buys():
     """
     try:
         from app.services.live_recommendations_service import get_screaming_buys
-        return get_screaming_buys()
+        return await cached_json_response(request, get_screaming_buys, List[StockRecommendation])
     except Exception as e:
         logger.error(f"Error fetching screaming buys: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -90,6 +93,7 @@ async def get_screaming_buys():
 
 @router.get("/{ticker}", response_model=StockRecommendation)
 async def get_recommendation_detail(
+    request: Request,
     ticker: str = Path(..., description="Stock ticker symbol (e.g., AAPL, MSFT)")
 ):
     """
@@ -103,8 +107,8 @@ async def get_recommendation_detail(
     - Conviction score
     - Time horizon
     """
-    try:
-        rec_engine = RecommendationEngine()
+    async def build_recommendation() -> StockRecommendation:
+        rec_engine = await get_recommendation_engine()
         recommendation = rec_engine.get_recommendation_by_ticker(ticker)
         
         if not recommendation:
@@ -114,6 +118,9 @@ async def get_recommendation_detail(
             )
         
         return recommendation
+    
+    try:
+        return await cached_json_response(request, build_recommendation, StockRecommendation)
         
     except HTTPException:
         raise
@@ -1,10 +1,11 @@
 """
 Sectors API endpoints - Sector analysis and rankings.
 """
-from fastapi import APIRouter, HTTPException, Path
+from fastapi import APIRouter, HTTPException, Path, Request
 from typing import List
 from app.models.schemas import SectorAnalysis
 from app.services import demo_data
+from app.services.response_cache import cached_json_response
 import logging
 
 logger = logging.getLogger(__name__)
@@ -12,7 +13,7 @@ router = APIRouter(prefix="/api/sectors", tags=["sectors"])
 
 
 @router.get("", response_model=List[SectorAnalysis])
-async def get_all_sectors():
+async def get_all_sectors(request: Request):
     """
     Returns analysis for all sectors with scores and rankings.
     
@@ -25,17 +26,18 @@ async def get_all_sectors():
     - Investment rationale
     - Trend direction
     """
-    try:
+    async def build_sectors() -> List[SectorAnalysis]:
         sectors = demo_data.get_demo_sector_analyses()
         
         # Sort by score (highest first)
-        sorted_sectors = sorted(
+        return sorted(
             sectors,
             key=lambda x: x.score,
             reverse=True
         )
-        
-        return sorted_sectors
+    
+    try:
+        return await cached_json_response(request, build_sectors, List[SectorAnalysis])
         
     except Exception as e:
         logger.error(f"Error fetching sectors: {e}")
@@ -44,6 +46,7 @@ async def get_all_sectors():
 
 @router.get("/{sector_name}", response_model=SectorAnalysis)
 async def get_sector_detail(
+    request: Request,
     sector_name: str = Path(..., description="Sector name (e.g., Technology, Healthcare)")
 ):
     """
@@ -55,7 +58,7 @@ async def get_sector_detail(
     - Top stock recommendations in sector
     - Cycle positioning
     """
-    try:
+    async def build_sector() -> SectorAnalysis:
         sectors = demo_data.get_demo_sector_analyses()
         
         # Find matching sector (case-insensitive)
@@ -67,6 +70,9 @@ async def get_sector_detail(
             status_code=404,
             detail=f"Sector '{sector_name}' not found. Available sectors: Technology, Healthcare, Financials, Energy, Consumer Staples, Consumer Discretionary, Industrials, Materials, Real Estate, Communication Services, Utilities"
         )
+    
+    try:
+        return await cached_json_response(request, build_sector, SectorAnalysis)
         
     except HTTPException:
         raise
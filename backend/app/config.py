@@ -20,11 +20,102 @@ class Settings(BaseSettings):
     
     # Data refresh settings
     DATA_REFRESH_INTERVAL: int = 3600  # 1 hour in seconds
+    BACKGROUND_REFRESH_ENABLED: bool = True  # refresh live data on a schedule, not per request
     CACHE_TTL: int = 300  # 5 minutes in seconds
     
+    # Live ingestion concurrency (max in-flight calls per upstream)
+    YFINANCE_MAX_CONCURRENCY: int = 8
+    OPENAI_MAX_CONCURRENCY: int = 4
+    
+    # Split ingestion: batched prices every refresh, per-ticker fundamentals less often
+    SPLIT_INGESTION: bool = True
+    FUNDAMENTALS_REFRESH_INTERVAL: int = 86400  # 24 hours in seconds
+    
+    # Shared upstream HTTP client (Alpha Vantage, FRED)
+    HTTP_TIMEOUT: float = 10.0
+    HTTP_MAX_CONNECTIONS: int = 20
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0  # seconds an idle connection is kept
+    HTTP2_ENABLED: bool = True  # used only if the 'h2' package is installed
+    
+    # Upstream endpoints; point these at a local stand-in (benchmarks/standin.py) for load tests
+    ALPHA_VANTAGE_BASE_URL: str = "https://www.alphavantage.co"
+    FRED_BASE_URL: str = "https://api.stlouisfed.org"
+    OPENAI_BASE_URL: Optional[str] = None  # None = the openai SDK default
+    YFINANCE_BASE_URL: Optional[str] = None  # None = the yfinance library talks to Yahoo directly
+    
+    # Upstream quotas (free tiers) enforced by the request scheduler
+    ALPHA_VANTAGE_CALLS_PER_MINUTE: int = 5
+    FRED_CALLS_PER_MINUTE: int = 120
+    UPSTREAM_MAX_RETRIES: int = 3  # requeues after a throttled response
+    
+    # OpenAI client policy
+    OPENAI_TIMEOUT: float = 60.0  # seconds per request
+    OPENAI_MAX_RETRIES: int = 4  # on 429 / 5xx / timeouts
+    OPENAI_BACKOFF_BASE: float = 1.0  # seconds, doubled per retry
+    OPENAI_BACKOFF_MAX: float = 30.0
+    
+    # Incremental re-analysis: only call the LLM when inputs move past these thresholds
+    INCREMENTAL_REANALYSIS: bool = True
+    REANALYSIS_PRICE_CHANGE_PCT: float = 3.0
+    REANALYSIS_PE_CHANGE_PCT: float = 5.0
+    REANALYSIS_TARGET_CHANGE_PCT: float = 3.0  # analyst mean target
+    
+    # AI analysis cache (content-addressed, memory + disk)
+    AI_CACHE_ENABLED: bool = True
+    AI_CACHE_DIR: str = "./.cache/ai_analysis"
+    AI_CACHE_MAX_MEMORY_ENTRIES: int = 1024
+    AI_CACHE_MAX_DISK_BYTES: int = 50 * 1024 * 1024  # 50 MB
+    
+    # API response cache (pre-serialized bodies keyed on data version, with ETags)
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_MAX_ENTRIES: int = 256
+    
+    # Startup warmup: prime caches, serializers and /docs before the worker reports ready
+    STARTUP_WARMUP_ENABLED: bool = True
+    STARTUP_WARMUP_PATHS: list = [
+        "/api/dashboard",
+        "/api/recommendations",
+        "/api/sectors",
+        "/api/macro",
+        "/api/portfolio/allocation",
+    ]
+    # Prefixes of response-cached routes, which run an expired on-demand recommendations
+    # refresh first; skipped by the warmup while such a refresh is due
+    STARTUP_WARMUP_LIVE_PATHS: list = [
+        "/api/dashboard",
+        "/api/recommendations",
+        "/api/sectors",
+        "/api/portfolio/recommendations",
+    ]
+    STARTUP_WARMUP_TIMEOUT: float = 30.0  # seconds per warmup step
+    
+    # Prometheus-format metrics at GET /metrics (route latency, caches, upstreams, refreshes)
+    METRICS_ENABLED: bool = True
+    
+    # Unauthenticated /api/debug endpoints (startup timings, refresh traces,
+    # price history status); always mounted when DEBUG is set
+    DEBUG_ENDPOINTS_ENABLED: bool = False
+    
+    # Per-stage refresh tracing, served at /api/debug/refreshes
+    REFRESH_TRACE_HISTORY: int = 20  # refresh reports kept
+    REFRESH_TRACE_SLOWEST: int = 5  # slowest tickers listed per report
+    
     # Database settings
     DB_URL: str = "sqlite+aiosqlite:///./alpha_oracle.db"
     
+    # Persistent market data cache (market_data_cache table), TTL per field class
+    MARKET_DATA_PERSISTENCE: bool = True
+    QUOTE_CACHE_TTL: int = 300  # 5 minutes in seconds
+    OVERVIEW_CACHE_TTL: int = 86400  # 24 hours in seconds
+    FRED_CACHE_TTL: int = 43200  # 12 hours in seconds
+    
+    # Local daily OHLCV history (watchlist + sector ETFs), memory-mapped files per symbol
+    PRICE_HISTORY_ENABLED: bool = True
+    PRICE_HISTORY_DIR: str = "./.cache/price_history"
+    PRICE_HISTORY_BACKFILL_DAYS: int = 1825  # first fetch: ~5 years
+    PRICE_HISTORY_REFRESH_INTERVAL: int = 21600  # 6 hours in seconds; later fetches are incremental
+    
     # CORS settings
     CORS_ORIGINS: list = ["http://localhost:5173", "http://localhost:3000", "http://127.0.0.1:5173"]
     
@@ -35,5 +35,7 @@ async def get_db():
 
 async def init_db():
     """Initialize database tables"""
+    from app.models import db_models  # noqa: F401 - registers ORM models on Base
+    
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
@@ -9,6 +9,9 @@ DISCLAIMER: This platform is for educational and informational purposes only.
 Not financial advice. Past performance does not guarantee future results.
 Always conduct your own research and consult with financial professionals.
 """
+import time
+_imports_started = time.perf_counter()
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
@@ -16,7 +19,19 @@ import logging
 
 from app.config import settings, is_demo_mode
 from app.database import init_db
-from app.api.routes import dashboard, sectors, recommendations, macro, portfolio
+from app.services.http_client import init_http_client, close_http_client, get_connection_stats
+from app.services.request_scheduler import request_scheduler
+from app.services.live_recommendations_service import get_refresh_stats
+from app.services.ai_analysis_service import get_usage_stats, close_client as close_openai_client
+from app.services.refresh_scheduler import start_refresh_scheduler, stop_refresh_scheduler
+from app.services import snapshots
+from app.services.response_cache import response_cache
+from app.services.warmup import run_warmup
+from app.services import startup_profile
+from app.services.metrics import RouteMetricsMiddleware
+from app.api.routes import dashboard, sectors, recommendations, macro, portfolio, debug, metrics
+
+startup_profile.record("imports", time.perf_counter() - _imports_started)
 
 # Configure logging
 logging.basicConfig(
@@ -38,16 +53,35 @@ async def lifespan(app: FastAPI):
     logger.info(f"API keys configured: {bool(settings.ALPHA_VANTAGE_API_KEY and settings.FRED_API_KEY)}")
     
     # Initialize database
-    await init_db()
+    with startup_profile.phase("init_db"):
+        await init_db()
     logger.info("Database initialized")
     
-    # In production, could schedule periodic data refresh here
-    # For now, using on-demand data fetching
+    # Shared pooled HTTP client for upstream market data APIs
+    with startup_profile.phase("http_client"):
+        await init_http_client()
+    
+    # Periodic background refresh of live data (no-op in demo mode)
+    with startup_profile.phase("refresh_scheduler"):
+        start_refresh_scheduler()
+    
+    # Prime lazy paths so the first request is as fast as later ones
+    await run_warmup(app)
+    
+    startup_profile.mark_ready()
+    profile = startup_profile.report()
+    logger.info(
+        f"Startup complete in {profile['total_seconds']}s: "
+        + ", ".join(f"{p['phase']}={p['seconds']}s" for p in profile["phases"])
+    )
     
     yield
     
     # Shutdown
     logger.info("Shutting down Alpha Oracle")
+    stop_refresh_scheduler()
+    await close_http_client()
+    await close_openai_client()
 
 
 # Create FastAPI application
@@ -93,12 +127,20 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-route latency histograms for /metrics
+if settings.METRICS_ENABLED:
+    app.add_middleware(RouteMetricsMiddleware)
+
 # Include routers
 app.include_router(dashboard.router)
 app.include_router(sectors.router)
 app.include_router(recommendations.router)
 app.include_router(macro.router)
 app.include_router(portfolio.router)
+if settings.DEBUG or settings.DEBUG_ENDPOINTS_ENABLED:
+    app.include_router(debug.router)
+if settings.METRICS_ENABLED:
+    app.include_router(metrics.router)
 
 
 @app.get("/")
@@ -128,7 +170,13 @@ async def health_check():
         "status": "healthy",
         "app": settings.APP_NAME,
         "version": settings.APP_VERSION,
-        "demo_mode": is_demo_mode()
+        "demo_mode": is_demo_mode(),
+        "upstream_connections": get_connection_stats(),
+        "upstream_queues": request_scheduler.status(),
+        "recommendation_refresh": get_refresh_stats(),
+        "openai_usage": get_usage_stats(),
+        "snapshots": snapshots.status(),
+        "response_cache": response_cache.stats()
     }
 
 
@@ -0,0 +1,40 @@
+"""
+SQLAlchemy ORM models for the application database.
+Registered on database.Base, so init_db() creates their tables.
+"""
+from sqlalchemy import Column, Integer, BigInteger, String, Float, Date, DateTime, JSON, UniqueConstraint, Index
+from app.database import Base
+
+
+class MarketData(Base):
+    """
+    Persisted upstream market data, one row per (ticker, field class).
+
+    A cache table in the app database (DB_URL), created by init_db. It is
+    deliberately not the market_data table from database/schema.sql: that
+    table keeps one quote per (ticker, data_date) for backend-ts, with a
+    UUID id and no payload/fetched_at columns, so sharing its name would
+    make create(checkfirst=True) skip this table on a database provisioned
+    from schema.sql and every read and write here would fail. The quote
+    columns match schema.sql; payload holds the full upstream record
+    (overviews and FRED observations don't fit the quote columns) and
+    fetched_at drives the TTL check.
+    """
+    __tablename__ = "market_data_cache"
+    __table_args__ = (
+        UniqueConstraint("ticker", "field_class", name="uq_market_data_cache_ticker_field_class"),
+        Index("idx_market_data_cache_ticker", "ticker"),
+        Index("idx_market_data_cache_date", "data_date"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    ticker = Column(String, nullable=False)  # ticker symbol, or FRED series id
+    field_class = Column(String, nullable=False)  # price | quote | overview | fundamentals | fred
+    price = Column(Float)
+    change_percent = Column(Float)
+    volume = Column(BigInteger)
+    market_cap = Column(BigInteger)
+    pe_ratio = Column(Float)
+    data_date = Column(Date)
+    payload = Column(JSON, nullable=False)
+    fetched_at = Column(DateTime, nullable=False)  # UTC
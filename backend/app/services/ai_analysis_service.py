@@ -1,46 +1,241 @@
 """
 AI Analysis Service - Uses OpenAI GPT-4o to evaluate stocks and generate
 investment recommendations with rationale, tailwinds, headwinds, and conviction scores.
+
+Results are cached by a hash of (inputs, prompt version, model), so unchanged
+tickers skip the LLM call (see analysis_cache).
+
+Calls go through one shared AsyncOpenAI client per event loop (normally
+just the app's). A process-wide limiter caps in-flight requests at
+OPENAI_MAX_CONCURRENCY across all loops, throttles and 5xx errors are
+retried with exponential backoff (without holding a slot), and tokens and
+latency are recorded per call.
+
+The openai SDK is imported when the first client is created, so demo mode
+never loads it.
 """
 import os
 import json
+import time
+import random
+import asyncio
 import logging
-from typing import Optional
-from openai import OpenAI
+import threading
+from collections import deque
+from typing import Optional, Dict, Any, Deque, Tuple, TYPE_CHECKING
+from app.config import settings
+from app.services import metrics, refresh_trace
+from app.services.analysis_cache import analysis_cache, cache_key
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
 
 logger = logging.getLogger(__name__)
 
+AI_MODEL = "gpt-4o"
+# Bump whenever the prompt template below changes, so cached analyses are not reused
+PROMPT_VERSION = "1"
+
+
+class _SlotLimiter:
+    """
+    Caps in-flight calls across every event loop in the process (an
+    asyncio.Semaphore only works within one loop). Waiters are served FIFO;
+    a released slot is handed to the next waiter on its own loop.
+    """
+
+    def __init__(self, slots: int):
+        self._free = slots
+        self._waiters: Deque[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = deque()
+        self._lock = threading.Lock()
+
+    async def acquire(self):
+        with self._lock:
+            if self._free > 0 and not self._waiters:
+                self._free -= 1
+                return
+            loop = asyncio.get_running_loop()
+            entry = (loop, loop.create_future())
+            self._waiters.append(entry)
+        try:
+            await entry[1]
+        except asyncio.CancelledError:
+            with self._lock:
+                if entry in self._waiters:
+                    self._waiters.remove(entry)
+                    raise
+            # The slot was already handed over; pass it on unless _grant will
+            if entry[1].done() and not entry[1].cancelled():
+                self.release()
+            raise
 
-def _get_client() -> Optional[OpenAI]:
+    def release(self):
+        with self._lock:
+            while self._waiters:
+                loop, waiter = self._waiters.popleft()
+                if not loop.is_closed():
+                    loop.call_soon_threadsafe(self._grant, waiter)
+                    return
+            self._free += 1
+
+    def _grant(self, waiter: asyncio.Future):
+        if waiter.cancelled():
+            self.release()
+        else:
+            waiter.set_result(None)
+
+
+# One client per event loop; the concurrency cap is shared by all of them
+_clients: Dict[asyncio.AbstractEventLoop, "AsyncOpenAI"] = {}
+_clients_lock = threading.Lock()
+_slots = _SlotLimiter(max(1, settings.OPENAI_MAX_CONCURRENCY))
+
+_usage_lock = threading.Lock()
+_usage: Dict[str, Any] = {
+    "calls": 0,
+    "retries": 0,
+    "failures": 0,
+    "prompt_tokens": 0,
+    "completion_tokens": 0,
+    "total_latency_seconds": 0.0,
+    "max_latency_seconds": 0.0,
+}
+
+
+def _get_client() -> Optional["AsyncOpenAI"]:
+    """Shared AsyncOpenAI client for the running loop (SDK retries disabled; see _create_completion)"""
     api_key = os.getenv("OPENAI_API_KEY")
     if not api_key:
         return None
-    return OpenAI(api_key=api_key)
 
+    loop = asyncio.get_running_loop()
+    with _clients_lock:
+        client = _clients.get(loop)
+        if client is None:
+            from openai import AsyncOpenAI
+            # Loops that closed without close_client() can no longer close theirs
+            for closed in [other for other in _clients if other.is_closed()]:
+                logger.warning("Dropping an OpenAI client whose event loop closed without close_client()")
+                del _clients[closed]
+            client = _clients[loop] = AsyncOpenAI(
+                api_key=api_key,
+                base_url=settings.OPENAI_BASE_URL,
+                timeout=settings.OPENAI_TIMEOUT,
+                max_retries=0
+            )
+    return client
 
-def analyze_stock_with_ai(stock_data: dict) -> Optional[dict]:
-    """
-    Sends stock fundamentals to GPT-4o and gets back a structured
-    investment recommendation.
 
-    Returns dict with:
-    - conviction_score (float 0-100)
-    - recommendation (STRONG_BUY | BUY | HOLD | SELL | STRONG_SELL)
-    - fair_value_estimate (float)
-    - tailwinds (list of str)
-    - headwinds (list of str)
-    - rationale (str, 2-4 sentences)
-    - is_screaming_buy (bool)
-    - time_horizon (str)
+async def close_client():
+    """Closes the running loop's client and its connection pool; call before the loop shuts down"""
+    with _clients_lock:
+        client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.close()
+
+
+def _is_retryable(error: Exception) -> bool:
+    """429s, 5xx, timeouts and connection errors are worth retrying"""
+    from openai import APIStatusError, APIConnectionError, RateLimitError
+    if isinstance(error, (RateLimitError, APIConnectionError)):
+        return True
+    return isinstance(error, APIStatusError) and error.status_code >= 500
+
+
+def _failure_outcome(error: Exception) -> str:
+    """Metrics outcome for a failed call"""
+    from openai import RateLimitError
+    return metrics.THROTTLED if isinstance(error, RateLimitError) else metrics.ERROR
+
+
+def _backoff_seconds(error: Exception, attempt: int) -> float:
+    """Honors Retry-After when the API sends one, else exponential backoff with jitter"""
+    from openai import APIStatusError
+    if isinstance(error, APIStatusError):
+        retry_after = error.response.headers.get("retry-after")
+        try:
+            return min(float(retry_after), settings.OPENAI_BACKOFF_MAX)
+        except (TypeError, ValueError):
+            pass
+    delay = settings.OPENAI_BACKOFF_BASE * (2 ** attempt)
+    return min(delay, settings.OPENAI_BACKOFF_MAX) * random.uniform(0.8, 1.2)
+
+
+def _record_call(latency: float, usage: Any):
+    with _usage_lock:
+        _usage["calls"] += 1
+        _usage["total_latency_seconds"] += latency
+        _usage["max_latency_seconds"] = max(_usage["max_latency_seconds"], latency)
+        if usage is not None:
+            _usage["prompt_tokens"] += usage.prompt_tokens or 0
+            _usage["completion_tokens"] += usage.completion_tokens or 0
+
+
+def _count_usage(stat: str):
+    with _usage_lock:
+        _usage[stat] += 1
+
+
+def get_usage_stats() -> Dict[str, Any]:
+    """Token, latency and retry totals for all OpenAI calls in this process"""
+    with _usage_lock:
+        stats = dict(_usage)
+    stats["avg_latency_seconds"] = (
+        round(stats["total_latency_seconds"] / stats["calls"], 3) if stats["calls"] else 0.0
+    )
+    stats["total_latency_seconds"] = round(stats["total_latency_seconds"], 3)
+    stats["max_latency_seconds"] = round(stats["max_latency_seconds"], 3)
+    return stats
+
+
+async def _create_completion(client: "AsyncOpenAI", ticker: str, prompt: str):
     """
-    client = _get_client()
-    if not client:
-        logger.warning("OPENAI_API_KEY not set; skipping AI analysis")
-        return None
+    One chat completion under the concurrency cap, retried on throttling and
+    server errors. Each attempt takes its own slot, so backoff sleeps do not
+    hold one.
+    """
+    for attempt in range(settings.OPENAI_MAX_RETRIES + 1):
+        waiting_since = time.perf_counter()
+        await _slots.acquire()
+        try:
+            refresh_trace.record(refresh_trace.LLM_WAIT, time.perf_counter() - waiting_since)
+            with refresh_trace.span(refresh_trace.LLM):
+                started = time.perf_counter()
+                try:
+                    response = await client.chat.completions.create(
+                        model=AI_MODEL,
+                        messages=[{"role": "user", "content": prompt}],
+                        response_format={"type": "json_object"},
+                        temperature=0.3,
+                    )
+                except Exception as e:
+                    metrics.record_upstream_call(metrics.OPENAI, time.perf_counter() - started, _failure_outcome(e))
+                    if not _is_retryable(e) or attempt == settings.OPENAI_MAX_RETRIES:
+                        raise
+                    delay = _backoff_seconds(e, attempt)
+                    _count_usage("retries")
+                    logger.warning(f"OpenAI call for {ticker} failed ({e.__class__.__name__}); retrying in {delay:.1f}s")
+                else:
+                    latency = time.perf_counter() - started
+                    _record_call(latency, response.usage)
+                    metrics.record_upstream_call(metrics.OPENAI, latency)
+                    logger.debug(
+                        f"OpenAI {ticker}: {latency:.2f}s, "
+                        f"{getattr(response.usage, 'total_tokens', '?')} tokens"
+                    )
+                    return response
+        finally:
+            _slots.release()
+
+        with refresh_trace.span(refresh_trace.LLM_WAIT):
+            await asyncio.sleep(delay)
+
 
+def build_prompt(stock_data: dict) -> str:
+    """Renders the analysis prompt (template version PROMPT_VERSION) for one stock"""
     ticker = stock_data.get("ticker", "UNKNOWN")
 
-    prompt = f"""You are a senior equity analyst at a top hedge fund. Analyze this stock and provide a JSON investment recommendation.
+    return f"""You are a senior equity analyst at a top hedge fund. Analyze this stock and provide a JSON investment recommendation.
 
 Stock: {ticker} - {stock_data.get('company_name')}
 Sector: {stock_data.get('sector')}
@@ -76,15 +271,63 @@ Respond ONLY with valid JSON in this exact format:
 
 A "screaming buy" means conviction_score >= 80 AND recommendation is STRONG_BUY or BUY AND upside to fair value > 10%."""
 
+
+async def analyze_stock_with_ai_async(stock_data: dict) -> Optional[dict]:
+    """
+    Sends stock fundamentals to GPT-4o and gets back a structured
+    investment recommendation.
+
+    Returns dict with:
+    - conviction_score (float 0-100)
+    - recommendation (STRONG_BUY | BUY | HOLD | SELL | STRONG_SELL)
+    - fair_value_estimate (float)
+    - tailwinds (list of str)
+    - headwinds (list of str)
+    - rationale (str, 2-4 sentences)
+    - is_screaming_buy (bool)
+    - time_horizon (str)
+    """
+    client = _get_client()
+    if not client:
+        logger.warning("OPENAI_API_KEY not set; skipping AI analysis")
+        return None
+
+    ticker = stock_data.get("ticker", "UNKNOWN")
+
+    key = cache_key(stock_data, PROMPT_VERSION, AI_MODEL)
+    if settings.AI_CACHE_ENABLED:
+        with refresh_trace.span(refresh_trace.AI_CACHE):
+            cached = await asyncio.to_thread(analysis_cache.get, key)
+        if cached is not None:
+            logger.info(f"{ticker}: reusing cached AI analysis")
+            return cached
+
+    with refresh_trace.span(refresh_trace.PROMPT):
+        prompt = build_prompt(stock_data)
+
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[{"role": "user", "content": prompt}],
-            response_format={"type": "json_object"},
-            temperature=0.3,
-        )
-        result = json.loads(response.choices[0].message.content)
+        response = await _create_completion(client, ticker, prompt)
+        with refresh_trace.span(refresh_trace.PARSE):
+            result = json.loads(response.choices[0].message.content)
+        if settings.AI_CACHE_ENABLED:
+            with refresh_trace.span(refresh_trace.AI_CACHE):
+                await asyncio.to_thread(analysis_cache.put, key, result)
         return result
     except Exception as e:
+        _count_usage("failures")
         logger.error(f"OpenAI analysis failed for {ticker}: {e}")
         return None
+
+
+def analyze_stock_with_ai(stock_data: dict) -> Optional[dict]:
+    """
+    Blocking wrapper around analyze_stock_with_ai_async for scripts and
+    one-off use. Must not be called from a running event loop.
+    """
+    async def analyze_and_close():
+        try:
+            return await analyze_stock_with_ai_async(stock_data)
+        finally:
+            await close_client()
+
+    return asyncio.run(analyze_and_close())
@@ -0,0 +1,167 @@
+"""
+Content-addressed cache for AI stock analyses.
+
+Results are keyed by a SHA-256 of the normalized stock_data inputs, the
+prompt template version and the model, so a ticker whose fundamentals did
+not change skips the LLM call entirely. Entries live in a bounded in-memory
+LRU and in JSON files on disk, evicted oldest-first above a byte budget.
+"""
+import hashlib
+import json
+import math
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+import logging
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _normalize(value: Any) -> Any:
+    """Canonical form of the inputs: stable float precision, no NaN, trimmed strings"""
+    if isinstance(value, float):
+        return None if math.isnan(value) else round(value, 6)
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    return value
+
+
+def cache_key(stock_data: Dict[str, Any], prompt_version: str, model: str) -> str:
+    """Hash identifying one (inputs, prompt template, model) combination"""
+    canonical = json.dumps(
+        {"model": model, "prompt_version": prompt_version, "inputs": _normalize(stock_data)},
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class AnalysisCache:
+    """Two-level (memory LRU + disk) size-bounded cache of analysis results"""
+
+    def __init__(self, directory: str, max_memory_entries: int, max_disk_bytes: int):
+        self.directory = directory
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_bytes = max_disk_bytes
+        self._memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._disk_bytes: Optional[int] = None  # computed on first write
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return dict(self._memory[key])
+
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                result = json.load(f)
+            os.utime(path)  # recency for disk eviction
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Unreadable analysis cache entry {key}: {e}")
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+            self._remember(key, result)
+        return dict(result)
+
+    def put(self, key: str, result: Dict[str, Any]):
+        with self._lock:
+            self._remember(key, result)
+
+        path = self._path(key)
+        try:
+            previous_size = os.path.getsize(path)
+        except OSError:
+            previous_size = 0
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(result, f)
+            os.replace(tmp_path, path)
+            size = os.path.getsize(path)
+        except OSError as e:
+            logger.warning(f"Could not write analysis cache entry {key}: {e}")
+            return
+
+        with self._lock:
+            if self._disk_bytes is None:
+                self._disk_bytes = self._scan_disk_bytes()
+            else:
+                self._disk_bytes += size - previous_size  # an overwrite replaces the old file
+            if self._disk_bytes > self.max_disk_bytes:
+                self._evict_disk()
+
+    def _remember(self, key: str, result: Dict[str, Any]):
+        self._memory[key] = result
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _entries(self):
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(".json"):
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    yield path, stat.st_mtime, stat.st_size
+
+    def _scan_disk_bytes(self) -> int:
+        return sum(size for _, _, size in self._entries())
+
+    def _evict_disk(self):
+        """Deletes least recently used files until usage is below 90% of the budget"""
+        target = self.max_disk_bytes * 0.9
+        evicted = 0
+        for path, _, size in sorted(self._entries(), key=lambda entry: entry[1]):
+            if self._disk_bytes <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            self._disk_bytes -= size
+            evicted += 1
+        logger.info(f"Analysis cache: evicted {evicted} entries from disk")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "memory_entries": len(self._memory),
+                "disk_bytes": self._disk_bytes
+            }
+
+
+# Global cache instance
+analysis_cache = AnalysisCache(
+    directory=settings.AI_CACHE_DIR,
+    max_memory_entries=settings.AI_CACHE_MAX_MEMORY_ENTRIES,
+    max_disk_bytes=settings.AI_CACHE_MAX_DISK_BYTES
+)
@@ -3,7 +3,8 @@ Analysis Engine - The brain of Alpha Oracle.
 Implements investment logic following strategies of legendary investors.
 Performs cycle analysis, sector scoring, and valuation assessments.
 """
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+import numpy as np
 from app.models.schemas import (
     EconomicCycle, MacroSnapshot, SectorAnalysis, 
     StockRecommendation, Outlook, Recommendation
@@ -12,6 +13,61 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+ArrayLike = Union[float, Sequence[float], np.ndarray]
+
+
+class SectorScores:
+    """
+    Result of AnalysisEngine.score_sectors_batch.
+
+    Component arrays are indexed [scenario, phase, sector] (broadcast where a
+    component doesn't depend on an axis):
+    - cycle: (1, phases, sectors)
+    - valuation, wind: (1, 1, sectors)
+    - macro: (scenarios, 1, sectors)
+    - total: (scenarios, phases, sectors), clamped to 0-100, unrounded
+    """
+
+    def __init__(
+        self,
+        sectors: List[str],
+        phases: List[EconomicCycle],
+        cycle: np.ndarray,
+        valuation: np.ndarray,
+        wind: np.ndarray,
+        macro: np.ndarray,
+        total: np.ndarray
+    ):
+        self.sectors = sectors
+        self.phases = phases
+        self.cycle = cycle
+        self.valuation = valuation
+        self.wind = wind
+        self.macro = macro
+        self.total = total
+
+    def score(self, sector: str, phase: EconomicCycle, scenario: int = 0) -> float:
+        """Total for one cell, rounded exactly like AnalysisEngine.score_sector"""
+        value = self.total[scenario, self.phases.index(phase), self.sectors.index(sector)]
+        return round(float(value), 1)
+
+    def ranking(self, phase: EconomicCycle, scenario: int = 0) -> List[Tuple[str, float]]:
+        """(sector, score) pairs for one phase and scenario, best first"""
+        p = self.phases.index(phase)
+        scores = [round(float(v), 1) for v in self.total[scenario, p]]
+        return sorted(zip(self.sectors, scores), key=lambda x: x[1], reverse=True)
+
+    def components(self, sector: str, phase: EconomicCycle, scenario: int = 0) -> Dict[str, float]:
+        """Per-component scores behind one total"""
+        p, s = self.phases.index(phase), self.sectors.index(sector)
+        return {
+            "cycle": float(self.cycle[0, p, s]),
+            "valuation": float(self.valuation[0, 0, s]),
+            "wind": float(self.wind[0, 0, s]),
+            "macro": float(self.macro[scenario, 0, s]),
+            "total": round(float(self.total[scenario, p, s]), 1)
+        }
+
 
 class AnalysisEngine:
     """
@@ -79,6 +135,12 @@ class AnalysisEngine:
         }
     }
     
+    # Sectors whose macro score moves with rates, inflation and risk appetite
+    RATE_SENSITIVE_SECTORS = ['Real Estate', 'Utilities']
+    RATE_BENEFICIARY_SECTORS = ['Financials']
+    INFLATION_HEDGE_SECTORS = ['Energy', 'Materials', 'Consumer Staples']
+    DEFENSIVE_SECTORS = ['Healthcare', 'Consumer Staples', 'Utilities']
+    
     def determine_economic_cycle(self, macro_data: MacroSnapshot) -> EconomicCycle:
         """
         Determines current economic cycle phase using leading indicators.
@@ -161,19 +223,19 @@ class AnalysisEngine:
         
         # Rate-sensitive sectors penalized when rates high
         if macro_data.fed_funds_rate > 4.5:
-            if sector in ['Real Estate', 'Utilities']:
+            if sector in self.RATE_SENSITIVE_SECTORS:
                 macro_score -= 20
-            elif sector in ['Financials']:
+            elif sector in self.RATE_BENEFICIARY_SECTORS:
                 macro_score += 10  # Banks benefit from higher rates
         
         # Inflation hedge sectors favored when inflation high
         if macro_data.inflation_rate > 3.0:
-            if sector in ['Energy', 'Materials', 'Consumer Staples']:
+            if sector in self.INFLATION_HEDGE_SECTORS:
                 macro_score += 15
         
         # Risk-off benefits defensives
         if macro_data.vix > 20:
-            if sector in ['Healthcare', 'Consumer Staples', 'Utilities']:
+            if sector in self.DEFENSIVE_SECTORS:
                 macro_score += 15
         
         # Composite score
@@ -186,6 +248,90 @@ class AnalysisEngine:
         
         return round(min(100, max(0, final_score)), 1)
     
+    def score_sectors_batch(
+        self,
+        sector_data: List[SectorAnalysis],
+        fed_funds_rate: ArrayLike,
+        inflation_rate: ArrayLike,
+        vix: ArrayLike,
+        cycle_phases: Optional[List[EconomicCycle]] = None
+    ) -> SectorScores:
+        """
+        Scores every sector under every cycle phase and macro scenario in one
+        vectorized pass. Same model as score_sector: each cell of the result
+        equals score_sector for that (sector, phase, scenario).
+        
+        fed_funds_rate, inflation_rate and vix are scalars or equal-length
+        arrays, one entry per macro scenario. cycle_phases defaults to all four.
+        """
+        phases = list(cycle_phases) if cycle_phases is not None else list(EconomicCycle)
+        sectors = [data.sector for data in sector_data]
+        
+        # Cycle alignment: (phases, sectors) multipliers, 1.0 where unlisted
+        multipliers = np.array([
+            [self.CYCLE_SECTOR_MATRIX.get(phase, {}).get(sector, 1.0) for sector in sectors]
+            for phase in phases
+        ], dtype=np.float64).reshape(len(phases), len(sectors))
+        cycle = np.minimum(100, multipliers * 60)[np.newaxis]
+        
+        # Valuation from outlook
+        valuation = np.array([
+            70 if data.outlook == Outlook.BULLISH else 40 if data.outlook == Outlook.BEARISH else 55
+            for data in sector_data
+        ], dtype=np.float64)[np.newaxis, np.newaxis]
+        
+        # Tailwind/headwind balance
+        net_winds = np.array(
+            [len(data.tailwinds) - len(data.headwinds) for data in sector_data],
+            dtype=np.float64
+        )
+        wind = np.clip(50 + net_winds * 10, 0, 100)[np.newaxis, np.newaxis]
+        
+        # Macro adjustments: scenario conditions (scenarios, 1) x sector flags (sectors,)
+        def flags(names: List[str]) -> np.ndarray:
+            return np.array([sector in names for sector in sectors], dtype=bool)
+        
+        rate_sensitive = flags(self.RATE_SENSITIVE_SECTORS)
+        rate_beneficiary = flags(self.RATE_BENEFICIARY_SECTORS) & ~rate_sensitive
+        rate_adjustment = np.where(rate_sensitive, -20, np.where(rate_beneficiary, 10, 0))
+        
+        high_rates = (np.atleast_1d(np.asarray(fed_funds_rate, dtype=np.float64)) > 4.5)[:, np.newaxis]
+        high_inflation = (np.atleast_1d(np.asarray(inflation_rate, dtype=np.float64)) > 3.0)[:, np.newaxis]
+        risk_off = (np.atleast_1d(np.asarray(vix, dtype=np.float64)) > 20)[:, np.newaxis]
+        
+        macro = (
+            50
+            + high_rates * rate_adjustment
+            + high_inflation * (flags(self.INFLATION_HEDGE_SECTORS) * 15)
+            + risk_off * (flags(self.DEFENSIVE_SECTORS) * 15)
+        ).astype(np.float64)[:, np.newaxis, :]
+        
+        # Composite, same operation order as score_sector
+        total = np.clip(
+            cycle * 0.40 +
+            valuation * 0.25 +
+            wind * 0.20 +
+            macro * 0.15,
+            0, 100
+        )
+        
+        return SectorScores(sectors, phases, cycle, valuation, wind, macro, total)
+    
+    def score_sectors(
+        self,
+        sector_data: List[SectorAnalysis],
+        macro_scenarios: List[MacroSnapshot],
+        cycle_phases: Optional[List[EconomicCycle]] = None
+    ) -> SectorScores:
+        """score_sectors_batch over a list of macro snapshots (one scenario each)"""
+        return self.score_sectors_batch(
+            sector_data,
+            fed_funds_rate=[m.fed_funds_rate for m in macro_scenarios],
+            inflation_rate=[m.inflation_rate for m in macro_scenarios],
+            vix=[m.vix for m in macro_scenarios],
+            cycle_phases=cycle_phases
+        )
+    
     def analyze_headwinds_tailwinds(
         self, 
         sector: str,
@@ -363,6 +509,124 @@ class AnalysisEngine:
             rationale=rationale
         )
     
+    # Upside thresholds (%) for each recommendation level, best first
+    RECOMMENDATION_THRESHOLDS = [
+        (20, Recommendation.STRONG_BUY),
+        (10, Recommendation.BUY),
+        (-5, Recommendation.HOLD),
+        (-15, Recommendation.SELL),
+    ]
+    
+    def calculate_conviction_scores(
+        self,
+        valuation_discount: ArrayLike,
+        tailwind_count: ArrayLike,
+        headwind_count: ArrayLike,
+        macro_alignment: ArrayLike
+    ) -> np.ndarray:
+        """
+        Vectorized calculate_conviction_score for N tickers.
+        Returns unrounded scores clamped to 0-100; round each with
+        round(float(x), 1) to get exactly the scalar result.
+        """
+        valuation_discount = np.asarray(valuation_discount, dtype=np.float64)
+        net_winds = (
+            np.asarray(tailwind_count, dtype=np.float64) -
+            np.asarray(headwind_count, dtype=np.float64)
+        )
+        
+        valuation_component = np.clip(50 + valuation_discount * 2, 0, 100)
+        growth_component = 65
+        macro_component = np.asarray(macro_alignment, dtype=np.float64)
+        wind_component = np.clip(50 + net_winds * 15, 0, 100)
+        momentum_component = 60
+        
+        # Same operation order as calculate_conviction_score
+        conviction = (
+            valuation_component * 0.25 +
+            growth_component * 0.25 +
+            macro_component * 0.20 +
+            wind_component * 0.15 +
+            momentum_component * 0.15
+        )
+        
+        return np.clip(conviction, 0, 100)
+    
+    def generate_stock_recommendations_batch(
+        self,
+        tickers: Sequence[str],
+        company_names: Sequence[str],
+        sectors: Sequence[str],
+        current_prices: ArrayLike,
+        fair_values: ArrayLike,
+        pe_ratios: Sequence[Optional[float]],
+        peg_ratios: Sequence[Optional[float]],
+        dividend_yields: Sequence[Optional[float]],
+        market_caps: Sequence[Optional[float]],
+        sector_scores: ArrayLike,
+        headwinds: Sequence[List[str]],
+        tailwinds: Sequence[List[str]],
+        rationales: Sequence[str]
+    ) -> List[StockRecommendation]:
+        """
+        generate_stock_recommendation for N tickers at once.
+        
+        Upside, recommendation level and conviction are computed as array
+        arithmetic; StockRecommendation objects are built only at the end.
+        Element i of the result equals generate_stock_recommendation called
+        with element i of every argument.
+        """
+        current_prices = np.asarray(current_prices, dtype=np.float64)
+        fair_values = np.asarray(fair_values, dtype=np.float64)
+        sector_scores = np.asarray(sector_scores, dtype=np.float64)
+        
+        # Calculate upside (a zero price raises, like the scalar division)
+        with np.errstate(divide="raise", invalid="raise"):
+            upside_pct = ((fair_values - current_prices) / current_prices) * 100
+        
+        # Determine recommendation level
+        levels = self.RECOMMENDATION_THRESHOLDS
+        level_index = np.select(
+            [upside_pct > threshold for threshold, _ in levels],
+            np.arange(len(levels)),
+            default=len(levels)
+        )
+        recommendations = [level for _, level in levels] + [Recommendation.STRONG_SELL]
+        
+        conviction = self.calculate_conviction_scores(
+            valuation_discount=upside_pct,
+            tailwind_count=[len(t) for t in tailwinds],
+            headwind_count=[len(h) for h in headwinds],
+            macro_alignment=sector_scores
+        )
+        
+        return [
+            StockRecommendation(
+                ticker=tickers[i],
+                company_name=company_names[i],
+                sector=sectors[i],
+                recommendation=recommendations[level],
+                conviction_score=round(score, 1),
+                current_price=price,
+                fair_value_estimate=fair_value,
+                upside_potential_pct=round(upside, 1),
+                pe_ratio=pe_ratios[i],
+                peg_ratio=peg_ratios[i],
+                dividend_yield=dividend_yields[i],
+                market_cap=market_caps[i],
+                headwinds=headwinds[i],
+                tailwinds=tailwinds[i],
+                rationale=rationales[i]
+            )
+            for i, (level, score, price, fair_value, upside) in enumerate(zip(
+                level_index.tolist(),
+                conviction.tolist(),
+                current_prices.tolist(),
+                fair_values.tolist(),
+                upside_pct.tolist()
+            ))
+        ]
+    
     def optimize_portfolio(
         self,
         recommendations: List[StockRecommendation],
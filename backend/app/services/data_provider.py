@@ -2,20 +2,31 @@
 Market data provider service for Alpha Oracle.
 Fetches real-time market data from external APIs (Alpha Vantage, FRED).
 Falls back to demo data if API keys are not configured.
+Live responses are persisted in the market_data_cache table and served from
+there while fresh (see market_data_store).
 """
-import httpx
+import asyncio
+from datetime import date
 from typing import Optional, Dict, Any
 import logging
 from app.config import settings
-from app.services import demo_data
+from app.services import http_client, market_data_store
+from app.services.request_scheduler import request_scheduler, PRIORITY_INTERACTIVE, PRIORITY_REFRESH
 
 logger = logging.getLogger(__name__)
 
+ALPHA_VANTAGE = "alpha_vantage"
+FRED = "fred"
+
+SECTOR_ETFS = ['XLK', 'XLF', 'XLE', 'XLV', 'XLY', 'XLP', 'XLI', 'XLB', 'XLRE', 'XLC', 'XLU']
+
 
 class MarketDataProvider:
     """
     Provides market data from external APIs with graceful fallback to demo data.
     Ensures the platform works out-of-the-box without API keys.
+    All calls share the pooled client from http_client and are paced by
+    request_scheduler to stay within each provider's quota.
     """
     
     def __init__(self):
@@ -28,6 +39,45 @@ class MarketDataProvider:
         else:
             logger.info("API keys configured. Using live data mode.")
     
+    async def _fetch_json(
+        self,
+        provider: str,
+        url: str,
+        params: Dict[str, Any],
+        priority: int = PRIORITY_REFRESH
+    ) -> Dict[str, Any]:
+        """
+        Waits for a quota slot, performs the GET and returns the JSON body.
+        Throttled responses (HTTP 429, or Alpha Vantage's 200 + "Note"/"Information")
+        are requeued behind the refilled bucket instead of being returned.
+        """
+        for attempt in range(settings.UPSTREAM_MAX_RETRIES + 1):
+            await request_scheduler.acquire(provider, priority)
+            response = await http_client.get(provider, url, params)
+            
+            if response.status_code != 429:
+                data = response.json()
+                if not (isinstance(data, dict) and ('Note' in data or 'Information' in data)):
+                    return data
+            
+            request_scheduler.report_throttled(provider)
+        
+        logger.warning(f"{provider} still throttled after {settings.UPSTREAM_MAX_RETRIES} retries")
+        return {}
+    
+    async def _persist_quote(self, symbol: str, quote: Dict[str, Any]):
+        """Stores an Alpha Vantage GLOBAL_QUOTE in the market_data_cache table"""
+        volume = market_data_store.to_float(quote.get('06. volume'))
+        await asyncio.to_thread(
+            market_data_store.save,
+            market_data_store.QUOTE,
+            symbol,
+            quote,
+            price=market_data_store.to_float(quote.get('05. price')),
+            change_percent=market_data_store.to_float(quote.get('10. change percent')),
+            volume=int(volume) if volume is not None else None
+        )
+    
     async def get_sector_performance(self) -> Dict[str, Any]:
         """
         Fetches sector ETF performance data.
@@ -39,25 +89,32 @@ class MarketDataProvider:
             return self._get_demo_sector_performance()
         
         try:
-            sector_etfs = ['XLK', 'XLF', 'XLE', 'XLV', 'XLY', 'XLP', 'XLI', 'XLB', 'XLRE', 'XLC', 'XLU']
-            sector_data = {}
+            # Serve fresh quotes from the database; only go upstream for the rest
+            sector_data = await asyncio.to_thread(
+                market_data_store.load_many, market_data_store.QUOTE, SECTOR_ETFS
+            )
+            missing = [etf for etf in SECTOR_ETFS if etf not in sector_data]
             
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                for etf in sector_etfs:
-                    try:
-                        url = f"https://www.alphavantage.co/query"
-                        params = {
-                            'function': 'GLOBAL_QUOTE',
-                            'symbol': etf,
-                            'apikey': self.alpha_vantage_key
-                        }
-                        response = await client.get(url, params=params)
-                        data = response.json()
-                        
-                        if 'Global Quote' in data:
-                            sector_data[etf] = data['Global Quote']
-                    except Exception as e:
-                        logger.warning(f"Error fetching {etf}: {e}")
+            async def fetch_etf(etf: str):
+                try:
+                    url = f"{settings.ALPHA_VANTAGE_BASE_URL}/query"
+                    params = {
+                        'function': 'GLOBAL_QUOTE',
+                        'symbol': etf,
+                        'apikey': self.alpha_vantage_key
+                    }
+                    data = await self._fetch_json(ALPHA_VANTAGE, url, params, PRIORITY_REFRESH)
+                    
+                    if 'Global Quote' in data:
+                        await self._persist_quote(etf, data['Global Quote'])
+                        return etf, data['Global Quote']
+                except Exception as e:
+                    logger.warning(f"Error fetching {etf}: {e}")
+                return etf, None
+            
+            # All ETFs are queued at once; the scheduler spaces them to fit the quota
+            results = await asyncio.gather(*(fetch_etf(etf) for etf in missing))
+            sector_data.update({etf: quote for etf, quote in results if quote})
             
             return sector_data if sector_data else self._get_demo_sector_performance()
             
@@ -90,21 +147,24 @@ class MarketDataProvider:
             return self._get_demo_stock_quote(ticker)
         
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                url = f"https://www.alphavantage.co/query"
-                params = {
-                    'function': 'GLOBAL_QUOTE',
-                    'symbol': ticker,
-                    'apikey': self.alpha_vantage_key
-                }
-                response = await client.get(url, params=params)
-                data = response.json()
+            stored = await asyncio.to_thread(market_data_store.load, market_data_store.QUOTE, ticker)
+            if stored:
+                return stored
+            
+            url = f"{settings.ALPHA_VANTAGE_BASE_URL}/query"
+            params = {
+                'function': 'GLOBAL_QUOTE',
+                'symbol': ticker,
+                'apikey': self.alpha_vantage_key
+            }
+            data = await self._fetch_json(ALPHA_VANTAGE, url, params, PRIORITY_INTERACTIVE)
+            
+            if 'Global Quote' in data:
+                await self._persist_quote(ticker, data['Global Quote'])
+                return data['Global Quote']
+            else:
+                return self._get_demo_stock_quote(ticker)
                 
-                if 'Global Quote' in data:
-                    return data['Global Quote']
-                else:
-                    return self._get_demo_stock_quote(ticker)
-                    
         except Exception as e:
             logger.error(f"Error fetching quote for {ticker}: {e}")
             return self._get_demo_stock_quote(ticker)
@@ -128,21 +188,32 @@ class MarketDataProvider:
             return self._get_demo_company_overview(ticker)
         
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                url = f"https://www.alphavantage.co/query"
-                params = {
-                    'function': 'OVERVIEW',
-                    'symbol': ticker,
-                    'apikey': self.alpha_vantage_key
-                }
-                response = await client.get(url, params=params)
-                data = response.json()
+            stored = await asyncio.to_thread(market_data_store.load, market_data_store.OVERVIEW, ticker)
+            if stored:
+                return stored
+            
+            url = f"{settings.ALPHA_VANTAGE_BASE_URL}/query"
+            params = {
+                'function': 'OVERVIEW',
+                'symbol': ticker,
+                'apikey': self.alpha_vantage_key
+            }
+            data = await self._fetch_json(ALPHA_VANTAGE, url, params, PRIORITY_INTERACTIVE)
+            
+            if data and 'Symbol' in data:
+                market_cap = market_data_store.to_float(data.get('MarketCapitalization'))
+                await asyncio.to_thread(
+                    market_data_store.save,
+                    market_data_store.OVERVIEW,
+                    ticker,
+                    data,
+                    market_cap=int(market_cap) if market_cap is not None else None,
+                    pe_ratio=market_data_store.to_float(data.get('PERatio'))
+                )
+                return data
+            else:
+                return self._get_demo_company_overview(ticker)
                 
-                if data and 'Symbol' in data:
-                    return data
-                else:
-                    return self._get_demo_company_overview(ticker)
-                    
         except Exception as e:
             logger.error(f"Error fetching overview for {ticker}: {e}")
             return self._get_demo_company_overview(ticker)
@@ -194,33 +265,50 @@ class MarketDataProvider:
             return self._get_demo_economic_indicators()
         
         try:
-            indicators = {}
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                # Fetch key indicators from FRED
-                fred_series = {
-                    'gdp': 'GDP',
-                    'cpi': 'CPIAUCSL',
-                    'unemployment': 'UNRATE',
-                    'fed_funds': 'FEDFUNDS'
-                }
-                
-                for key, series_id in fred_series.items():
-                    try:
-                        url = f"https://api.stlouisfed.org/fred/series/observations"
-                        params = {
-                            'series_id': series_id,
-                            'api_key': self.fred_key,
-                            'file_type': 'json',
-                            'limit': 1,
-                            'sort_order': 'desc'
-                        }
-                        response = await client.get(url, params=params)
-                        data = response.json()
-                        
-                        if 'observations' in data and data['observations']:
-                            indicators[key] = data['observations'][0]['value']
-                    except Exception as e:
-                        logger.warning(f"Error fetching {series_id}: {e}")
+            # Fetch key indicators from FRED
+            fred_series = {
+                'gdp': 'GDP',
+                'cpi': 'CPIAUCSL',
+                'unemployment': 'UNRATE',
+                'fed_funds': 'FEDFUNDS'
+            }
+            
+            stored = await asyncio.to_thread(
+                market_data_store.load_many, market_data_store.FRED, list(fred_series.values())
+            )
+            
+            async def fetch_series(key: str, series_id: str):
+                if series_id in stored:
+                    return key, stored[series_id]['value']
+                try:
+                    url = f"{settings.FRED_BASE_URL}/fred/series/observations"
+                    params = {
+                        'series_id': series_id,
+                        'api_key': self.fred_key,
+                        'file_type': 'json',
+                        'limit': 1,
+                        'sort_order': 'desc'
+                    }
+                    data = await self._fetch_json(FRED, url, params, PRIORITY_REFRESH)
+                    
+                    if 'observations' in data and data['observations']:
+                        observation = data['observations'][0]
+                        await asyncio.to_thread(
+                            market_data_store.save,
+                            market_data_store.FRED,
+                            series_id,
+                            observation,
+                            data_date=date.fromisoformat(observation['date']) if observation.get('date') else None
+                        )
+                        return key, observation['value']
+                except Exception as e:
+                    logger.warning(f"Error fetching {series_id}: {e}")
+                return key, None
+            
+            results = await asyncio.gather(
+                *(fetch_series(key, series_id) for key, series_id in fred_series.items())
+            )
+            indicators = {key: value for key, value in results if value is not None}
             
             return indicators if indicators else self._get_demo_economic_indicators()
             
@@ -4,8 +4,20 @@ Provides realistic sample data when API keys are not configured.
 This ensures the platform works out-of-the-box for demonstration purposes.
 
 The demo data represents a late-cycle expansion scenario with rising rates.
+
+Each dataset is built once, on first use, and the same objects are returned
+on every later call (like published snapshots), so demo mode doesn't
+re-validate hundreds of models per request. The returned snapshots are
+immutable: lists (including list fields) raise TypeError on in-place
+changes and models are frozen, so a caller can't alter what later callers
+see. Derive new values instead (sorted, slicing, list(...), model_copy(update=...)).
+Timestamps come from demo_data_as_of(), the time this process first built
+the demo data, rather than the time of each call.
 """
 from datetime import datetime
+from functools import lru_cache, wraps
+from typing import Any, Callable, Dict, Type
+from pydantic import BaseModel, ConfigDict
 from app.models.schemas import (
     SectorAnalysis, MacroSnapshot, StockRecommendation, 
     GeopoliticalRisk, PortfolioAllocation, Outlook, 
@@ -13,6 +25,59 @@ from app.models.schemas import (
 )
 
 
+class ReadOnlyList(list):
+    """A list that refuses in-place changes (still serializes and compares as a list)"""
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("Demo data is shared and read-only; copy it before changing it")
+
+    append = extend = insert = pop = remove = clear = sort = reverse = _read_only
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _read_only
+
+    def __reduce__(self):
+        return ReadOnlyList, (list(self),)
+
+
+# Schema model -> frozen subclass used for its demo instances
+_frozen_models: Dict[Type[BaseModel], Type[BaseModel]] = {}
+
+
+def _frozen_model(model: Type[BaseModel]) -> Type[BaseModel]:
+    if model not in _frozen_models:
+        _frozen_models[model] = type(model.__name__, (model,), {
+            "model_config": ConfigDict(frozen=True),
+            "__module__": __name__,
+            "__doc__": model.__doc__,
+        })
+    return _frozen_models[model]
+
+
+def _freeze(value: Any) -> Any:
+    """Deep read-only copy of already validated demo data (no re-validation)"""
+    if isinstance(value, list):
+        return ReadOnlyList(_freeze(item) for item in value)
+    if isinstance(value, BaseModel):
+        fields = {name: _freeze(getattr(value, name)) for name in type(value).model_fields}
+        return _frozen_model(type(value)).model_construct(_fields_set=value.model_fields_set, **fields)
+    return value
+
+
+def _snapshot(build: Callable) -> Callable:
+    """Freezes what build returns; stack under lru_cache so it runs once per argument"""
+    @wraps(build)
+    def frozen(*args, **kwargs):
+        return _freeze(build(*args, **kwargs))
+    return frozen
+
+
+@lru_cache(maxsize=None)
+def demo_data_as_of() -> datetime:
+    """When the demo dataset was built (first use in this process)"""
+    return datetime.now()
+
+
+@lru_cache(maxsize=None)
+@_snapshot
 def get_demo_macro_snapshot() -> MacroSnapshot:
     """
     Returns a realistic macro snapshot representing late-cycle expansion.
@@ -29,10 +94,12 @@ def get_demo_macro_snapshot() -> MacroSnapshot:
         dollar_index=103.2,
         oil_price=82.5,
         economic_cycle_phase=EconomicCycle.PEAK,
-        last_updated=datetime.now()
+        last_updated=demo_data_as_of()
     )
 
 
+@lru_cache(maxsize=None)
+@_snapshot
 def get_demo_sector_analyses() -> list[SectorAnalysis]:
     """
     Returns comprehensive sector analyses for all 11 GICS sectors.
@@ -279,6 +346,8 @@ def get_demo_sector_analyses() -> list[SectorAnalysis]:
     ]
 
 
+@lru_cache(maxsize=None)
+@_snapshot
 def get_demo_stock_recommendations() -> list[StockRecommendation]:
     """
     Returns 20 detailed stock recommendations across sectors.
@@ -673,6 +742,8 @@ def get_demo_stock_recommendations() -> list[StockRecommendation]:
     ]
 
 
+@lru_cache(maxsize=None)
+@_snapshot
 def get_demo_geopolitical_risks() -> list[GeopoliticalRisk]:
     """
     Returns current geopolitical risk assessments affecting markets
@@ -716,6 +787,8 @@ def get_demo_geopolitical_risks() -> list[GeopoliticalRisk]:
     ]
 
 
+@lru_cache(maxsize=8)
+@_snapshot
 def get_demo_portfolio_allocation(risk_tolerance: str) -> list[PortfolioAllocation]:
     """
     Returns recommended portfolio allocation based on risk tolerance.
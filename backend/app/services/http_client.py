@@ -0,0 +1,141 @@
+"""
+Shared HTTP client for upstream market data APIs (Alpha Vantage, FRED).
+
+One pooled httpx.AsyncClient is created in main.lifespan and reused by every
+MarketDataProvider call, so TCP/TLS connections stay alive between requests
+instead of being re-established per call.
+"""
+import time
+import httpx
+from typing import Optional, Dict, Any
+import logging
+from app.config import settings
+from app.services import metrics
+
+logger = logging.getLogger(__name__)
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+class ConnectionStats:
+    """Counts requests per provider and how many of them opened a new connection"""
+
+    def __init__(self):
+        self.requests = 0
+        self.new_connections = 0
+
+    @property
+    def reused_connections(self) -> int:
+        return self.requests - self.new_connections
+
+    @property
+    def reuse_ratio(self) -> float:
+        return self.reused_connections / self.requests if self.requests else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "new_connections": self.new_connections,
+            "reused_connections": self.reused_connections,
+            "reuse_ratio": round(self.reuse_ratio, 3)
+        }
+
+
+_connection_stats: Dict[str, ConnectionStats] = {}
+
+
+def _http2_available() -> bool:
+    """HTTP/2 needs the optional 'h2' package (installed via httpx[http2])"""
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _create_client(transport: Optional[httpx.AsyncBaseTransport] = None) -> httpx.AsyncClient:
+    http2 = settings.HTTP2_ENABLED and _http2_available()
+    logger.info(
+        f"Creating shared HTTP client (max_connections={settings.HTTP_MAX_CONNECTIONS}, http2={http2})"
+    )
+    return httpx.AsyncClient(
+        timeout=settings.HTTP_TIMEOUT,
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY
+        ),
+        transport=transport
+    )
+
+
+async def init_http_client(transport: Optional[httpx.AsyncBaseTransport] = None):
+    """
+    Create the shared client (called from main.lifespan).
+    transport replaces the network, e.g. an httpx.MockTransport serving
+    offline fakes in benchmarks; it must be set before the lifespan runs.
+    """
+    global _client
+    if _client is None:
+        _client = _create_client(transport)
+
+
+async def close_http_client():
+    """Close the shared client and release pooled connections"""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+        logger.info(f"Upstream connection stats: {get_connection_stats()}")
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Returns the shared client.
+    Created lazily when used outside the app lifespan (scripts, shell).
+    """
+    global _client
+    if _client is None:
+        _client = _create_client()
+    return _client
+
+
+async def get(provider: str, url: str, params: Dict[str, Any]) -> httpx.Response:
+    """
+    Issues a GET through the shared client and records whether the request
+    reused a pooled connection or had to open a new one, plus its latency
+    and outcome in metrics.
+    """
+    opened_connection = False
+
+    async def trace(event_name: str, info: Dict[str, Any]):
+        nonlocal opened_connection
+        if event_name == "connection.connect_tcp.started":
+            opened_connection = True
+
+    started = time.perf_counter()
+    try:
+        response = await get_http_client().get(url, params=params, extensions={"trace": trace})
+    except Exception:
+        metrics.record_upstream_call(provider, time.perf_counter() - started, metrics.ERROR)
+        raise
+    if response.status_code == 429:
+        outcome = metrics.THROTTLED
+    elif response.status_code >= 400:
+        outcome = metrics.ERROR
+    else:
+        outcome = metrics.OK
+    metrics.record_upstream_call(provider, time.perf_counter() - started, outcome)
+
+    stats = _connection_stats.setdefault(provider, ConnectionStats())
+    stats.requests += 1
+    if opened_connection:
+        stats.new_connections += 1
+
+    return response
+
+
+def get_connection_stats() -> Dict[str, Dict[str, Any]]:
+    """Connection reuse metrics per upstream provider"""
+    return {provider: stats.as_dict() for provider, stats in _connection_stats.items()}
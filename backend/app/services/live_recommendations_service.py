@@ -10,17 +10,43 @@ Falls back to demo data if:
 import os
 import time
 import logging
-from typing import List
+import threading
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from app.config import settings
 from app.models.schemas import StockRecommendation, Recommendation
-from app.services.market_data_service import fetch_stock_data, WATCHLIST
-from app.services.ai_analysis_service import analyze_stock_with_ai
-from app.services import demo_data
+from app.services.market_data_service import fetch_stock_data, fetch_watchlist_prices, WATCHLIST
+from app.services.ai_analysis_service import analyze_stock_with_ai_async, close_client
+from app.services import demo_data, snapshots, metrics, refresh_trace
 
 logger = logging.getLogger(__name__)
 
-_cached_recommendations: List[StockRecommendation] = []
-_cache_timestamp: float = 0
 CACHE_TTL_SECONDS = 3600  # 1 hour cache
+SNAPSHOT_CACHE = "recommendations_snapshot"  # cache label in metrics
+
+# Set by the background refresher; handlers then only read published snapshots
+_background_refresh = False
+
+# Incremental mode: ticker -> (inputs the last AI analysis was run on, resulting recommendation)
+_last_analysis: Dict[str, Tuple[dict, StockRecommendation]] = {}
+
+# Single-flight: only one refresh runs at a time; concurrent callers coalesce onto it.
+# Async callers share _refresh_task; the lock also covers blocking callers in other threads.
+_refresh_task: Optional[asyncio.Task] = None
+_refresh_lock = threading.Lock()
+_stats_lock = threading.Lock()
+_refresh_stats = {
+    "refreshes": 0,          # refreshes actually run
+    "coalesced_waiters": 0,  # callers that waited on another caller's refresh
+    "stale_served": 0,       # callers served the previous snapshot during a refresh
+}
+
+# Shared yfinance fetch pool (threads start on first use and are reused across refreshes)
+_fetch_pool = ThreadPoolExecutor(
+    max_workers=max(1, settings.YFINANCE_MAX_CONCURRENCY),
+    thread_name_prefix="yfinance"
+)
 
 RECOMMENDATION_MAP = {
     "STRONG_BUY": Recommendation.STRONG_BUY,
@@ -31,7 +57,7 @@ RECOMMENDATION_MAP = {
 }
 
 
-def _is_live_mode() -> bool:
+def is_live_mode() -> bool:
     if os.getenv("USE_DEMO_DATA", "").lower() == "true":
         return False
     if not os.getenv("OPENAI_API_KEY"):
@@ -68,61 +94,354 @@ def _build_recommendation(stock_data: dict, ai_result: dict) -> StockRecommendat
     )
 
 
-def get_live_recommendations(tickers: list = None) -> List[StockRecommendation]:
+def _pct_change(old, new) -> Optional[float]:
+    """Absolute % change between two values; None if either is missing or old is zero"""
+    try:
+        old, new = float(old), float(new)
+    except (TypeError, ValueError):
+        return None
+    if old == 0:
+        return None
+    return abs(new - old) / abs(old) * 100
+
+
+def _is_material_change(previous: dict, current: dict) -> bool:
     """
-    Fetches live market data and runs AI analysis for each ticker.
-    Results are cached for CACHE_TTL_SECONDS.
-    Falls back to demo data on any failure or if not in live mode.
+    True if a ticker's inputs moved enough since its last AI analysis to
+    warrant a new one (thresholds from REANALYSIS_* settings).
+    """
+    price_move = _pct_change(previous.get("current_price"), current.get("current_price"))
+    if price_move is None or price_move > settings.REANALYSIS_PRICE_CHANGE_PCT:
+        return True
+
+    if (previous.get("pe_ratio") is None) != (current.get("pe_ratio") is None):
+        return True
+    pe_move = _pct_change(previous.get("pe_ratio"), current.get("pe_ratio"))
+    if pe_move is not None and pe_move > settings.REANALYSIS_PE_CHANGE_PCT:
+        return True
+
+    target_move = _pct_change(previous.get("target_mean_price"), current.get("target_mean_price"))
+    if target_move is not None and target_move > settings.REANALYSIS_TARGET_CHANGE_PCT:
+        return True
+
+    # New analyst coverage or a consensus change
+    return (
+        previous.get("analyst_count") != current.get("analyst_count")
+        or previous.get("analyst_recommendation") != current.get("analyst_recommendation")
+    )
+
+
+def _reprice_recommendation(rec: StockRecommendation, current_price: float) -> StockRecommendation:
+    """Reuses a previous recommendation with price-dependent fields recomputed locally"""
+    upside_pct = ((rec.fair_value_estimate - current_price) / current_price) * 100
+    return rec.model_copy(update={
+        "current_price": current_price,
+        "upside_potential_pct": round(upside_pct, 1),
+    })
+
+
+async def _run_ingestion_pipeline(
+    ticker_list: list,
+    incremental: bool = False,
+    trace: Optional[refresh_trace.RefreshTrace] = None
+) -> List[StockRecommendation]:
+    """
+    Fetches and analyzes tickers concurrently, with a bound per upstream.
+
+    Each ticker runs as its own task: a yfinance fetch in the shared pool of
+    YFINANCE_MAX_CONCURRENCY workers, then an async GPT-4o call capped at
+    OPENAI_MAX_CONCURRENCY in flight. Fetches for later tickers therefore
+    overlap with analyses of earlier ones. Results keep the order of ticker_list.
+
+    With SPLIT_INGESTION, prices for all tickers come from one batched
+    download and per-ticker fetches only refresh stale fundamentals.
+
+    With incremental=True, a ticker is only re-analyzed if its inputs changed
+    materially since its last analysis (see _is_material_change); otherwise
+    the previous recommendation is repriced and reused.
+
+    Each stage is timed per ticker into trace (see refresh_trace).
+    """
+    loop = asyncio.get_running_loop()
+    if trace is None:
+        trace = refresh_trace.RefreshTrace(len(ticker_list), incremental)
+    counts = {"analyzed": 0, "reused": 0}
+
+    prices = {}
+    if settings.SPLIT_INGESTION:
+        with trace.stage("prices"):
+            prices = await loop.run_in_executor(_fetch_pool, fetch_watchlist_prices, ticker_list)
+
+    async def process(ticker: str) -> Optional[StockRecommendation]:
+        with trace.ticker(ticker) as ticker_trace:
+            try:
+                with refresh_trace.span(refresh_trace.FETCH):
+                    stock_data = await loop.run_in_executor(
+                        _fetch_pool, fetch_stock_data, ticker, prices.get(ticker)
+                    )
+                if not stock_data:
+                    ticker_trace.status = "no_data"
+                    logger.warning(f"Skipping {ticker}: no market data")
+                    return None
+
+                previous = _last_analysis.get(ticker)
+                if incremental and previous and not _is_material_change(previous[0], stock_data):
+                    counts["reused"] += 1
+                    ticker_trace.status = "reused"
+                    with refresh_trace.span(refresh_trace.BUILD):
+                        return _reprice_recommendation(previous[1], stock_data["current_price"])
+
+                counts["analyzed"] += 1
+                ai_result = await analyze_stock_with_ai_async(stock_data)
+                if not ai_result:
+                    ticker_trace.status = "ai_failed"
+                    logger.warning(f"Skipping {ticker}: AI analysis failed")
+                    return None
+
+                with refresh_trace.span(refresh_trace.BUILD):
+                    rec = _build_recommendation(stock_data, ai_result)
+                ticker_trace.status = "analyzed"
+            except Exception as e:
+                ticker_trace.status = "error"
+                logger.error(f"Error processing {ticker}: {e}")
+                return None
+
+        _last_analysis[ticker] = (stock_data, rec)
+        logger.info(f"✓ {ticker}: {rec.recommendation} (conviction={rec.conviction_score})")
+        return rec
+
+    results = await asyncio.gather(*(process(ticker) for ticker in ticker_list))
+
+    if incremental:
+        logger.info(f"Incremental refresh: {counts['analyzed']} re-analyzed, {counts['reused']} reused")
+    return [rec for rec in results if rec is not None]
+
+
+def _run_blocking(coro):
+    """
+    Runs a coroutine to completion from synchronous code. If this thread
+    already runs an event loop, the coroutine gets its own loop in a helper thread.
+    The OpenAI client created for that loop is closed before the loop ends.
+    """
+    async def run_and_close():
+        try:
+            return await coro
+        finally:
+            await close_client()
+
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(run_and_close())
+
+    with ThreadPoolExecutor(max_workers=1) as runner:
+        return runner.submit(asyncio.run, run_and_close()).result()
+
+
+def _latest_snapshot() -> Optional[snapshots.Snapshot]:
+    return snapshots.get(snapshots.RECOMMENDATIONS)
+
+
+def _cache_is_fresh() -> bool:
+    snapshot = _latest_snapshot()
+    return snapshot is not None and snapshot.age_seconds() < CACHE_TTL_SECONDS
+
+
+def _count(stat: str):
+    with _stats_lock:
+        _refresh_stats[stat] += 1
+
+
+def set_background_refresh(enabled: bool):
+    """Switches handlers to stale-while-revalidate serving of published snapshots"""
+    global _background_refresh
+    _background_refresh = enabled
+
+
+def _wait_for_refresh():
+    """Blocks until the running refresh releases _refresh_lock, without keeping it"""
+    with _refresh_lock:
+        pass
+
+
+async def _refresh(tickers: Optional[list], force: bool, incremental: Optional[bool]) -> List[StockRecommendation]:
     """
-    global _cached_recommendations, _cache_timestamp
+    Body of one refresh. Holds _refresh_lock for its duration, so a refresh
+    started from another thread (blocking callers) is coalesced as well.
+    """
+    if not _refresh_lock.acquire(blocking=False):
+        # A blocking refresh in another thread is running; wait for it off the loop.
+        # The worker thread releases the lock itself, so a cancelled waiter can't leak it.
+        version_before = snapshots.data_version()
+        _count("coalesced_waiters")
+        while True:
+            await asyncio.to_thread(_wait_for_refresh)
+            snapshot = _latest_snapshot()
+            if snapshot and snapshot.version > version_before:
+                return snapshot.data
+            if _refresh_lock.acquire(blocking=False):
+                break
+
+    try:
+        # A refresh may have completed between the caller's check and the lock
+        if not force and _cache_is_fresh():
+            return _latest_snapshot().data
+
+        _count("refreshes")
+        ticker_list = tickers or WATCHLIST
+        if incremental is None:
+            incremental = settings.INCREMENTAL_REANALYSIS
+        started = time.perf_counter()
+        trace = refresh_trace.RefreshTrace(len(ticker_list), incremental)
+        try:
+            results = await _run_ingestion_pipeline(ticker_list, incremental=incremental, trace=trace)
+        except BaseException:
+            trace.finish("error")
+            raise
+        metrics.refresh_duration.observe(time.perf_counter() - started, snapshot=snapshots.RECOMMENDATIONS)
+
+        if not results:
+            trace.finish("empty")
+            snapshot = _latest_snapshot()
+            if snapshot:
+                logger.warning("No live recommendations generated; keeping previous snapshot")
+                return snapshot.data
+            logger.warning("No live recommendations generated; falling back to demo data")
+            return demo_data.get_demo_stock_recommendations()
+
+        trace.finish("published")
+        snapshots.publish(snapshots.RECOMMENDATIONS, results)
+        logger.info(f"Generated {len(results)} live recommendations")
+        return results
+    finally:
+        _refresh_lock.release()
 
-    if not _is_live_mode():
+
+async def refresh_live_recommendations_async(
+    tickers: list = None,
+    force: bool = True,
+    incremental: Optional[bool] = None
+) -> List[StockRecommendation]:
+    """
+    Runs the ingestion pipeline and publishes the result as the new
+    recommendations snapshot. Returns the latest snapshot's data.
+
+    Only one refresh runs at a time; a caller arriving during a refresh awaits
+    the same task and shares its result. With force=False the refresh is skipped if
+    the snapshot is still within CACHE_TTL_SECONDS. incremental defaults to
+    INCREMENTAL_REANALYSIS.
+    If the pipeline produces nothing, the previous snapshot is kept.
+    """
+    global _refresh_task
+    task = _refresh_task
+    if task is not None and not task.done() and task.get_loop() is asyncio.get_running_loop():
+        _count("coalesced_waiters")
+        return await asyncio.shield(task)
+
+    task = asyncio.ensure_future(_refresh(tickers, force, incremental))
+    _refresh_task = task
+    # Shielded so a cancelled caller (client disconnect) doesn't abort the shared refresh
+    return await asyncio.shield(task)
+
+
+def refresh_live_recommendations(
+    tickers: list = None,
+    force: bool = True,
+    incremental: Optional[bool] = None
+) -> List[StockRecommendation]:
+    """Blocking variant of refresh_live_recommendations_async, for scripts and threads"""
+    return _run_blocking(refresh_live_recommendations_async(tickers, force, incremental))
+
+
+def _serve_without_refresh() -> Optional[List[StockRecommendation]]:
+    """
+    Returns recommendations if they can be served without running a refresh
+    (demo mode, background refresher active, fresh or in-flight snapshot), else None.
+    """
+    if not is_live_mode():
         logger.info("Using demo data (live mode disabled or OPENAI_API_KEY not set)")
         return demo_data.get_demo_stock_recommendations()
 
+    snapshot = _latest_snapshot()
+
+    if _background_refresh:
+        if snapshot:
+            metrics.record_cache_lookup(SNAPSHOT_CACHE, metrics.HIT)
+            return snapshot.data
+        metrics.record_cache_lookup(SNAPSHOT_CACHE, metrics.MISS)
+        logger.info("First background refresh still running; serving demo data")
+        return demo_data.get_demo_stock_recommendations()
+
     # Return cached if fresh
-    if _cached_recommendations and (time.time() - _cache_timestamp) < CACHE_TTL_SECONDS:
-        logger.info(f"Returning {len(_cached_recommendations)} cached live recommendations")
-        return _cached_recommendations
+    if _cache_is_fresh():
+        metrics.record_cache_lookup(SNAPSHOT_CACHE, metrics.HIT)
+        logger.info(f"Returning {len(snapshot.data)} cached live recommendations")
+        return snapshot.data
 
-    ticker_list = tickers or WATCHLIST
-    results: List[StockRecommendation] = []
+    if snapshot and _refresh_lock.locked():
+        # Another caller is already refreshing: serve the stale snapshot
+        _count("stale_served")
+        metrics.record_cache_lookup(SNAPSHOT_CACHE, metrics.STALE)
+        return snapshot.data
+
+    metrics.record_cache_lookup(SNAPSHOT_CACHE, metrics.MISS)
+    return None
+
+
+def needs_refresh() -> bool:
+    """
+    True if serving recommendations right now would run an inline refresh
+    (live mode without the background refresher, and the snapshot is
+    missing or expired with no refresh already in flight).
+    """
+    if not is_live_mode() or _background_refresh or _cache_is_fresh():
+        return False
+    return not (_latest_snapshot() and _refresh_lock.locked())
+
+
+async def get_live_recommendations_async(tickers: list = None) -> List[StockRecommendation]:
+    """
+    Fetches live market data and runs AI analysis for each ticker.
+    Fetch and analysis run concurrently, bounded by YFINANCE_MAX_CONCURRENCY
+    and OPENAI_MAX_CONCURRENCY. Results are cached for CACHE_TTL_SECONDS.
+    Only one refresh runs at a time: while it is in flight, other callers get
+    the previous snapshot if there is one, otherwise they wait for it.
+    When the background refresher is running, this never refreshes inline:
+    it returns the latest published snapshot (demo data until the first one).
+    Falls back to demo data on any failure or if not in live mode.
+
+    Safe to await from request handlers: blocking fetches run in executor
+    threads, so the event loop keeps serving other requests during a refresh.
+    """
+    recommendations = _serve_without_refresh()
+    if recommendations is not None:
+        return recommendations
+    return await refresh_live_recommendations_async(tickers, force=False)
+
+
+def get_live_recommendations(tickers: list = None) -> List[StockRecommendation]:
+    """
+    Blocking variant of get_live_recommendations_async, for scripts and threads.
+    Blocks the calling thread for the duration of a refresh if one is needed.
+    """
+    recommendations = _serve_without_refresh()
+    if recommendations is not None:
+        return recommendations
+    return refresh_live_recommendations(tickers, force=False)
 
-    for ticker in ticker_list:
-        try:
-            stock_data = fetch_stock_data(ticker)
-            if not stock_data:
-                logger.warning(f"Skipping {ticker}: no market data")
-                continue
-
-            ai_result = analyze_stock_with_ai(stock_data)
-            if not ai_result:
-                logger.warning(f"Skipping {ticker}: AI analysis failed")
-                continue
-
-            rec = _build_recommendation(stock_data, ai_result)
-            results.append(rec)
-            logger.info(f"✓ {ticker}: {rec.recommendation} (conviction={rec.conviction_score})")
-        except Exception as e:
-            logger.error(f"Error processing {ticker}: {e}")
-            continue
-
-    if not results:
-        logger.warning("No live recommendations generated; falling back to demo data")
-        return demo_data.get_demo_stock_recommendations()
 
-    _cached_recommendations = results
-    _cache_timestamp = time.time()
-    logger.info(f"Generated {len(results)} live recommendations")
-    return results
+def get_refresh_stats() -> dict:
+    """Single-flight counters for the live recommendation refresh"""
+    with _stats_lock:
+        return dict(_refresh_stats)
 
 
-def get_screaming_buys() -> List[StockRecommendation]:
+async def get_screaming_buys() -> List[StockRecommendation]:
     """
     Returns only the highest-conviction buy opportunities (conviction >= 80,
     recommendation is STRONG_BUY or BUY, upside > 10%).
     """
-    all_recs = get_live_recommendations()
+    all_recs = await get_live_recommendations_async()
     screaming = [
         r for r in all_recs
         if r.conviction_score >= 80
@@ -1,10 +1,24 @@
 """
 Market Data Service - Fetches live stock data from Yahoo Finance (yfinance).
 No API key required. Falls back gracefully if data is unavailable.
+
+Prices and fundamentals are ingested separately: prices for the whole
+watchlist come from one batched yf.download, while the heavy per-ticker
+.info call (P/E, PEG, ROE, description...) is cached for
+FUNDAMENTALS_REFRESH_INTERVAL. Both are persisted via market_data_store
+and read back from the database before going upstream.
+
+yfinance (and pandas with it) is imported inside the fetch functions, so
+it only loads once live mode actually fetches data. With YFINANCE_BASE_URL
+set, both calls go to a local stand-in (benchmarks/standin.py) instead.
 """
-import yfinance as yf
+import time
 import logging
-from typing import Optional
+from datetime import date
+from typing import Optional, Dict, List, Tuple
+import httpx
+from app.config import settings
+from app.services import market_data_store, metrics
 
 logger = logging.getLogger(__name__)
 
@@ -37,46 +51,221 @@ WATCHLIST = [
 
 MAX_DESCRIPTION_LENGTH = 500
 
+# ticker -> (fetched_at, fundamentals dict); fundamentals include the price they were read at
+_fundamentals_cache: Dict[str, Tuple[float, dict]] = {}
+
+
+def _download_latest_closes(tickers: List[str]) -> Dict[str, Tuple[float, date]]:
+    """Latest daily close per ticker via one batched yf.download"""
+    import yfinance as yf
+    frame = yf.download(
+        tickers,
+        period="5d",
+        interval="1d",
+        group_by="ticker",
+        auto_adjust=False,
+        threads=True,
+        progress=False
+    )
+    if frame is None or frame.empty:
+        return {}
+
+    closes_by_ticker = {}
+    for ticker in tickers:
+        try:
+            if frame.columns.nlevels > 1:
+                closes = frame[ticker]["Close"].dropna()
+            else:
+                closes = frame["Close"].dropna()
+        except KeyError:
+            continue
+        if not closes.empty:
+            closes_by_ticker[ticker] = (float(closes.iloc[-1]), closes.index[-1].date())
+    return closes_by_ticker
+
+
+def _standin_latest_closes(tickers: List[str]) -> Dict[str, Tuple[float, date]]:
+    """Latest daily close per ticker from the stand-in at YFINANCE_BASE_URL"""
+    response = httpx.get(
+        f"{settings.YFINANCE_BASE_URL}/download",
+        params={"tickers": ",".join(tickers), "period": "5d", "interval": "1d"},
+        timeout=settings.HTTP_TIMEOUT
+    )
+    response.raise_for_status()
+    return {
+        ticker: (float(row["close"]), date.fromisoformat(row["date"]))
+        for ticker, row in response.json().items()
+    }
+
+
+def _fetch_info(ticker: str) -> dict:
+    """yfinance .info payload, from Yahoo or the stand-in at YFINANCE_BASE_URL"""
+    if settings.YFINANCE_BASE_URL:
+        response = httpx.get(f"{settings.YFINANCE_BASE_URL}/info/{ticker}", timeout=settings.HTTP_TIMEOUT)
+        response.raise_for_status()
+        return response.json()
+
+    import yfinance as yf
+    return yf.Ticker(ticker).info
+
+
+def _failure_outcome(error: Exception) -> str:
+    """Metrics outcome for a failed yfinance call: Yahoo / stand-in throttling or any other error"""
+    if isinstance(error, httpx.HTTPStatusError) and error.response.status_code == 429:
+        return metrics.THROTTLED
+    if "RateLimit" in type(error).__name__:
+        return metrics.THROTTLED
+    return metrics.ERROR
+
 
-def fetch_stock_data(ticker: str) -> Optional[dict]:
+def fetch_watchlist_prices(tickers: List[str]) -> Dict[str, float]:
     """
-    Fetches fundamental and price data for a ticker via yfinance.
-    Returns a dict with all fields needed to generate a recommendation,
-    or None if the fetch fails.
+    Fetches the latest price for every ticker with a single batched
+    yf.download call, instead of one .info request per symbol.
+    Returns {ticker: price}; tickers without data are omitted.
+    """
+    if not tickers:
+        return {}
+
+    stored = market_data_store.load_many(market_data_store.PRICE, tickers)
+    prices = {ticker: payload["price"] for ticker, payload in stored.items()}
+    missing = [ticker for ticker in tickers if ticker not in prices]
+    if not missing:
+        return prices
+
+    started = time.perf_counter()
+    try:
+        if settings.YFINANCE_BASE_URL:
+            closes = _standin_latest_closes(missing)
+        else:
+            closes = _download_latest_closes(missing)
+    except Exception as e:
+        metrics.record_upstream_call(metrics.YFINANCE, time.perf_counter() - started, _failure_outcome(e))
+        logger.warning(f"Batched price download failed: {e}")
+        return prices
+    metrics.record_upstream_call(metrics.YFINANCE, time.perf_counter() - started)
+
+    for ticker, (price, data_date) in closes.items():
+        prices[ticker] = price
+        market_data_store.save(
+            market_data_store.PRICE,
+            ticker,
+            {"price": price},
+            price=price,
+            data_date=data_date
+        )
+
+    logger.info(
+        f"Prices: {len(stored)} from store, {len(prices) - len(stored)}/{len(missing)} from batched download"
+    )
+    return prices
+
+
+def _fundamentals_from_info(ticker: str, info: dict) -> Optional[dict]:
+    """Extracts the slow-moving fields from a yfinance .info payload"""
+    # Guard: skip if no price data
+    info_price = info.get("currentPrice") or info.get("regularMarketPrice")
+    if not info_price:
+        return None
+
+    return {
+        "ticker": ticker,
+        "company_name": info.get("longName", ticker),
+        "sector": info.get("sector", "Unknown"),
+        "info_price": float(info_price),
+        "target_mean_price": info.get("targetMeanPrice"),
+        "pe_ratio": info.get("trailingPE"),
+        "forward_pe": info.get("forwardPE"),
+        "peg_ratio": info.get("pegRatio"),
+        "dividend_yield": (info.get("dividendYield") or 0) * 100,  # convert to %
+        "market_cap_billions": (info.get("marketCap") or 0) / 1e9,
+        "52w_high": info.get("fiftyTwoWeekHigh"),
+        "52w_low": info.get("fiftyTwoWeekLow"),
+        "revenue_growth": info.get("revenueGrowth"),
+        "earnings_growth": info.get("earningsGrowth"),
+        "profit_margins": info.get("profitMargins"),
+        "debt_to_equity": info.get("debtToEquity"),
+        "return_on_equity": info.get("returnOnEquity"),
+        "beta": info.get("beta"),
+        "analyst_recommendation": info.get("recommendationKey", "hold"),
+        "analyst_count": info.get("numberOfAnalystOpinions", 0),
+        "short_ratio": info.get("shortRatio"),
+        "description": (info.get("longBusinessSummary") or "")[:MAX_DESCRIPTION_LENGTH],
+    }
+
+
+def fetch_fundamentals(ticker: str, max_age: Optional[float] = None) -> Optional[dict]:
     """
+    Returns slow-moving fundamentals for a ticker, calling yfinance .info
+    only when neither the in-process cache nor the database holds a copy
+    younger than max_age seconds (default FUNDAMENTALS_REFRESH_INTERVAL).
+    max_age=0 forces a fresh .info call.
+    """
+    if max_age is None:
+        max_age = settings.FUNDAMENTALS_REFRESH_INTERVAL
+
+    cached = _fundamentals_cache.get(ticker)
+    if cached and (time.time() - cached[0]) < max_age:
+        metrics.record_cache_lookup("fundamentals", metrics.HIT)
+        return cached[1]
+    if max_age > 0:
+        metrics.record_cache_lookup("fundamentals", metrics.STALE if cached else metrics.MISS)
+
+    if max_age > 0:
+        stored = market_data_store.load_timestamped(market_data_store.FUNDAMENTALS, ticker, max_age)
+        if stored:
+            # Keeps the row's fetch time, so it expires from memory when it would in the DB
+            _fundamentals_cache[ticker] = stored
+            return stored[1]
+
+    started = time.perf_counter()
+    try:
+        info = _fetch_info(ticker)
+    except Exception as e:
+        metrics.record_upstream_call(metrics.YFINANCE, time.perf_counter() - started, _failure_outcome(e))
+        logger.warning(f"Failed to fetch data for {ticker}: {e}")
+        return None
+    metrics.record_upstream_call(metrics.YFINANCE, time.perf_counter() - started)
+
     try:
-        stock = yf.Ticker(ticker)
-        info = stock.info
-
-        # Guard: skip if no price data
-        current_price = info.get("currentPrice") or info.get("regularMarketPrice")
-        if not current_price:
-            return None
-
-        return {
-            "ticker": ticker,
-            "company_name": info.get("longName", ticker),
-            "sector": info.get("sector", "Unknown"),
-            "current_price": float(current_price),
-            "target_mean_price": float(info.get("targetMeanPrice") or current_price),
-            "pe_ratio": info.get("trailingPE"),
-            "forward_pe": info.get("forwardPE"),
-            "peg_ratio": info.get("pegRatio"),
-            "dividend_yield": (info.get("dividendYield") or 0) * 100,  # convert to %
-            "market_cap_billions": (info.get("marketCap") or 0) / 1e9,
-            "52w_high": info.get("fiftyTwoWeekHigh"),
-            "52w_low": info.get("fiftyTwoWeekLow"),
-            "revenue_growth": info.get("revenueGrowth"),
-            "earnings_growth": info.get("earningsGrowth"),
-            "profit_margins": info.get("profitMargins"),
-            "debt_to_equity": info.get("debtToEquity"),
-            "return_on_equity": info.get("returnOnEquity"),
-            "beta": info.get("beta"),
-            "analyst_recommendation": info.get("recommendationKey", "hold"),
-            "analyst_count": info.get("numberOfAnalystOpinions", 0),
-            "short_ratio": info.get("shortRatio"),
-            "description": (info.get("longBusinessSummary") or "")[:MAX_DESCRIPTION_LENGTH],
-        }
+        fundamentals = _fundamentals_from_info(ticker, info)
     except Exception as e:
         logger.warning(f"Failed to fetch data for {ticker}: {e}")
         return None
+
+    if fundamentals:
+        _fundamentals_cache[ticker] = (time.time(), fundamentals)
+        market_data_store.save(
+            market_data_store.FUNDAMENTALS,
+            ticker,
+            fundamentals,
+            price=fundamentals["info_price"],
+            market_cap=int(fundamentals["market_cap_billions"] * 1e9) or None,
+            pe_ratio=market_data_store.to_float(fundamentals["pe_ratio"])
+        )
+    return fundamentals
+
+
+def fetch_stock_data(ticker: str, current_price: Optional[float] = None) -> Optional[dict]:
+    """
+    Fetches fundamental and price data for a ticker via yfinance.
+    Returns a dict with all fields needed to generate a recommendation,
+    or None if the fetch fails.
+
+    If current_price is given (e.g. from fetch_watchlist_prices), cached
+    fundamentals are reused and only the price-dependent fields are updated.
+    Otherwise a fresh .info call supplies both price and fundamentals.
+    """
+    fundamentals = fetch_fundamentals(ticker, max_age=None if current_price else 0)
+    if not fundamentals:
+        return None
+
+    stock_data = dict(fundamentals)
+    info_price = stock_data.pop("info_price")
+    price = float(current_price or info_price)
+
+    # Share count is slow-moving, so market cap tracks the fresh price
+    stock_data["market_cap_billions"] *= price / info_price
+    stock_data["current_price"] = price
+    stock_data["target_mean_price"] = float(stock_data["target_mean_price"] or price)
+    return stock_data
@@ -0,0 +1,168 @@
+"""
+Persistent market data cache backed by the market_data_cache table.
+
+Upstream quotes, company overviews, yfinance fundamentals and FRED
+observations are written to the app database and read back before any
+upstream call, so a restarted (or newly scaled-out) worker starts warm.
+Each field class has its own TTL.
+
+The store uses a synchronous engine on the same database as DB_URL,
+because its main callers (yfinance fetches) run in worker threads.
+Async callers wrap it in asyncio.to_thread.
+"""
+from datetime import datetime, date, timezone, timedelta
+from typing import Optional, Dict, Any, List, Tuple
+import logging
+from sqlalchemy import create_engine, select
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.models.db_models import MarketData
+from app.services import metrics
+
+logger = logging.getLogger(__name__)
+
+# Field classes
+PRICE = "price"                # yfinance batched price
+QUOTE = "quote"                # Alpha Vantage GLOBAL_QUOTE
+OVERVIEW = "overview"          # Alpha Vantage OVERVIEW
+FUNDAMENTALS = "fundamentals"  # yfinance .info fundamentals
+FRED = "fred"                  # latest FRED observation
+
+_engine: Optional[Engine] = None
+
+
+def _ttl_seconds(field_class: str) -> int:
+    return {
+        PRICE: settings.QUOTE_CACHE_TTL,
+        QUOTE: settings.QUOTE_CACHE_TTL,
+        OVERVIEW: settings.OVERVIEW_CACHE_TTL,
+        FUNDAMENTALS: settings.FUNDAMENTALS_REFRESH_INTERVAL,
+        FRED: settings.FRED_CACHE_TTL,
+    }[field_class]
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _get_engine() -> Engine:
+    """Sync engine for DB_URL (e.g. sqlite+aiosqlite -> sqlite), created on first use"""
+    global _engine
+    if _engine is None:
+        url = make_url(settings.DB_URL)
+        _engine = create_engine(url.set(drivername=url.get_backend_name()), future=True)
+        MarketData.__table__.create(_engine, checkfirst=True)
+    return _engine
+
+
+def load(field_class: str, key: str, max_age: Optional[float] = None) -> Optional[Dict[str, Any]]:
+    """Returns the stored payload for key if it is younger than max_age (default: the field class TTL)"""
+    return load_many(field_class, [key], max_age).get(key)
+
+
+def load_timestamped(
+    field_class: str,
+    key: str,
+    max_age: Optional[float] = None
+) -> Optional[Tuple[float, Dict[str, Any]]]:
+    """Like load(), but returns (fetched_at as a Unix timestamp, payload), e.g. to seed an in-process cache"""
+    entry = _load_fresh(field_class, [key], max_age).get(key)
+    if entry is None:
+        return None
+    return entry[0].replace(tzinfo=timezone.utc).timestamp(), entry[1]
+
+
+def load_many(field_class: str, keys: List[str], max_age: Optional[float] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Returns {key: payload} for all keys with a row younger than max_age
+    (default: the field class TTL), in one query. Older rows are counted
+    as stale lookups in metrics.
+    """
+    return {key: payload for key, (_, payload) in _load_fresh(field_class, keys, max_age).items()}
+
+
+def _load_fresh(
+    field_class: str,
+    keys: List[str],
+    max_age: Optional[float]
+) -> Dict[str, Tuple[datetime, Dict[str, Any]]]:
+    if not settings.MARKET_DATA_PERSISTENCE or not keys:
+        return {}
+
+    if max_age is None:
+        max_age = _ttl_seconds(field_class)
+    cutoff = _utcnow() - timedelta(seconds=max_age)
+    try:
+        with Session(_get_engine()) as session:
+            rows = session.execute(
+                select(MarketData.ticker, MarketData.fetched_at, MarketData.payload).where(
+                    MarketData.field_class == field_class,
+                    MarketData.ticker.in_(keys)
+                )
+            ).all()
+    except Exception as e:
+        logger.warning(f"Market data store read failed ({field_class}): {e}")
+        return {}
+
+    fresh = {ticker: (fetched_at, payload) for ticker, fetched_at, payload in rows if fetched_at >= cutoff}
+    cache = f"market_data.{field_class}"
+    metrics.record_cache_lookup(cache, metrics.HIT, len(fresh))
+    metrics.record_cache_lookup(cache, metrics.STALE, len(rows) - len(fresh))
+    metrics.record_cache_lookup(cache, metrics.MISS, len(set(keys)) - len(rows))
+    return fresh
+
+
+def save(
+    field_class: str,
+    key: str,
+    payload: Dict[str, Any],
+    price: Optional[float] = None,
+    change_percent: Optional[float] = None,
+    volume: Optional[int] = None,
+    market_cap: Optional[int] = None,
+    pe_ratio: Optional[float] = None,
+    data_date: Optional[date] = None
+):
+    """Upserts one (key, field_class) row. Failures are logged, never raised."""
+    if not settings.MARKET_DATA_PERSISTENCE:
+        return
+
+    values = {
+        "price": price,
+        "change_percent": change_percent,
+        "volume": volume,
+        "market_cap": market_cap,
+        "pe_ratio": pe_ratio,
+        "data_date": data_date or date.today(),
+        "payload": payload,
+        "fetched_at": _utcnow(),
+    }
+    try:
+        with Session(_get_engine()) as session:
+            row = session.execute(
+                select(MarketData).where(
+                    MarketData.field_class == field_class,
+                    MarketData.ticker == key
+                )
+            ).scalar_one_or_none()
+            if row is None:
+                session.add(MarketData(ticker=key, field_class=field_class, **values))
+            else:
+                for column, value in values.items():
+                    setattr(row, column, value)
+            session.commit()
+    except IntegrityError:
+        # Another worker inserted the same row concurrently; its copy is as fresh
+        logger.debug(f"Concurrent insert for {field_class}/{key}; keeping existing row")
+    except Exception as e:
+        logger.warning(f"Market data store write failed ({field_class}/{key}): {e}")
+
+
+def to_float(value: Any) -> Optional[float]:
+    """Parses upstream numeric strings ('1.25', '0.64%', 'None') for the typed columns"""
+    try:
+        return float(str(value).rstrip('%'))
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,330 @@
+"""
+In-process metrics in the Prometheus text exposition format.
+
+A small registry of counters, gauges and histograms with labels, updated
+on the hot paths (HTTP requests, upstream calls, refreshes, caches) and
+rendered by GET /metrics. There is no external collector or client
+library: scrape /metrics directly.
+
+Totals that other modules already keep (response cache, AI analysis
+cache, request queues, snapshots) are mirrored into gauges and counters
+at scrape time instead of being counted twice; see api/routes/metrics.py.
+"""
+import bisect
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+PREFIX = "alpha_oracle_"
+
+LabelValues = Tuple[str, ...]
+
+# Upstream providers
+ALPHA_VANTAGE = "alpha_vantage"
+FRED = "fred"
+YFINANCE = "yfinance"
+OPENAI = "openai"
+
+# Upstream call outcomes
+OK = "ok"
+ERROR = "error"
+THROTTLED = "throttled"
+
+# Cache lookup results
+HIT = "hit"
+MISS = "miss"
+STALE = "stale"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = ()):
+        self.name = PREFIX + name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"] + self._samples()
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonic total per label set"""
+
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = ()):
+        super().__init__(f"{name}_total", help, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def set_total(self, value: float, **labels: str):
+        """Mirrors a total that another module already counts"""
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in values
+        ]
+
+
+class Gauge(_Metric):
+    """Current value per label set"""
+
+    type = "gauge"
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def set(self, value: float, **labels: str):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1.0, **labels: str):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: str):
+        self.inc(-amount, **labels)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in values
+        ]
+
+
+class Histogram(_Metric):
+    """Bucketed observations (cumulative buckets, _sum and _count) per label set"""
+
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = (), buckets: Iterable[float] = ()):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (last one is +Inf), sum]
+        self._values: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: str):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = ([0] * (len(self.buckets) + 1), [0.0])
+            entry[0][index] += 1
+            entry[1][0] += value
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            values = sorted((key, (list(counts), total[0])) for key, (counts, total) in self._values.items())
+        lines = []
+        bounds = self.buckets + (float("inf"),)
+        for key, (counts, total) in values:
+            cumulative = 0
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+_registry: List[_Metric] = []
+
+
+def _register(metric):
+    _registry.append(metric)
+    return metric
+
+
+def render() -> str:
+    """All registered metrics in the Prometheus text format (version 0.0.4)"""
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# HTTP
+
+http_request_duration = _register(Histogram(
+    "http_request_duration_seconds",
+    "API request latency by route template",
+    ("method", "route", "status"),
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+))
+http_requests_in_flight = _register(Gauge(
+    "http_requests_in_flight",
+    "API requests currently being served"
+))
+
+# Caches
+
+cache_lookups = _register(Counter(
+    "cache_lookups",
+    "Cache lookups by cache and result (hit, miss, stale)",
+    ("cache", "result")
+))
+cache_hit_ratio = _register(Gauge(
+    "cache_hit_ratio",
+    "Hits / lookups since start, per cache",
+    ("cache",)
+))
+cache_entries = _register(Gauge(
+    "cache_entries",
+    "Entries currently held in memory, per cache",
+    ("cache",)
+))
+
+# Upstreams
+
+upstream_requests = _register(Counter(
+    "upstream_requests",
+    "Upstream calls by provider and outcome (ok, error, throttled)",
+    ("provider", "outcome")
+))
+upstream_request_duration = _register(Histogram(
+    "upstream_request_duration_seconds",
+    "Upstream call latency by provider",
+    ("provider",),
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+))
+upstream_queue_depth = _register(Gauge(
+    "upstream_queue_depth",
+    "Calls waiting for a quota slot, per provider",
+    ("provider",)
+))
+upstream_throttled = _register(Counter(
+    "upstream_throttled",
+    "Throttled responses requeued by the request scheduler, per provider",
+    ("provider",)
+))
+
+# Refreshes and snapshots
+
+refresh_duration = _register(Histogram(
+    "refresh_duration_seconds",
+    "Duration of data refreshes, per snapshot",
+    ("snapshot",),
+    buckets=(0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0)
+))
+snapshot_age = _register(Gauge(
+    "snapshot_age_seconds",
+    "Seconds since each snapshot was last published",
+    ("snapshot",)
+))
+snapshot_version = _register(Gauge(
+    "snapshot_version",
+    "Data version of each published snapshot",
+    ("snapshot",)
+))
+
+# OpenAI usage
+
+openai_tokens = _register(Counter(
+    "openai_tokens",
+    "OpenAI tokens used, by kind (prompt, completion)",
+    ("kind",)
+))
+
+
+def record_upstream_call(provider: str, seconds: float, outcome: str = OK):
+    """One upstream call: its latency and outcome"""
+    upstream_requests.inc(provider=provider, outcome=outcome)
+    upstream_request_duration.observe(seconds, provider=provider)
+
+
+def record_cache_lookup(cache: str, result: str, count: int = 1):
+    if count:
+        cache_lookups.inc(count, cache=cache, result=result)
+
+
+def update_cache_hit_ratios():
+    """Recomputes cache_hit_ratio from the cache_lookups totals"""
+    lookups: Dict[str, float] = {}
+    hits: Dict[str, float] = {}
+    with cache_lookups._lock:
+        for (cache, result), value in cache_lookups._values.items():
+            lookups[cache] = lookups.get(cache, 0.0) + value
+            if result == HIT:
+                hits[cache] = hits.get(cache, 0.0) + value
+    for cache, total in lookups.items():
+        cache_hit_ratio.set(round(hits.get(cache, 0.0) / total, 4) if total else 0.0, cache=cache)
+
+
+class RouteMetricsMiddleware:
+    """
+    ASGI middleware timing every HTTP request by its route template
+    (e.g. /api/recommendations/{ticker}), so per-ticker paths share one series.
+    Requests that match no route are grouped as "unmatched".
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        http_requests_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            http_requests_in_flight.dec()
+            route: Optional[object] = scope.get("route")
+            http_request_duration.observe(
+                time.perf_counter() - started,
+                method=scope["method"],
+                route=getattr(route, "path", "unmatched"),
+                status=str(status)
+            )
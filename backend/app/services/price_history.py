@@ -0,0 +1,321 @@
+"""
+Local daily OHLCV history for the watchlist and the sector ETFs.
+
+Each symbol has one append-only file under PRICE_HISTORY_DIR holding
+fixed-width little-endian records (BAR_DTYPE, 48 bytes per bar) in date
+order, with no header. That gives:
+
+- O(1) append: new bars are written to the end of the file in one write
+- zero-copy reads: read_bars() maps the file with np.memmap, and columns
+  such as bars["close"] or bars["date"] (datetime64[D]) are views into the
+  mapping, not copies
+- O(1) last_date(): the last record is read with a single seek
+
+Prices are split- and dividend-adjusted, so returns computed across the
+whole file are comparable. A split or dividend re-adjusts every earlier
+bar, so update_history() re-fetches each symbol's last stored bar along
+with the new ones: if its close no longer matches, the series was
+restated and the file is rebuilt from a fresh download instead of
+appending bars on a different price basis.
+
+update_history() otherwise fetches only bars from each symbol's last
+stored date on (one batched download per distinct start date), after a
+first backfill of PRICE_HISTORY_BACKFILL_DAYS. Only completed sessions are
+stored: today's bar may still be forming, so it waits for the next update.
+A partial trailing record left by an interrupted write is ignored on read
+and truncated on the next append.
+"""
+import os
+import re
+import time
+import threading
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+import logging
+import httpx
+import numpy as np
+from app.config import settings
+from app.services import metrics
+
+logger = logging.getLogger(__name__)
+
+BAR_DTYPE = np.dtype([
+    ("date", "<M8[D]"),
+    ("open", "<f8"),
+    ("high", "<f8"),
+    ("low", "<f8"),
+    ("close", "<f8"),
+    ("volume", "<f8"),
+])
+FIELDS = ["open", "high", "low", "close", "volume"]
+
+_SYMBOL_PATTERN = re.compile(r"^[A-Z0-9.\-^=]+$")
+
+# Relative close difference on the re-fetched last bar that counts as a restatement
+RESTATEMENT_TOLERANCE = 1e-5
+
+# SYMBOL -> (inode, read-only memmap), re-opened when the file grows or is rebuilt
+_maps: Dict[str, Tuple[int, np.memmap]] = {}
+_lock = threading.Lock()
+
+
+def _path(symbol: str) -> str:
+    symbol = symbol.upper()
+    if not _SYMBOL_PATTERN.match(symbol):
+        raise ValueError(f"Invalid symbol: {symbol!r}")
+    return os.path.join(settings.PRICE_HISTORY_DIR, f"{symbol}.bars")
+
+
+def _bar_count(path: str) -> int:
+    try:
+        return os.path.getsize(path) // BAR_DTYPE.itemsize
+    except FileNotFoundError:
+        return 0
+
+
+def read_bars(symbol: str) -> np.ndarray:
+    """
+    All stored bars for symbol as a read-only structured array (BAR_DTYPE)
+    backed by the file mapping; empty if nothing is stored yet.
+    """
+    symbol = symbol.upper()
+    path = _path(symbol)
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return np.empty(0, dtype=BAR_DTYPE)
+    count = stat.st_size // BAR_DTYPE.itemsize
+    if count == 0:
+        return np.empty(0, dtype=BAR_DTYPE)
+
+    with _lock:
+        inode, mapped = _maps.get(symbol, (None, None))
+        if mapped is None or inode != stat.st_ino or len(mapped) != count:
+            mapped = np.memmap(path, dtype=BAR_DTYPE, mode="r", shape=(count,))
+            _maps[symbol] = (stat.st_ino, mapped)
+    return mapped
+
+
+def last_date(symbol: str) -> Optional[date]:
+    """Date of the newest stored bar, or None"""
+    path = _path(symbol)
+    count = _bar_count(path)
+    if count == 0:
+        return None
+    with open(path, "rb") as f:
+        f.seek((count - 1) * BAR_DTYPE.itemsize)
+        record = np.frombuffer(f.read(BAR_DTYPE.itemsize), dtype=BAR_DTYPE)
+    return record["date"][0].astype(date)
+
+
+def append_bars(symbol: str, bars: np.ndarray) -> int:
+    """
+    Appends the bars dated after the last stored one (so re-appending an
+    overlapping range is harmless). bars must be BAR_DTYPE. Returns the
+    number of bars written.
+    """
+    path = _path(symbol)
+    if len(bars) == 0:
+        return 0
+    bars = np.sort(np.asarray(bars, dtype=BAR_DTYPE), order="date")
+
+    latest = last_date(symbol)
+    if latest is not None:
+        bars = bars[bars["date"] > np.datetime64(latest, "D")]
+    if len(bars) == 0:
+        return 0
+    bars = _unique_dates(bars)
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "ab") as f:
+        aligned = f.tell() - f.tell() % BAR_DTYPE.itemsize
+        if aligned != f.tell():
+            f.truncate(aligned)  # drop a partial record from an interrupted write
+        f.write(bars.tobytes())
+    return len(bars)
+
+
+def rewrite_bars(symbol: str, bars: np.ndarray) -> int:
+    """
+    Replaces symbol's stored history with bars (BAR_DTYPE). The file is
+    swapped in atomically, so readers see either the old or the new series;
+    maps of the old file stay valid until re-read. Returns the bars written.
+    """
+    path = _path(symbol)
+    bars = _unique_dates(np.sort(np.asarray(bars, dtype=BAR_DTYPE), order="date"))
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(bars.tobytes())
+    os.replace(tmp_path, path)
+    return len(bars)
+
+
+def _unique_dates(bars: np.ndarray) -> np.ndarray:
+    """One bar per day (sorted input), even if the source repeated a date"""
+    if len(bars) == 0:
+        return bars
+    return bars[np.concatenate(([True], bars["date"][1:] != bars["date"][:-1]))]
+
+
+def _bars_from_columns(columns: Dict[str, list]) -> np.ndarray:
+    """BAR_DTYPE array from {"date": [...], "open": [...], ...}, dropping bars without a close"""
+    bars = np.empty(len(columns["date"]), dtype=BAR_DTYPE)
+    bars["date"] = np.array(columns["date"], dtype="datetime64[D]")
+    for field in FIELDS:
+        bars[field] = np.array(columns[field], dtype=np.float64)
+    return bars[~np.isnan(bars["close"])]
+
+
+def _download_history(symbols: List[str], start: date, end: date) -> Dict[str, np.ndarray]:
+    """Daily bars from start to end (both inclusive) for symbols, via one batched yf.download"""
+    import yfinance as yf
+    frame = yf.download(
+        symbols,
+        start=start.isoformat(),
+        end=(end + timedelta(days=1)).isoformat(),  # yfinance's end is exclusive
+        interval="1d",
+        group_by="ticker",
+        auto_adjust=True,  # split- and dividend-adjusted OHLC
+        threads=True,
+        progress=False
+    )
+    if frame is None or frame.empty:
+        return {}
+
+    history = {}
+    dates = frame.index.date
+    for symbol in symbols:
+        try:
+            columns = frame[symbol] if frame.columns.nlevels > 1 else frame
+            history[symbol] = _bars_from_columns({
+                "date": dates,
+                **{field: columns[field.capitalize()].to_numpy() for field in FIELDS}
+            })
+        except KeyError:
+            continue
+    return history
+
+
+def _standin_history(symbols: List[str], start: date, end: date) -> Dict[str, np.ndarray]:
+    """Daily bars from the stand-in at YFINANCE_BASE_URL (same columns as yf.download)"""
+    response = httpx.get(
+        f"{settings.YFINANCE_BASE_URL}/history",
+        params={"tickers": ",".join(symbols), "start": start.isoformat(), "end": end.isoformat()},
+        timeout=settings.HTTP_TIMEOUT
+    )
+    response.raise_for_status()
+    return {symbol: _bars_from_columns(columns) for symbol, columns in response.json().items()}
+
+
+def _fetch_history(symbols: List[str], start: date, end: date) -> Optional[Dict[str, np.ndarray]]:
+    """One batched download (stand-in or yfinance) with metrics; None if it failed"""
+    started = time.perf_counter()
+    try:
+        if settings.YFINANCE_BASE_URL:
+            history = _standin_history(symbols, start, end)
+        else:
+            history = _download_history(symbols, start, end)
+    except Exception as e:
+        metrics.record_upstream_call(metrics.YFINANCE, time.perf_counter() - started, metrics.ERROR)
+        logger.warning(f"Price history download from {start} failed for {len(symbols)} symbols: {e}")
+        return None
+    metrics.record_upstream_call(metrics.YFINANCE, time.perf_counter() - started)
+    end_day = np.datetime64(end, "D")
+    return {symbol: bars[bars["date"] <= end_day] for symbol, bars in history.items()}
+
+
+def _is_restated(symbol: str, fetched: np.ndarray) -> bool:
+    """
+    True if fetched (which starts at the last stored date) disagrees with the
+    stored last bar, i.e. a split or dividend re-adjusted the series since
+    it was stored. A fetch without that bar cannot be checked, so it counts
+    as restated too.
+    """
+    if len(fetched) == 0:
+        return False
+    stored = read_bars(symbol)[-1]
+    overlap = fetched[fetched["date"] == stored["date"]]
+    if len(overlap) == 0:
+        return True
+    return not np.isclose(overlap["close"][0], stored["close"], rtol=RESTATEMENT_TOLERANCE, atol=0.0)
+
+
+def _last_closed_session(today: date) -> date:
+    """Most recent weekday before today (market holidays just yield an empty fetch)"""
+    yesterday = np.datetime64(today - timedelta(days=1), "D")
+    return np.busday_offset(yesterday, 0, roll="backward").astype(date)
+
+
+def history_symbols() -> List[str]:
+    """Watchlist stocks and sector ETFs"""
+    from app.services.data_provider import SECTOR_ETFS
+    from app.services.market_data_service import WATCHLIST
+    return list(WATCHLIST) + [etf for etf in SECTOR_ETFS if etf not in WATCHLIST]
+
+
+def update_history(symbols: Optional[Iterable[str]] = None, today: Optional[date] = None) -> Dict[str, int]:
+    """
+    Brings every symbol's history up to the last completed session: a
+    backfill of PRICE_HISTORY_BACKFILL_DAYS for symbols with nothing
+    stored, otherwise the bars from the last stored date on (that bar is
+    re-fetched to detect restatements; see _is_restated). Symbols sharing
+    a start date are fetched in one batched call; symbols already current
+    are not fetched at all. Restated symbols are re-downloaded over their
+    stored range and rewritten. Returns {symbol: bars written}.
+    """
+    symbols = [s.upper() for s in (symbols or history_symbols())]
+    today = today or date.today()
+    end = _last_closed_session(today)
+    backfill_start = today - timedelta(days=settings.PRICE_HISTORY_BACKFILL_DAYS)
+
+    by_start: Dict[date, List[str]] = {}
+    stored = set()
+    for symbol in symbols:
+        latest = last_date(symbol)
+        if latest is None:
+            by_start.setdefault(backfill_start, []).append(symbol)
+        elif latest < end:
+            by_start.setdefault(latest, []).append(symbol)
+            stored.add(symbol)
+
+    written = {symbol: 0 for symbol in symbols}
+    restated: List[str] = []
+    for start, group in sorted(by_start.items()):
+        history = _fetch_history(group, start, end)
+        for symbol, bars in (history or {}).items():
+            if symbol not in written:
+                continue
+            if symbol in stored and _is_restated(symbol, bars):
+                restated.append(symbol)
+            else:
+                written[symbol] += append_bars(symbol, bars)
+
+    if restated:
+        logger.info(f"Price history restated for {', '.join(restated)}; rebuilding")
+        first = min(read_bars(symbol)["date"][0] for symbol in restated).astype(date)
+        history = _fetch_history(restated, min(first, backfill_start), end)
+        for symbol, bars in (history or {}).items():
+            if symbol in written and len(bars):
+                written[symbol] = rewrite_bars(symbol, bars)
+
+    logger.info(
+        f"Price history: {sum(written.values())} bars written for {len(symbols)} symbols "
+        f"({len(by_start) + bool(restated)} batched downloads, {len(restated)} rebuilt)"
+    )
+    return written
+
+
+def status() -> Dict[str, Dict[str, object]]:
+    """Stored bar count and date range per symbol"""
+    result = {}
+    for symbol in history_symbols():
+        bars = read_bars(symbol)
+        if len(bars):
+            result[symbol] = {
+                "bars": len(bars),
+                "first": str(bars["date"][0]),
+                "last": str(bars["date"][-1]),
+            }
+    return result
@@ -4,13 +4,23 @@ Filters and ranks stocks by strategy: growth, value, defensive, contrarian.
 Now powered by live market data + AI analysis when OPENAI_API_KEY is set.
 Falls back to demo data otherwise.
 """
-from typing import List, Optional
+from typing import Dict, List, Optional
+import numpy as np
 from app.models.schemas import StockRecommendation, Strategy
-from app.services.live_recommendations_service import get_live_recommendations
+from app.services.live_recommendations_service import get_live_recommendations, get_live_recommendations_async
+from app.services.recommendation_store import RecommendationStore
 import logging
 
 logger = logging.getLogger(__name__)
 
+DEFENSIVE_SECTORS = ['Healthcare', 'Consumer Staples', 'Utilities']
+GROWTH_SECTORS = [
+    'Technology', 
+    'Communication Services', 
+    'Healthcare',
+    'Consumer Discretionary'
+]
+
 
 class RecommendationEngine:
     """
@@ -19,20 +29,55 @@ class RecommendationEngine:
     Data source: Live (yfinance + OpenAI) if OPENAI_API_KEY is set, else demo data.
     """
 
-    def __init__(self):
-        self.all_recommendations = get_live_recommendations()
+    def __init__(self, recommendations: Optional[List[StockRecommendation]] = None):
+        if recommendations is None:
+            recommendations = get_live_recommendations()
+        self.all_recommendations = recommendations
+        self._build_indexes()
+    
+    def _build_indexes(self):
+        """
+        Precomputes lookups so request-time work is slicing, not scanning.
+        Strategy screens run as vectorized masks over a columnar store and
+        are ranked once per engine; orderings are stable, so ties keep the
+        same order as sorting on demand did.
+        """
+        recs = self.all_recommendations
+        store = RecommendationStore(recs)
+        self._store = store
+        
+        self._by_ticker: Dict[str, StockRecommendation] = {}
+        for rec in recs:
+            self._by_ticker.setdefault(rec.ticker.upper(), rec)
+        
+        everything = np.ones(len(store), dtype=bool)
+        self._by_conviction = store.top_k(everything, store.conviction)
+        
+        defensive = store.sector_in(DEFENSIVE_SECTORS) | (store.dividend_yield > 2.0)
+        # Sort by combination of conviction and dividend yield
+        defensive_score = store.conviction + store.truthy_or_zero(store.dividend_yield) * 5
+        self._defensive = store.top_k(defensive, defensive_score)
+        
+        growth = (
+            store.sector_in(GROWTH_SECTORS)
+            & store.below(store.peg_ratio, 3.0)
+            & (store.tailwinds >= 3)
+        )
+        self._growth = store.top_k(growth, store.conviction)
+        
+        # Sort by upside potential (margin of safety)
+        value = store.below(store.pe_ratio, 20) & (store.upside > 10)
+        self._value = store.top_k(value, store.upside)
+        
+        contrarian = (store.upside > 15) & (store.tailwinds > store.headwinds)
+        self._contrarian = store.top_k(contrarian, store.upside)
     
     def get_top_opportunities(self, n: int = 10) -> List[StockRecommendation]:
         """
         Returns top N investment opportunities across all sectors.
         Sorted by conviction score.
         """
-        sorted_recs = sorted(
-            self.all_recommendations,
-            key=lambda x: x.conviction_score,
-            reverse=True
-        )
-        return sorted_recs[:n]
+        return self._store.materialize(self._by_conviction[:n])
     
     def get_sector_opportunities(
         self, 
@@ -42,18 +87,8 @@ class RecommendationEngine:
         """
         Returns best picks within a specific sector.
         """
-        sector_recs = [
-            rec for rec in self.all_recommendations 
-            if rec.sector.lower() == sector.lower()
-        ]
-        
-        sorted_recs = sorted(
-            sector_recs,
-            key=lambda x: x.conviction_score,
-            reverse=True
-        )
-        
-        return sorted_recs[:n]
+        store = self._store
+        return store.materialize(store.top_k(store.sector_is(sector), store.conviction, n))
     
     def get_defensive_picks(self, n: int = 10) -> List[StockRecommendation]:
         """
@@ -67,22 +102,7 @@ class RecommendationEngine:
         
         Philosophy: "Sleep well at night" - Peter Lynch
         """
-        defensive_sectors = ['Healthcare', 'Consumer Staples', 'Utilities']
-        
-        defensive_recs = [
-            rec for rec in self.all_recommendations
-            if (rec.sector in defensive_sectors or 
-                (rec.dividend_yield and rec.dividend_yield > 2.0))
-        ]
-        
-        # Sort by combination of conviction and dividend yield
-        sorted_recs = sorted(
-            defensive_recs,
-            key=lambda x: x.conviction_score + (x.dividend_yield or 0) * 5,
-            reverse=True
-        )
-        
-        return sorted_recs[:n]
+        return self._store.materialize(self._defensive[:n])
     
     def get_growth_picks(self, n: int = 10) -> List[StockRecommendation]:
         """
@@ -97,28 +117,7 @@ class RecommendationEngine:
         Philosophy: "The best business to own is one that over time can employ 
         large amounts of capital at very high rates of return" - Warren Buffett
         """
-        growth_sectors = [
-            'Technology', 
-            'Communication Services', 
-            'Healthcare',
-            'Consumer Discretionary'
-        ]
-        
-        growth_recs = [
-            rec for rec in self.all_recommendations
-            if (rec.sector in growth_sectors and
-                rec.peg_ratio and rec.peg_ratio < 3.0 and
-                len(rec.tailwinds) >= 3)
-        ]
-        
-        # Sort by conviction score
-        sorted_recs = sorted(
-            growth_recs,
-            key=lambda x: x.conviction_score,
-            reverse=True
-        )
-        
-        return sorted_recs[:n]
+        return self._store.materialize(self._growth[:n])
     
     def get_value_picks(self, n: int = 10) -> List[StockRecommendation]:
         """
@@ -132,20 +131,7 @@ class RecommendationEngine:
         
         Philosophy: "Price is what you pay, value is what you get" - Warren Buffett
         """
-        value_recs = [
-            rec for rec in self.all_recommendations
-            if (rec.pe_ratio and rec.pe_ratio < 20 and
-                rec.upside_potential_pct > 10)
-        ]
-        
-        # Sort by upside potential (margin of safety)
-        sorted_recs = sorted(
-            value_recs,
-            key=lambda x: x.upside_potential_pct,
-            reverse=True
-        )
-        
-        return sorted_recs[:n]
+        return self._store.materialize(self._value[:n])
     
     def get_contrarian_picks(self, n: int = 10) -> List[StockRecommendation]:
         """
@@ -160,21 +146,7 @@ class RecommendationEngine:
         Philosophy: "The time to buy is when there's blood in the streets" - Baron Rothschild
         "You make money by buying things that are down and out" - Howard Marks
         """
-        # Look for stocks with strong upside despite bearish sector sentiment
-        contrarian_recs = [
-            rec for rec in self.all_recommendations
-            if (rec.upside_potential_pct > 15 and
-                len(rec.tailwinds) > len(rec.headwinds))
-        ]
-        
-        # Sort by upside potential
-        sorted_recs = sorted(
-            contrarian_recs,
-            key=lambda x: x.upside_potential_pct,
-            reverse=True
-        )
-        
-        return sorted_recs[:n]
+        return self._store.materialize(self._contrarian[:n])
     
     def filter_recommendations(
         self,
@@ -192,49 +164,43 @@ class RecommendationEngine:
             min_conviction: Minimum conviction score
             limit: Maximum number of results
         """
+        store = self._store
+        
         # Start with appropriate strategy subset
         if strategy == Strategy.GROWTH:
-            filtered = self.get_growth_picks(n=limit)
+            candidates = self._growth[:limit]
         elif strategy == Strategy.VALUE:
-            filtered = self.get_value_picks(n=limit)
+            candidates = self._value[:limit]
         elif strategy == Strategy.DEFENSIVE:
-            filtered = self.get_defensive_picks(n=limit)
+            candidates = self._defensive[:limit]
         elif strategy == Strategy.CONTRARIAN:
-            filtered = self.get_contrarian_picks(n=limit)
+            candidates = self._contrarian[:limit]
         else:
-            filtered = self.all_recommendations.copy()
+            candidates = None
+        
+        mask = np.ones(len(store), dtype=bool)
         
         # Apply sector filter
         if sector:
-            filtered = [
-                rec for rec in filtered
-                if rec.sector.lower() == sector.lower()
-            ]
+            mask &= store.sector_is(sector)
         
         # Apply conviction filter
         if min_conviction:
-            filtered = [
-                rec for rec in filtered
-                if rec.conviction_score >= min_conviction
-            ]
+            mask &= store.conviction >= min_conviction
         
         # Sort by conviction and limit
-        sorted_recs = sorted(
-            filtered,
-            key=lambda x: x.conviction_score,
-            reverse=True
-        )
+        if candidates is None:
+            selected = store.top_k(mask, store.conviction, limit)
+        else:
+            selected = store.rank(candidates[mask[candidates]], store.conviction, limit)
         
-        return sorted_recs[:limit]
+        return store.materialize(selected)
     
     def get_recommendation_by_ticker(self, ticker: str) -> Optional[StockRecommendation]:
         """
         Returns detailed recommendation for a specific ticker.
         """
-        for rec in self.all_recommendations:
-            if rec.ticker.upper() == ticker.upper():
-                return rec
-        return None
+        return self._by_ticker.get(ticker.upper())
     
     def get_portfolio_ideas(
         self,
@@ -268,3 +234,23 @@ class RecommendationEngine:
             value = self.get_value_picks(n=int(n * 0.2))
             contrarian = self.get_contrarian_picks(n=int(n * 0.1))
             return growth + defensive + value + contrarian
+
+
+# Shared engine, rebuilt whenever a new recommendations list is served
+# (each published snapshot / data version)
+_engine: Optional[RecommendationEngine] = None
+
+
+async def get_recommendation_engine() -> RecommendationEngine:
+    """
+    Returns the process-wide engine for the current recommendations,
+    building its indexes only when the underlying data changed.
+    Safe to await from request handlers.
+    """
+    global _engine
+    recommendations = await get_live_recommendations_async()
+    engine = _engine
+    if engine is None or engine.all_recommendations is not recommendations:
+        engine = RecommendationEngine(recommendations)
+        _engine = engine
+    return engine
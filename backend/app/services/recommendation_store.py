@@ -0,0 +1,103 @@
+"""
+Columnar store for stock recommendations.
+
+Keeps the numeric fields the strategy screens use as NumPy arrays, so
+filters run as vectorized masks and rankings as partial top-k selection
+instead of Python comprehensions over Pydantic objects. Rows are turned
+back into StockRecommendation objects only for the indices returned.
+
+Orderings match Python's stable sorted(..., reverse=True): ties keep
+their original row order.
+"""
+from typing import Dict, Iterable, List, Optional
+import numpy as np
+from app.models.schemas import StockRecommendation
+
+
+def _optional_floats(values: Iterable[Optional[float]]) -> np.ndarray:
+    """None -> NaN, so comparisons against missing values are False"""
+    return np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+
+
+class RecommendationStore:
+    """Column arrays over a fixed list of recommendations"""
+
+    def __init__(self, recommendations: List[StockRecommendation]):
+        self.rows = recommendations
+        n = len(recommendations)
+
+        self.conviction = np.fromiter((r.conviction_score for r in recommendations), np.float64, n)
+        self.upside = np.fromiter((r.upside_potential_pct for r in recommendations), np.float64, n)
+        self.pe_ratio = _optional_floats(r.pe_ratio for r in recommendations)
+        self.peg_ratio = _optional_floats(r.peg_ratio for r in recommendations)
+        self.dividend_yield = _optional_floats(r.dividend_yield for r in recommendations)
+        self.tailwinds = np.fromiter((len(r.tailwinds) for r in recommendations), np.int32, n)
+        self.headwinds = np.fromiter((len(r.headwinds) for r in recommendations), np.int32, n)
+
+        # Sector names as integer codes: exact (strategy screens) and case-folded (user filters)
+        self._sector_codes: Dict[str, int] = {}
+        self._sector_lower_codes: Dict[str, int] = {}
+        self.sector = np.fromiter(
+            (self._sector_codes.setdefault(r.sector, len(self._sector_codes)) for r in recommendations),
+            np.int32, n
+        )
+        self.sector_lower = np.fromiter(
+            (self._sector_lower_codes.setdefault(r.sector.lower(), len(self._sector_lower_codes))
+             for r in recommendations),
+            np.int32, n
+        )
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    # Masks
+
+    def sector_in(self, sectors: Iterable[str]) -> np.ndarray:
+        """Rows whose sector exactly matches one of sectors"""
+        codes = [self._sector_codes[s] for s in sectors if s in self._sector_codes]
+        return np.isin(self.sector, codes)
+
+    def sector_is(self, sector: str) -> np.ndarray:
+        """Rows whose sector matches case-insensitively"""
+        code = self._sector_lower_codes.get(sector.lower())
+        if code is None:
+            return np.zeros(len(self), dtype=bool)
+        return self.sector_lower == code
+
+    @staticmethod
+    def below(column: np.ndarray, limit: float) -> np.ndarray:
+        """Present, non-zero and below limit (the `x and x < limit` idiom)"""
+        return (column != 0) & (column < limit)
+
+    @staticmethod
+    def truthy_or_zero(column: np.ndarray) -> np.ndarray:
+        """Missing values as 0 (the `x or 0` idiom)"""
+        return np.nan_to_num(column, nan=0.0)
+
+    # Ranking
+
+    def top_k(self, mask: np.ndarray, key: np.ndarray, k: Optional[int] = None) -> np.ndarray:
+        """
+        Indices of the k masked rows with the highest key, in descending key
+        order (ties in row order). Uses partial selection when k < matches.
+        """
+        return self.rank(np.flatnonzero(mask), key, k)
+
+    @staticmethod
+    def rank(indices: np.ndarray, key: np.ndarray, k: Optional[int] = None) -> np.ndarray:
+        """Sorts row indices by key descending (stable), keeping at most k"""
+        values = key[indices]
+        if k == 0:
+            return indices[:0]
+        if k is not None and 0 < k < len(indices):
+            # Everything >= the k-th largest value, then a stable sort of that slice
+            kth = np.partition(values, len(values) - k)[len(values) - k]
+            keep = values >= kth
+            indices, values = indices[keep], values[keep]
+        order = np.argsort(-values, kind="stable")
+        return indices[order][:k]
+
+    def materialize(self, indices: np.ndarray) -> List[StockRecommendation]:
+        """StockRecommendation objects for the given row indices"""
+        rows = self.rows
+        return [rows[i] for i in indices.tolist()]
@@ -0,0 +1,109 @@
+"""
+Background refresh scheduler (APScheduler).
+
+Refreshes live recommendations, sector ETF quotes and macro indicators every
+DATA_REFRESH_INTERVAL seconds and publishes each result as a snapshot.
+Daily price history is appended every PRICE_HISTORY_REFRESH_INTERVAL.
+Request handlers serve the latest completed snapshot immediately, so no
+user request pays for an upstream refresh (stale-while-revalidate).
+
+Only recommendation snapshots invalidate the response cache; sector and
+macro publishes have their own snapshot names and leave it intact.
+
+APScheduler is imported only when there is something to schedule.
+"""
+import time
+import asyncio
+from datetime import datetime
+from typing import Optional, TYPE_CHECKING
+import logging
+from app.config import settings, is_demo_mode
+from app.services import snapshots, metrics, live_recommendations_service, price_history
+from app.services.data_provider import MarketDataProvider
+
+if TYPE_CHECKING:
+    from apscheduler.schedulers.asyncio import AsyncIOScheduler
+
+logger = logging.getLogger(__name__)
+
+_scheduler: Optional["AsyncIOScheduler"] = None
+
+
+async def refresh_recommendations():
+    await live_recommendations_service.refresh_live_recommendations_async()
+
+
+async def refresh_sector_performance():
+    started = time.perf_counter()
+    data = await MarketDataProvider().get_sector_performance()
+    metrics.refresh_duration.observe(time.perf_counter() - started, snapshot=snapshots.SECTOR_PERFORMANCE)
+    snapshots.publish(snapshots.SECTOR_PERFORMANCE, data)
+
+
+async def refresh_economic_indicators():
+    started = time.perf_counter()
+    data = await MarketDataProvider().get_economic_indicators()
+    metrics.refresh_duration.observe(time.perf_counter() - started, snapshot=snapshots.ECONOMIC_INDICATORS)
+    snapshots.publish(snapshots.ECONOMIC_INDICATORS, data)
+
+
+async def refresh_price_history():
+    started = time.perf_counter()
+    await asyncio.to_thread(price_history.update_history)
+    metrics.refresh_duration.observe(time.perf_counter() - started, snapshot="price_history")
+
+
+def start_refresh_scheduler():
+    """
+    Schedules the refresh jobs for whichever live sources are configured.
+    Each job runs once immediately, then every DATA_REFRESH_INTERVAL seconds
+    (PRICE_HISTORY_REFRESH_INTERVAL for the price history).
+    """
+    global _scheduler
+    if _scheduler is not None or not settings.BACKGROUND_REFRESH_ENABLED:
+        return
+
+    jobs = []
+    if live_recommendations_service.is_live_mode():
+        jobs.append(refresh_recommendations)
+    if not is_demo_mode():
+        jobs.extend([refresh_sector_performance, refresh_economic_indicators])
+    if settings.PRICE_HISTORY_ENABLED and jobs:
+        jobs.append(refresh_price_history)
+
+    if not jobs:
+        logger.info("Background refresh: no live data sources configured")
+        return
+
+    from apscheduler.schedulers.asyncio import AsyncIOScheduler
+    _scheduler = AsyncIOScheduler()
+    for job in jobs:
+        _scheduler.add_job(
+            job,
+            "interval",
+            seconds=(
+                settings.PRICE_HISTORY_REFRESH_INTERVAL if job is refresh_price_history
+                else settings.DATA_REFRESH_INTERVAL
+            ),
+            id=job.__name__,
+            next_run_time=datetime.now(),
+            max_instances=1,
+            coalesce=True
+        )
+    _scheduler.start()
+
+    if refresh_recommendations in jobs:
+        live_recommendations_service.set_background_refresh(True)
+
+    logger.info(
+        f"Background refresh every {settings.DATA_REFRESH_INTERVAL}s: "
+        f"{', '.join(job.__name__ for job in jobs)}"
+    )
+
+
+def stop_refresh_scheduler():
+    global _scheduler
+    if _scheduler is not None:
+        _scheduler.shutdown(wait=False)
+        _scheduler = None
+        live_recommendations_service.set_background_refresh(False)
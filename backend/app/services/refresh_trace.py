@@ -0,0 +1,174 @@
+"""
+Per-stage tracing of the recommendation refresh pipeline.
+
+Each refresh gets a RefreshTrace. Inside it every ticker is traced
+separately, and code on the ticker's path (market data fetch, AI cache,
+prompt build, LLM call, JSON parse, recommendation build) times itself
+with span() or record(). The current ticker is carried in a ContextVar, so
+the per-ticker asyncio tasks of one refresh never mix their spans and code
+outside a refresh pays nothing.
+
+When a refresh finishes its spans are aggregated into a report: stage
+totals (summed busy time, which overlaps across concurrent tickers),
+refresh-level stages such as the batched price download, and the slowest
+tickers with their own stage breakdown. The last REFRESH_TRACE_HISTORY
+reports are kept for /api/debug/refreshes.
+"""
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, List, Optional
+import logging
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Stages, in pipeline order
+FETCH = "fetch"            # market data (yfinance fundamentals), including waiting for a fetch thread
+AI_CACHE = "ai_cache"      # analysis cache lookup and store
+PROMPT = "prompt"          # build_prompt
+LLM_WAIT = "llm_wait"      # waiting for an OpenAI concurrency slot or a retry backoff
+LLM = "llm"                # OpenAI call attempts
+PARSE = "parse"            # JSON decode of the completion
+BUILD = "build"            # _build_recommendation / repricing
+STAGES = [FETCH, AI_CACHE, PROMPT, LLM_WAIT, LLM, PARSE, BUILD]
+
+
+class TickerTrace:
+    """Stage timings of one ticker within a refresh"""
+
+    __slots__ = ("ticker", "started", "seconds", "stages", "status")
+
+    def __init__(self, ticker: str):
+        self.ticker = ticker
+        self.started = time.perf_counter()
+        self.seconds = 0.0
+        self.stages: Dict[str, float] = {}
+        self.status = "running"
+
+    def add(self, stage: str, seconds: float):
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "ticker": self.ticker,
+            "status": self.status,
+            "seconds": round(self.seconds, 4),
+            "stages": {stage: round(seconds, 4) for stage, seconds in self.stages.items()},
+        }
+
+
+_current: ContextVar[Optional[TickerTrace]] = ContextVar("refresh_ticker_trace", default=None)
+_reports: Deque[Dict[str, Any]] = deque(maxlen=max(1, settings.REFRESH_TRACE_HISTORY))
+
+
+def record(stage: str, seconds: float):
+    """Adds a measured duration to the current ticker's stage (no-op outside a traced ticker)"""
+    trace = _current.get()
+    if trace is not None:
+        trace.add(stage, seconds)
+
+
+@contextmanager
+def span(stage: str):
+    """Times the enclosed block as a stage of the current ticker"""
+    trace = _current.get()
+    if trace is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add(stage, time.perf_counter() - started)
+
+
+class RefreshTrace:
+    """Spans of one refresh, turned into a report by finish()"""
+
+    def __init__(self, tickers: int, incremental: bool):
+        self.started_at = time.time()
+        self._started = time.perf_counter()
+        self.ticker_count = tickers
+        self.incremental = incremental
+        self.refresh_stages: Dict[str, float] = {}
+        self.tickers: List[TickerTrace] = []
+
+    @contextmanager
+    def stage(self, name: str):
+        """Times a refresh-level stage (not tied to one ticker), e.g. the batched price download"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.refresh_stages[name] = self.refresh_stages.get(name, 0.0) + time.perf_counter() - started
+
+    @contextmanager
+    def ticker(self, ticker: str):
+        """
+        Traces the enclosed block as one ticker's work. Yields the TickerTrace,
+        whose status the caller sets (analyzed, reused, no_data, ...).
+        """
+        trace = TickerTrace(ticker)
+        self.tickers.append(trace)
+        token = _current.set(trace)
+        try:
+            yield trace
+        except BaseException:
+            trace.status = "error"
+            raise
+        finally:
+            _current.reset(token)
+            trace.seconds = time.perf_counter() - trace.started
+            if trace.status == "running":
+                trace.status = "done"
+
+    def finish(self, outcome: str) -> Dict[str, Any]:
+        """Aggregates the spans into a report and keeps it in the history"""
+        stages: Dict[str, Dict[str, float]] = {}
+        statuses: Dict[str, int] = {}
+        for trace in self.tickers:
+            statuses[trace.status] = statuses.get(trace.status, 0) + 1
+            for stage, seconds in trace.stages.items():
+                totals = stages.setdefault(stage, {"count": 0, "total_seconds": 0.0, "max_seconds": 0.0})
+                totals["count"] += 1
+                totals["total_seconds"] += seconds
+                totals["max_seconds"] = max(totals["max_seconds"], seconds)
+
+        ordered = sorted(stages, key=lambda s: STAGES.index(s) if s in STAGES else len(STAGES))
+        slowest = sorted(self.tickers, key=lambda t: t.seconds, reverse=True)[:settings.REFRESH_TRACE_SLOWEST]
+        report = {
+            "started_at": round(self.started_at, 3),
+            "duration_seconds": round(time.perf_counter() - self._started, 4),
+            "outcome": outcome,
+            "incremental": self.incremental,
+            "tickers": self.ticker_count,
+            "ticker_status": statuses,
+            "refresh_stages": {name: round(seconds, 4) for name, seconds in self.refresh_stages.items()},
+            "stages": {
+                stage: {
+                    "count": stages[stage]["count"],
+                    "total_seconds": round(stages[stage]["total_seconds"], 4),
+                    "mean_seconds": round(stages[stage]["total_seconds"] / stages[stage]["count"], 4),
+                    "max_seconds": round(stages[stage]["max_seconds"], 4),
+                }
+                for stage in ordered
+            },
+            "slowest_tickers": [trace.as_dict() for trace in slowest],
+        }
+        _reports.append(report)
+
+        if slowest:
+            busiest = max(report["stages"].items(), key=lambda item: item[1]["total_seconds"], default=None)
+            logger.info(
+                f"Refresh trace: {report['duration_seconds']}s, slowest {slowest[0].ticker} "
+                f"({slowest[0].seconds:.2f}s), most time in {busiest[0] if busiest else 'n/a'}"
+            )
+        return report
+
+
+def reports(limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Most recent refresh reports, newest first"""
+    latest = list(reversed(_reports))
+    return latest[:limit] if limit is not None else latest
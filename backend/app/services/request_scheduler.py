@@ -0,0 +1,211 @@
+"""
+Quota-aware request scheduler for upstream market data APIs.
+
+Each provider (Alpha Vantage, FRED) gets a token bucket sized to its configured
+per-minute quota. Callers await a slot before hitting the API; waiting requests
+are released in priority order and spaced so the quota is never exceeded,
+instead of firing back to back and getting throttled halfway through a refresh.
+
+The queues are shared by every event loop in the process (request handlers,
+the background refresher, blocking callers running their own loop), so
+waiters are always resolved on their own loop.
+"""
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from typing import Optional, Dict, Any, List, Tuple
+import logging
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Lower value = served first
+PRIORITY_INTERACTIVE = 0  # single-ticker lookups on behalf of a user request
+PRIORITY_REFRESH = 10     # bulk refreshes (sector ETFs, macro indicators)
+
+
+class TokenBucket:
+    """Classic token bucket: refills continuously at rate_per_minute, holds at most capacity"""
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.refill_per_second = max(rate_per_minute, 1e-6) / 60.0
+        self.capacity = capacity if capacity is not None else max(1.0, rate_per_minute)
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.refill_per_second)
+        self._updated = now
+
+    def available(self) -> float:
+        self._refill()
+        return self.tokens
+
+    def delay_until_available(self) -> float:
+        """Seconds until one token can be taken (0 if one is available now)"""
+        self._refill()
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.refill_per_second
+
+    def consume(self):
+        self._refill()
+        self.tokens -= 1
+
+    def drain(self):
+        """Empty the bucket, e.g. after the upstream reported we were throttled"""
+        self._refill()
+        self.tokens = 0.0
+
+
+class ProviderQueue:
+    """Priority queue of callers waiting on one provider's token bucket"""
+
+    def __init__(self, name: str, bucket: TokenBucket):
+        self.name = name
+        self.bucket = bucket
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()  # waiters and bucket are touched from several loops
+        self._timers: Dict[asyncio.AbstractEventLoop, Optional[asyncio.TimerHandle]] = {}
+        self.granted = 0
+        self.throttled = 0
+        self.total_wait_seconds = 0.0
+
+    async def acquire(self, priority: int = PRIORITY_REFRESH):
+        """Waits until this caller is first in line and a token is available"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        with self._lock:
+            heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+        started = time.monotonic()
+
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            # Let the next waiter (possibly on another loop) arm its own timer
+            self._dispatch()
+            raise
+
+        with self._lock:
+            self.total_wait_seconds += time.monotonic() - started
+
+    def report_throttled(self):
+        """Upstream rejected a call despite scheduling; back off for a full refill interval"""
+        with self._lock:
+            self.throttled += 1
+            self.bucket.drain()
+        logger.warning(f"{self.name} throttled the request; pausing its queue")
+
+    def _dispatch(self):
+        """Releases waiters while tokens last, then arms a timer for the next token"""
+        with self._lock:
+            while self._waiters:
+                _, _, future = self._waiters[0]
+                if future.done():
+                    # Caller was cancelled while queued
+                    heapq.heappop(self._waiters)
+                    continue
+
+                delay = self.bucket.delay_until_available()
+                if delay > 0:
+                    self._arm_timer(future.get_loop(), delay)
+                    return
+
+                heapq.heappop(self._waiters)
+                self.bucket.consume()
+                self.granted += 1
+                try:
+                    future.get_loop().call_soon_threadsafe(self._grant, future)
+                except RuntimeError:
+                    # The waiter's loop has closed; nobody is left to use the token
+                    self._refund()
+
+    def _grant(self, future: asyncio.Future):
+        """Resolves a waiter; runs on the waiter's own loop"""
+        if future.done():
+            # Cancelled after the token was handed out; pass it on
+            with self._lock:
+                self._refund()
+            self._dispatch()
+            return
+        future.set_result(None)
+
+    def _refund(self):
+        self.bucket.tokens = min(self.bucket.capacity, self.bucket.tokens + 1)
+        self.granted -= 1
+
+    def _arm_timer(self, loop: asyncio.AbstractEventLoop, delay: float):
+        """Schedules a dispatch on the head waiter's loop, which stays alive while it waits"""
+        if loop in self._timers:
+            return
+        # Forget loops that closed before their timer fired
+        self._timers = {other: timer for other, timer in self._timers.items() if not other.is_closed()}
+        self._timers[loop] = None
+        try:
+            loop.call_soon_threadsafe(self._start_timer, loop, delay)
+        except RuntimeError:
+            del self._timers[loop]
+
+    def _start_timer(self, loop: asyncio.AbstractEventLoop, delay: float):
+        with self._lock:
+            self._timers[loop] = loop.call_later(delay, self._on_timer, loop)
+
+    def _on_timer(self, loop: asyncio.AbstractEventLoop):
+        with self._lock:
+            self._timers.pop(loop, None)
+        self._dispatch()
+
+    def status(self) -> Dict[str, Any]:
+        """How far behind the queue is, given the configured quota"""
+        with self._lock:
+            queued = sum(1 for _, _, future in self._waiters if not future.done())
+            tokens = self.bucket.available()
+        backlog = max(0.0, queued - tokens)
+        return {
+            "queued": queued,
+            "tokens_available": round(tokens, 2),
+            "estimated_delay_seconds": round(backlog / self.bucket.refill_per_second, 1),
+            "granted": self.granted,
+            "throttled": self.throttled,
+            "avg_wait_seconds": round(self.total_wait_seconds / self.granted, 3) if self.granted else 0.0
+        }
+
+
+class RequestScheduler:
+    """Holds one ProviderQueue per upstream, created from settings on first use"""
+
+    def __init__(self):
+        self._queues: Dict[str, ProviderQueue] = {}
+
+    def _quota_per_minute(self, provider: str) -> float:
+        quotas = {
+            "alpha_vantage": settings.ALPHA_VANTAGE_CALLS_PER_MINUTE,
+            "fred": settings.FRED_CALLS_PER_MINUTE,
+        }
+        return quotas.get(provider, 60)
+
+    def queue(self, provider: str) -> ProviderQueue:
+        if provider not in self._queues:
+            self._queues[provider] = ProviderQueue(
+                provider,
+                TokenBucket(self._quota_per_minute(provider))
+            )
+        return self._queues[provider]
+
+    async def acquire(self, provider: str, priority: int = PRIORITY_REFRESH):
+        await self.queue(provider).acquire(priority)
+
+    def report_throttled(self, provider: str):
+        self.queue(provider).report_throttled()
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        return {name: queue.status() for name, queue in self._queues.items()}
+
+
+# Global scheduler instance
+request_scheduler = RequestScheduler()
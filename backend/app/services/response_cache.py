@@ -0,0 +1,169 @@
+"""
+Versioned cache of serialized API responses.
+
+Entries are keyed on (path, query parameters, data version) and hold the
+JSON body already encoded, plus a strong ETag derived from it. The data
+version is that of the snapshots the cached routes are built from
+(SOURCE_SNAPSHOTS); publishing one of them clears the cache, so a cached
+body is never served for data older than the latest snapshot. Other
+snapshots (sector ETF quotes, FRED indicators) leave it alone. Requests
+sending a matching If-None-Match get 304 Not Modified with no body.
+
+Bodies are encoded with a pydantic TypeAdapter for the route's response
+model, in one pass in pydantic-core, instead of FastAPI's per-request
+validation + jsonable_encoder. Routes keep response_model for the
+OpenAPI schema; the data served here is internally produced and already
+validated when it was built.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+import logging
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+from app.config import settings
+from app.services import snapshots, live_recommendations_service
+
+logger = logging.getLogger(__name__)
+
+CacheKey = Tuple[str, Tuple[Tuple[str, str], ...], Tuple[int, ...]]
+
+# Snapshots the cached routes are built from
+SOURCE_SNAPSHOTS = (snapshots.RECOMMENDATIONS,)
+
+
+class CachedResponse:
+    """A serialized JSON body and its ETag"""
+
+    __slots__ = ("body", "etag")
+
+    def __init__(self, body: bytes):
+        self.body = body
+        self.etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match uses weak comparison: W/ prefixes are ignored"""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+@lru_cache(maxsize=None)
+def _adapter(response_type: Any) -> TypeAdapter:
+    return TypeAdapter(response_type)
+
+
+def render_json(content: Any, response_type: Any) -> bytes:
+    """Serializes content as response_type straight to JSON bytes"""
+    return _adapter(response_type).dump_json(content)
+
+
+class ResponseCache:
+    """Bounded LRU of CachedResponse objects, cleared when a source snapshot is published"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[CacheKey, CachedResponse]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.invalidations = 0
+
+    def get(self, key: CacheKey) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: CacheKey, body: bytes) -> CachedResponse:
+        entry = CachedResponse(body)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def record_not_modified(self):
+        with self._lock:
+            self.not_modified += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "not_modified": self.not_modified,
+                "invalidations": self.invalidations
+            }
+
+
+def data_version() -> Tuple[int, ...]:
+    """Versions of the snapshots cached bodies are derived from"""
+    return tuple(snapshots.version(name) for name in SOURCE_SNAPSHOTS)
+
+
+def _invalidate(snapshot: snapshots.Snapshot):
+    if snapshot.name in SOURCE_SNAPSHOTS:
+        response_cache.clear()
+
+
+# Global cache instance, invalidated whenever a source snapshot is published
+response_cache = ResponseCache(max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES)
+snapshots.add_listener(_invalidate)
+
+
+async def cached_json_response(
+    request: Request,
+    build: Callable[[], Awaitable[Any]],
+    response_type: Any
+) -> Response:
+    """
+    Serves the cached body for this request's path, query and data version,
+    building it with build() and serializing it as response_type (the
+    route's response_model) on a miss.
+
+    An expired on-demand recommendations snapshot is refreshed first, so
+    the cache never hides a refresh that would otherwise have happened.
+    The data version is read before build() runs, so a snapshot published
+    while building can only leave an entry under a superseded version.
+    Exceptions from build() (e.g. HTTPException for a 404) are not cached.
+    """
+    if not settings.RESPONSE_CACHE_ENABLED:
+        return Response(content=render_json(await build(), response_type), media_type="application/json")
+
+    if live_recommendations_service.needs_refresh():
+        await live_recommendations_service.get_live_recommendations_async()
+
+    key: CacheKey = (
+        request.url.path,
+        tuple(sorted(request.query_params.multi_items())),
+        data_version()
+    )
+    entry = response_cache.get(key)
+    if entry is None:
+        entry = response_cache.put(key, render_json(await build(), response_type))
+
+    headers = {"ETag": entry.etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), entry.etag):
+        response_cache.record_not_modified()
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
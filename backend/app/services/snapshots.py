@@ -0,0 +1,88 @@
+"""
+Snapshot registry - latest completed result of each data refresh.
+
+Refreshers (background jobs or on-demand refreshes) publish a new snapshot
+when they finish; request handlers read the latest one without waiting on
+upstream fetches. Every publish bumps a process-wide data version, and
+each snapshot carries the version it was published at, so a downstream cache
+can key on just the snapshots it is built from (see version()).
+"""
+import time
+import threading
+from typing import Any, Callable, Dict, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Snapshot names
+RECOMMENDATIONS = "recommendations"
+SECTOR_PERFORMANCE = "sector_performance"
+ECONOMIC_INDICATORS = "economic_indicators"
+
+
+class Snapshot:
+    """An immutable published result with its version and publish time"""
+
+    __slots__ = ("name", "data", "version", "published_at")
+
+    def __init__(self, name: str, data: Any, version: int, published_at: float):
+        self.name = name
+        self.data = data
+        self.version = version
+        self.published_at = published_at
+
+    def age_seconds(self) -> float:
+        return time.time() - self.published_at
+
+
+_lock = threading.Lock()
+_snapshots: Dict[str, Snapshot] = {}
+_data_version = 0
+_listeners: List[Callable[[Snapshot], None]] = []
+
+
+def publish(name: str, data: Any) -> Snapshot:
+    """Replaces the named snapshot and notifies listeners"""
+    global _data_version
+    with _lock:
+        _data_version += 1
+        snapshot = Snapshot(name, data, _data_version, time.time())
+        _snapshots[name] = snapshot
+        listeners = list(_listeners)
+
+    for listener in listeners:
+        try:
+            listener(snapshot)
+        except Exception as e:
+            logger.error(f"Snapshot listener failed for {name}: {e}")
+    return snapshot
+
+
+def get(name: str) -> Optional[Snapshot]:
+    """Latest published snapshot, or None if nothing was published yet"""
+    return _snapshots.get(name)
+
+
+def data_version() -> int:
+    """Process-wide version, incremented on every publish"""
+    return _data_version
+
+
+def version(name: str) -> int:
+    """Version of the named snapshot (0 if nothing was published yet)"""
+    snapshot = _snapshots.get(name)
+    return snapshot.version if snapshot is not None else 0
+
+
+def add_listener(listener: Callable[[Snapshot], None]):
+    """Registers a callback run after each publish (e.g. cache invalidation)"""
+    with _lock:
+        _listeners.append(listener)
+
+
+def status() -> Dict[str, Dict[str, Any]]:
+    """Version and age of every published snapshot"""
+    return {
+        name: {"version": snapshot.version, "age_seconds": round(snapshot.age_seconds(), 1)}
+        for name, snapshot in _snapshots.items()
+    }
@@ -0,0 +1,51 @@
+"""
+Startup timing breakdown.
+
+main.py and the lifespan record how long each startup phase took
+(module imports, DB init, HTTP client, scheduler, each warmup step), so
+cold-start latency can be tracked per worker via /api/debug/startup and
+the "Startup complete" log line.
+"""
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+_phases: List[Dict[str, Any]] = []
+_ready_at: Optional[float] = None
+
+
+def record(name: str, seconds: float, status: str = "ok"):
+    """Adds one timed phase to the breakdown"""
+    _phases.append({"phase": name, "seconds": round(seconds, 4), "status": status})
+
+
+@contextmanager
+def phase(name: str):
+    """Times the enclosed block as one phase; failures are recorded, then re-raised"""
+    started = time.perf_counter()
+    status = "ok"
+    try:
+        yield
+    except BaseException as e:
+        status = f"error: {type(e).__name__}"
+        raise
+    finally:
+        record(name, time.perf_counter() - started, status)
+
+
+def mark_ready():
+    global _ready_at
+    _ready_at = time.time()
+
+
+def report() -> Dict[str, Any]:
+    """Phases in the order they ran, with their total"""
+    return {
+        "ready": _ready_at is not None,
+        "ready_at": _ready_at,
+        "total_seconds": round(sum(p["seconds"] for p in _phases), 4),
+        "phases": list(_phases),
+    }
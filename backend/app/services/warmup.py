@@ -0,0 +1,78 @@
+"""
+Startup warmup.
+
+Runs once in the lifespan, before the worker reports ready, so the first
+real request doesn't pay for lazy initialization: demo datasets, the
+OpenAPI schema behind /docs, and one in-process GET per
+STARTUP_WARMUP_PATHS entry. Those requests go through routing, the
+shared RecommendationEngine, the TypeAdapter serializers and fill the
+response cache for the current data version.
+
+When serving recommendations would run an inline refresh (live mode without
+the background refresher and no fresh snapshot), paths under
+STARTUP_WARMUP_LIVE_PATHS are skipped: warming them would run the whole
+ingestion pipeline and spend upstream and OpenAI quota before startup completes.
+
+Each step is timed in startup_profile and bounded by STARTUP_WARMUP_TIMEOUT;
+a step that fails or times out is logged and startup continues.
+"""
+import asyncio
+import logging
+import httpx
+from fastapi import FastAPI
+from app.config import settings
+from app.services import demo_data, startup_profile, live_recommendations_service
+
+logger = logging.getLogger(__name__)
+
+
+def _prime_demo_data():
+    demo_data.get_demo_macro_snapshot()
+    demo_data.get_demo_sector_analyses()
+    demo_data.get_demo_stock_recommendations()
+    demo_data.get_demo_geopolitical_risks()
+    for risk_tolerance in ("conservative", "moderate", "aggressive"):
+        demo_data.get_demo_portfolio_allocation(risk_tolerance)
+
+
+def _is_live_path(path: str) -> bool:
+    path = path.split("?", 1)[0].rstrip("/")
+    return any(
+        path == prefix or path.startswith(prefix + "/")
+        for prefix in (live.rstrip("/") for live in settings.STARTUP_WARMUP_LIVE_PATHS)
+    )
+
+
+async def _run_step(name: str, coro):
+    try:
+        with startup_profile.phase(f"warmup {name}"):
+            await asyncio.wait_for(coro, timeout=settings.STARTUP_WARMUP_TIMEOUT)
+    except asyncio.TimeoutError:
+        logger.warning(f"Warmup step '{name}' timed out after {settings.STARTUP_WARMUP_TIMEOUT}s")
+    except Exception as e:
+        logger.warning(f"Warmup step '{name}' failed: {e}")
+
+
+async def run_warmup(app: FastAPI):
+    """Primes the lazy paths listed in the module docstring"""
+    if not settings.STARTUP_WARMUP_ENABLED:
+        return
+
+    await _run_step("demo data", asyncio.to_thread(_prime_demo_data))
+    await _run_step("openapi", asyncio.to_thread(app.openapi))
+
+    paths = settings.STARTUP_WARMUP_PATHS
+    if live_recommendations_service.needs_refresh():
+        paths = [path for path in paths if not _is_live_path(path)]
+        skipped = len(settings.STARTUP_WARMUP_PATHS) - len(paths)
+        if skipped:
+            logger.info(f"Warmup: skipping {skipped} live-data paths until recommendations are refreshed")
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://warmup") as client:
+        for path in paths:
+            async def get(path=path):
+                response = await client.get(path)
+                if response.status_code >= 400:
+                    raise RuntimeError(f"GET {path} returned {response.status_code}")
+            await _run_step(f"GET {path}", get())
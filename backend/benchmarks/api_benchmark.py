@@ -0,0 +1,263 @@
+"""
+End-to-end API benchmark.
+
+Drives the FastAPI app in-process (httpx.ASGITransport, full lifespan
+including warmup) and reports p50/p95/p99 latency and requests per second
+per route, in two modes:
+
+- demo: no API keys, demo data
+- live: API keys set, with yfinance, OpenAI, Alpha Vantage and FRED
+  replaced by deterministic offline fakes (benchmarks/fakes.py) that sleep
+  --upstream-latency-ms per call. With --upstream-url the live mode instead
+  talks over HTTP to a running stand-in (benchmarks/standin.py), which sets
+  its own latency and faults. Measurement starts after the first
+  background refresh has published recommendations.
+
+Each mode runs in its own interpreter, because settings are read from the
+environment at import time. Results are written as JSON; with --thresholds
+the run exits non-zero if any route is slower than its p95 budget or below
+its minimum RPS.
+
+Run from backend/:
+    python -m benchmarks.api_benchmark [--modes demo live] [--requests 500]
+        [--concurrency 8] [--output results.json]
+        [--upstream-url http://127.0.0.1:8900]
+        [--thresholds benchmarks/thresholds.json]
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+ROUTES = [
+    "/api/dashboard",
+    "/api/recommendations",
+    "/api/recommendations?limit=50",
+    "/api/recommendations?strategy=value&limit=50",
+    "/api/recommendations/screaming-buys",
+    "/api/sectors",
+    "/api/macro",
+    "/api/macro/cycle",
+    "/api/portfolio/allocation",
+    "/api/portfolio/recommendations",
+]
+
+
+def _mode_environment(
+    mode: str,
+    workdir: str,
+    upstream_latency_ms: float,
+    upstream_url: Optional[str] = None
+) -> Dict[str, str]:
+    env = dict(os.environ)
+    env.update({
+        "DB_URL": f"sqlite+aiosqlite:///{os.path.join(workdir, 'bench.db')}",
+        "AI_CACHE_DIR": os.path.join(workdir, "ai_cache"),
+        "PRICE_HISTORY_DIR": os.path.join(workdir, "price_history"),
+        "BENCH_UPSTREAM_LATENCY_MS": str(upstream_latency_ms),
+    })
+    if mode == "demo":
+        env.update({"OPENAI_API_KEY": "", "ALPHA_VANTAGE_API_KEY": "", "FRED_API_KEY": ""})
+    else:
+        env.update({
+            "OPENAI_API_KEY": "bench",
+            "ALPHA_VANTAGE_API_KEY": "bench",
+            "FRED_API_KEY": "bench",
+            # Fakes have no quota; don't let the free-tier pacing dominate the refresh
+            "ALPHA_VANTAGE_CALLS_PER_MINUTE": "100000",
+            "FRED_CALLS_PER_MINUTE": "100000",
+        })
+        if upstream_url:
+            env.update({
+                "BENCH_UPSTREAM_URL": upstream_url,
+                "ALPHA_VANTAGE_BASE_URL": f"{upstream_url}/alphavantage",
+                "FRED_BASE_URL": f"{upstream_url}/fred",
+                "YFINANCE_BASE_URL": f"{upstream_url}/yfinance",
+                "OPENAI_BASE_URL": f"{upstream_url}/openai/v1",
+            })
+    return env
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+async def _measure_route(client, route: str, requests: int, concurrency: int, warmup: int) -> Dict[str, Any]:
+    for _ in range(warmup):
+        await client.get(route)
+
+    latencies: List[float] = []
+    errors = 0
+    remaining = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            started = time.perf_counter()
+            response = await client.get(route)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "p50_ms": round(_percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(_percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(_percentile(latencies, 99) * 1000, 3),
+        "max_ms": round(latencies[-1] * 1000, 3) if latencies else 0.0,
+        "rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+    }
+
+
+async def _run_mode(mode: str, requests: int, concurrency: int, warmup: int) -> Dict[str, Any]:
+    """Runs inside the per-mode interpreter, with the environment already set"""
+    import logging
+    logging.disable(logging.WARNING)
+    import httpx
+
+    latency = float(os.environ.get("BENCH_UPSTREAM_LATENCY_MS", "0")) / 1000
+    use_fakes = mode == "live" and not os.environ.get("BENCH_UPSTREAM_URL")
+    if use_fakes:
+        from benchmarks import fakes
+        fakes.install_yfinance_fakes(latency)
+        fakes.install_openai_fake(latency)
+
+    from app.main import app
+    from app.services import http_client, snapshots
+
+    if use_fakes:
+        await http_client.init_http_client(transport=fakes.upstream_transport(latency))
+
+    results: Dict[str, Any] = {}
+    startup_started = time.perf_counter()
+    async with app.router.lifespan_context(app):
+        if mode == "live":
+            # Wait for the background refresher's first snapshot
+            deadline = time.monotonic() + 300
+            while snapshots.get(snapshots.RECOMMENDATIONS) is None:
+                if time.monotonic() > deadline:
+                    raise SystemExit("live mode: no recommendations snapshot after 300s")
+                await asyncio.sleep(0.05)
+        ready_seconds = time.perf_counter() - startup_started
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for route in ROUTES:
+                results[route] = await _measure_route(client, route, requests, concurrency, warmup)
+
+        from app.services.ai_analysis_service import get_usage_stats
+        snapshot = snapshots.get(snapshots.RECOMMENDATIONS)
+        upstream = {
+            "live_recommendations": len(snapshot.data) if snapshot else 0,
+            "openai_calls": get_usage_stats()["calls"],
+            "http_requests": sum(s["requests"] for s in http_client.get_connection_stats().values()),
+        }
+
+    return {"ready_seconds": round(ready_seconds, 3), "upstream": upstream, "routes": results}
+
+
+def _check_thresholds(results: Dict[str, Any], thresholds: Dict[str, Any]) -> List[str]:
+    violations = []
+    for mode, mode_results in results.items():
+        limits = thresholds.get(mode, {})
+        defaults = limits.get("default", {})
+        for route, stats in mode_results["routes"].items():
+            limit = {**defaults, **limits.get(route, {})}
+            if stats["errors"]:
+                violations.append(f"{mode} {route}: {stats['errors']} error responses")
+            if "p95_ms" in limit and stats["p95_ms"] > limit["p95_ms"]:
+                violations.append(f"{mode} {route}: p95 {stats['p95_ms']}ms > {limit['p95_ms']}ms")
+            if "min_rps" in limit and stats["rps"] < limit["min_rps"]:
+                violations.append(f"{mode} {route}: {stats['rps']} rps < {limit['min_rps']} rps")
+    return violations
+
+
+def _print_table(results: Dict[str, Any]):
+    print(f"{'mode':<5} {'route':<46} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'rps':>9}")
+    for mode, mode_results in results.items():
+        for route, s in mode_results["routes"].items():
+            print(f"{mode:<5} {route:<46} {s['p50_ms']:8.2f} {s['p95_ms']:8.2f} {s['p99_ms']:8.2f} {s['rps']:9.1f}")
+        print(f"{mode:<5} ready after {mode_results['ready_seconds']}s; upstream: {mode_results['upstream']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--modes", nargs="+", choices=["demo", "live"], default=["demo", "live"])
+    parser.add_argument("--requests", type=int, default=500, help="measured requests per route")
+    parser.add_argument("--concurrency", type=int, default=8, help="in-flight requests per route")
+    parser.add_argument("--warmup", type=int, default=20, help="unmeasured requests per route")
+    parser.add_argument("--upstream-latency-ms", type=float, default=20.0, help="fake upstream latency (live)")
+    parser.add_argument("--upstream-url", help="stand-in server base URL for live mode, instead of in-process fakes")
+    parser.add_argument("--output", help="write results JSON here")
+    parser.add_argument("--thresholds", help="JSON of per-mode, per-route p95_ms / min_rps limits")
+    parser.add_argument("--worker", choices=["demo", "live"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        result = asyncio.run(_run_mode(args.worker, args.requests, args.concurrency, args.warmup))
+        print(json.dumps(result))
+        return
+
+    results: Dict[str, Any] = {}
+    for mode in args.modes:
+        with tempfile.TemporaryDirectory() as workdir:
+            completed = subprocess.run(
+                [
+                    sys.executable, "-m", "benchmarks.api_benchmark", "--worker", mode,
+                    "--requests", str(args.requests),
+                    "--concurrency", str(args.concurrency),
+                    "--warmup", str(args.warmup),
+                ],
+                env=_mode_environment(mode, workdir, args.upstream_latency_ms, args.upstream_url),
+                capture_output=True,
+                text=True
+            )
+        if completed.returncode != 0:
+            raise SystemExit(f"{mode} benchmark failed:\n{completed.stderr[-3000:]}")
+        results[mode] = json.loads(completed.stdout.strip().splitlines()[-1])
+
+    _print_table(results)
+
+    report = {
+        "config": {
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "warmup": args.warmup,
+            "upstream_latency_ms": args.upstream_latency_ms,
+            "upstream_url": args.upstream_url,
+            "python": sys.version.split()[0],
+        },
+        "results": results,
+    }
+    violations = []
+    if args.thresholds:
+        with open(args.thresholds, "r", encoding="utf-8") as f:
+            violations = _check_thresholds(results, json.load(f))
+        report["violations"] = violations
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if violations:
+        raise SystemExit("Threshold violations:\n  " + "\n  ".join(violations))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""
+Deterministic offline stand-ins for the live upstreams, used by the API
+benchmark in stubbed live mode:
+
+- yfinance: download() and Ticker().info return synthetic prices and fundamentals
+- OpenAI: AsyncOpenAI returns a fixed-shape JSON analysis per ticker
+- Alpha Vantage / FRED: an httpx.MockTransport for the shared HTTP client
+
+The stand-in server (benchmarks/standin.py) reuses these to answer
+requests that have no recorded cassette.
+
+Every response is derived from a hash of its input, so runs are repeatable.
+Each call sleeps for the configured latency to model network time.
+"""
+import asyncio
+import hashlib
+import json
+import time
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+import httpx
+
+
+def _unit(*parts: str) -> float:
+    """Stable pseudo-random number in [0, 1) for the given inputs"""
+    digest = hashlib.sha256("|".join(parts).encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") / 2 ** 64
+
+
+def _price(ticker: str) -> float:
+    return round(20 + _unit(ticker, "price") * 480, 2)
+
+
+SECTORS = [
+    "Technology", "Healthcare", "Financials", "Energy", "Consumer Defensive",
+    "Consumer Cyclical", "Industrials", "Basic Materials", "Real Estate",
+    "Communication Services", "Utilities"
+]
+
+
+# yfinance
+
+class FakeTicker:
+    latency = 0.0
+
+    def __init__(self, ticker: str):
+        self.ticker = ticker
+
+    @property
+    def info(self) -> dict:
+        time.sleep(self.latency)
+        t = self.ticker
+        price = _price(t)
+        return {
+            "currentPrice": price,
+            "longName": f"{t} Holdings",
+            "sector": SECTORS[int(_unit(t, "sector") * len(SECTORS))],
+            "targetMeanPrice": round(price * (0.85 + _unit(t, "target") * 0.5), 2),
+            "trailingPE": round(8 + _unit(t, "pe") * 40, 1),
+            "forwardPE": round(8 + _unit(t, "fpe") * 35, 1),
+            "pegRatio": round(0.5 + _unit(t, "peg") * 3, 2),
+            "dividendYield": round(_unit(t, "div") * 0.05, 4),
+            "marketCap": int(5e9 + _unit(t, "cap") * 2e12),
+            "fiftyTwoWeekHigh": round(price * 1.2, 2),
+            "fiftyTwoWeekLow": round(price * 0.7, 2),
+            "beta": round(0.5 + _unit(t, "beta"), 2),
+            "recommendationKey": "buy",
+            "numberOfAnalystOpinions": 20,
+        }
+
+
+def fake_history(ticker: str, start: str, end: Optional[str] = None) -> Dict[str, list]:
+    """
+    Daily OHLCV columns for business days from start to end (inclusive).
+    The series is a random walk anchored at the ticker's fake price on the
+    latest business day, so overlapping requests return the same bars.
+    """
+    import numpy as np
+    import pandas as pd
+
+    anchor = pd.offsets.BDay().rollback(pd.Timestamp.today().normalize())
+    start, end = pd.Timestamp(start), pd.Timestamp(end) if end else anchor
+    span = pd.bdate_range(min(start, anchor), max(end, anchor))
+    steps = np.array([_unit(ticker, "bar", str(day.date())) - 0.5 for day in span]) * 0.04
+    walk = np.cumsum(steps)
+    walk -= walk[span.get_loc(anchor)]
+    days = (span >= start) & (span <= end)
+    closes = _price(ticker) * np.exp(walk[days])
+    return {
+        "date": [day.date().isoformat() for day in span[days]],
+        "open": (closes * 0.995).round(2).tolist(),
+        "high": (closes * 1.01).round(2).tolist(),
+        "low": (closes * 0.985).round(2).tolist(),
+        "close": closes.round(2).tolist(),
+        "volume": [float(int(1e6 + _unit(ticker, "volume", str(day.date())) * 5e7)) for day in span[days]],
+    }
+
+
+def fake_download(
+    tickers: List[str],
+    latency: float = 0.0,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    **kwargs
+):
+    """yf.download stand-in: the last 5 business days, or start until end (exclusive)"""
+    import pandas as pd
+
+    time.sleep(latency)
+    if start is None:
+        start = (pd.Timestamp.today().normalize() - pd.offsets.BDay(4)).date().isoformat()
+    if end is not None:
+        end = (pd.Timestamp(end) - pd.Timedelta(days=1)).date().isoformat()
+    frames = {}
+    for t in tickers:
+        history = fake_history(t, start, end)
+        frames[t] = pd.DataFrame(
+            {field.capitalize(): history[field] for field in ["open", "high", "low", "close", "volume"]},
+            index=pd.to_datetime(history["date"])
+        )
+    return pd.concat(frames, axis=1)
+
+
+def install_yfinance_fakes(latency: float):
+    import yfinance
+
+    FakeTicker.latency = latency
+    yfinance.Ticker = FakeTicker
+    yfinance.download = lambda tickers, **kwargs: fake_download(list(tickers), latency, **kwargs)
+
+
+# OpenAI
+
+def fake_analysis(prompt: str) -> str:
+    """JSON analysis content for an analysis prompt, keyed on its ticker"""
+    ticker = prompt.split("Stock: ", 1)[-1].split(" ", 1)[0]
+    price = _price(ticker)
+    conviction = round(40 + _unit(ticker, "conviction") * 55, 1)
+    upside = _unit(ticker, "upside") * 0.45 - 0.1
+    return json.dumps({
+        "conviction_score": conviction,
+        "recommendation": "STRONG_BUY" if upside > 0.2 else "BUY" if upside > 0.1 else "HOLD",
+        "fair_value_estimate": round(price * (1 + upside), 2),
+        "tailwinds": ["Secular demand", "Pricing power", "Operating leverage"],
+        "headwinds": ["Valuation", "Rates"],
+        "rationale": f"Deterministic benchmark analysis for {ticker}.",
+        "is_screaming_buy": conviction >= 80 and upside > 0.1,
+        "time_horizon": "12-18 months",
+    })
+
+
+class _FakeCompletions:
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    async def create(self, model: str, messages: list, **kwargs):
+        await asyncio.sleep(self.latency)
+        content = fake_analysis(messages[-1]["content"])
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+            usage=SimpleNamespace(prompt_tokens=600, completion_tokens=150, total_tokens=750),
+        )
+
+
+def install_openai_fake(latency: float):
+    import openai
+
+    class FakeAsyncOpenAI:
+        def __init__(self, **kwargs):
+            self.chat = SimpleNamespace(completions=_FakeCompletions(latency))
+
+        async def close(self):
+            pass
+
+    openai.AsyncOpenAI = FakeAsyncOpenAI
+
+
+# Alpha Vantage / FRED
+
+def upstream_transport(latency: float) -> httpx.MockTransport:
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(latency)
+        params = request.url.params
+        if "stlouisfed" in request.url.host:
+            series_id = params.get("series_id", "")
+            value = round(_unit(series_id, "fred") * 10, 2)
+            return httpx.Response(200, json={"observations": [{"date": "2026-01-01", "value": str(value)}]})
+
+        symbol = params.get("symbol", "")
+        if params.get("function") == "OVERVIEW":
+            return httpx.Response(200, json={
+                "Symbol": symbol,
+                "Name": f"{symbol} Holdings",
+                "PERatio": str(round(8 + _unit(symbol, "pe") * 40, 1)),
+                "MarketCapitalization": str(int(5e9 + _unit(symbol, "cap") * 2e12)),
+            })
+        price = _price(symbol)
+        change = round((_unit(symbol, "change") - 0.5) * 4, 2)
+        return httpx.Response(200, json={"Global Quote": {
+            "01. symbol": symbol,
+            "05. price": f"{price:.2f}",
+            "06. volume": str(int(1e6 + _unit(symbol, "volume") * 5e7)),
+            "07. latest trading day": "2026-01-09",
+            "09. change": f"{change:.2f}",
+            "10. change percent": f"{change / price * 100:.4f}%",
+        }})
+
+    return httpx.MockTransport(handler)
@@ -0,0 +1,80 @@
+"""
+Import-time budget check for app.main.
+
+Imports app.main in a fresh interpreter with `python -X importtime`,
+prints the slowest modules (cumulative time, including their own imports)
+and fails if the total exceeds the budget or if a live-only dependency
+(yfinance, pandas, openai, apscheduler) was loaded at import time.
+
+Run from backend/:
+    python -m benchmarks.import_budget [--budget-ms 1500] [--top 15]
+"""
+import argparse
+import re
+import subprocess
+import sys
+from typing import List, Tuple
+
+# Only needed once live mode fetches data; must not load on import
+LIVE_ONLY_MODULES = ["yfinance", "pandas", "openai", "apscheduler"]
+
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def measure(module: str) -> List[Tuple[str, int, int, int]]:
+    """(module, self_us, cumulative_us, depth) for every module imported by `import module`"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        raise SystemExit(f"import {module} failed:\n{result.stderr[-2000:]}")
+
+    rows = []
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            rows.append((name, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--budget-ms", type=float, default=1500.0)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    rows = measure(args.module)
+    total_ms = next(cum for name, _, cum, _ in rows if name == args.module) / 1000
+    loaded = {name for name, _, _, _ in rows}
+
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for name, self_us, cumulative_us, depth in sorted(rows, key=lambda row: row[2], reverse=True)[:args.top]:
+        print(f"{cumulative_us / 1000:14.1f} {self_us / 1000:9.1f}  {'  ' * depth}{name}")
+
+    print()
+    print("app modules:")
+    for name, self_us, cumulative_us, _ in sorted(
+        (row for row in rows if row[0].startswith("app.")), key=lambda row: row[2], reverse=True
+    ):
+        print(f"{cumulative_us / 1000:14.1f} {self_us / 1000:9.1f}  {name}")
+
+    failures = []
+    if total_ms > args.budget_ms:
+        failures.append(f"import {args.module} took {total_ms:.0f} ms (budget {args.budget_ms:.0f} ms)")
+    eager = [name for name in LIVE_ONLY_MODULES if name in loaded]
+    if eager:
+        failures.append(f"live-only dependencies imported eagerly: {', '.join(eager)}")
+
+    print()
+    print(f"total: {total_ms:.0f} ms (budget {args.budget_ms:.0f} ms)")
+    if failures:
+        raise SystemExit("FAILED: " + "; ".join(failures))
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
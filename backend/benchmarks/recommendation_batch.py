@@ -0,0 +1,98 @@
+"""
+Benchmark: batch vs per-ticker recommendation generation.
+
+Generates a synthetic universe (default 10,000 tickers), runs
+AnalysisEngine.generate_stock_recommendation once per ticker and
+generate_stock_recommendations_batch once, checks the outputs are
+identical, and prints timings.
+
+Run from backend/:
+    python -m benchmarks.recommendation_batch [--tickers 10000] [--seed 42]
+"""
+import argparse
+import random
+import time
+from app.models.schemas import MacroSnapshot
+from app.services import demo_data
+from app.services.analysis_engine import AnalysisEngine
+
+SECTORS = [
+    'Technology', 'Healthcare', 'Financials', 'Energy', 'Utilities',
+    'Consumer Staples', 'Consumer Discretionary', 'Industrials',
+    'Materials', 'Real Estate', 'Communication Services'
+]
+WINDS = ["Secular demand", "Pricing power", "Margin pressure", "Regulation", "Rates"]
+
+
+def make_universe(n: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    prices = [round(rng.uniform(5, 900), 2) for _ in range(n)]
+    return {
+        "tickers": [f"T{i:05d}" for i in range(n)],
+        "company_names": [f"Company {i}" for i in range(n)],
+        "sectors": [rng.choice(SECTORS) for _ in range(n)],
+        "current_prices": prices,
+        "fair_values": [round(p * rng.uniform(0.6, 1.5), 2) for p in prices],
+        "pe_ratios": [rng.choice([None, round(rng.uniform(5, 60), 1)]) for _ in range(n)],
+        "peg_ratios": [rng.choice([None, round(rng.uniform(0.3, 4), 2)]) for _ in range(n)],
+        "dividend_yields": [rng.choice([None, round(rng.uniform(0, 6), 2)]) for _ in range(n)],
+        "market_caps": [round(rng.uniform(0.5, 3000), 1) for _ in range(n)],
+        "sector_scores": [round(rng.uniform(20, 90), 1) for _ in range(n)],
+        "headwinds": [rng.sample(WINDS, rng.randint(0, 4)) for _ in range(n)],
+        "tailwinds": [rng.sample(WINDS, rng.randint(0, 4)) for _ in range(n)],
+        "rationales": ["Synthetic benchmark row"] * n,
+    }
+
+
+def run_scalar(engine: AnalysisEngine, u: dict, macro: MacroSnapshot) -> list:
+    return [
+        engine.generate_stock_recommendation(
+            ticker=u["tickers"][i],
+            company_name=u["company_names"][i],
+            sector=u["sectors"][i],
+            current_price=u["current_prices"][i],
+            fair_value=u["fair_values"][i],
+            pe_ratio=u["pe_ratios"][i],
+            peg_ratio=u["peg_ratios"][i],
+            dividend_yield=u["dividend_yields"][i],
+            market_cap=u["market_caps"][i],
+            sector_score=u["sector_scores"][i],
+            macro_data=macro,
+            headwinds=u["headwinds"][i],
+            tailwinds=u["tailwinds"][i],
+            rationale=u["rationales"][i]
+        )
+        for i in range(len(u["tickers"]))
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tickers", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    engine = AnalysisEngine()
+    macro = demo_data.get_demo_macro_snapshot()
+    universe = make_universe(args.tickers, args.seed)
+
+    start = time.perf_counter()
+    scalar = run_scalar(engine, universe, macro)
+    scalar_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = engine.generate_stock_recommendations_batch(**universe)
+    batch_seconds = time.perf_counter() - start
+
+    mismatches = sum(1 for a, b in zip(scalar, batch) if a.model_dump() != b.model_dump())
+    if len(scalar) != len(batch) or mismatches:
+        raise SystemExit(f"Batch output differs from scalar path in {mismatches} rows")
+
+    print(f"tickers:  {args.tickers}")
+    print(f"scalar:   {scalar_seconds * 1000:.1f} ms")
+    print(f"batch:    {batch_seconds * 1000:.1f} ms ({scalar_seconds / batch_seconds:.1f}x)")
+    print("outputs:  identical")
+
+
+if __name__ == "__main__":
+    main()
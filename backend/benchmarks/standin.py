@@ -0,0 +1,501 @@
+"""
+Record/replay stand-in for the live upstreams (Alpha Vantage, FRED,
+yfinance, OpenAI), for load-testing the live code paths on an isolated box.
+
+Point the app at it through the upstream base URL settings:
+
+    ALPHA_VANTAGE_BASE_URL=http://127.0.0.1:8900/alphavantage
+    FRED_BASE_URL=http://127.0.0.1:8900/fred
+    YFINANCE_BASE_URL=http://127.0.0.1:8900/yfinance
+    OPENAI_BASE_URL=http://127.0.0.1:8900/openai/v1
+
+Modes:
+- record: forwards each request to the real upstream (with the API keys the
+  app sends) and saves successful responses as cassettes, one JSON file per
+  request under --cassettes/<provider>/. Already-recorded requests are
+  served from the cassette.
+- replay: serves cassettes only; never touches the network. Requests with
+  no cassette get a 404, or with --on-miss fake a deterministic synthetic
+  response from benchmarks/fakes.py.
+
+Requests are matched without their API keys, so cassettes hold no secrets
+and replay works with any key.
+
+Fault injection applies per request, before the response is served:
+--latency-ms / --jitter-ms add delay (--recorded-latency adds the upstream
+time measured while recording), --error-rate answers 429 with Retry-After,
+--timeout-rate holds the request for --timeout-seconds and then answers 504.
+Per-provider overrides come from --faults (JSON, same keys per provider) and
+can be changed on a running server with PUT /_standin/faults. Counters are at
+GET /_standin/stats.
+
+Run from backend/:
+    python -m benchmarks.standin --mode record [--port 8900]
+    python -m benchmarks.standin --mode replay --latency-ms 150 --error-rate 0.02
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+import time
+from datetime import date
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlencode
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+ALPHA_VANTAGE = "alpha_vantage"
+FRED = "fred"
+YFINANCE = "yfinance"
+OPENAI = "openai"
+PROVIDERS = [ALPHA_VANTAGE, FRED, YFINANCE, OPENAI]
+
+UPSTREAM_URLS = {
+    ALPHA_VANTAGE: "https://www.alphavantage.co",
+    FRED: "https://api.stlouisfed.org",
+    OPENAI: "https://api.openai.com/v1",
+}
+
+# Never part of a cassette key
+SECRET_PARAMS = {"apikey", "api_key"}
+
+
+class Faults:
+    """Injected latency and failure rates for one provider"""
+
+    FIELDS = ["latency_ms", "jitter_ms", "error_rate", "timeout_rate", "timeout_seconds", "recorded_latency"]
+
+    def __init__(
+        self,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        error_rate: float = 0.0,
+        timeout_rate: float = 0.0,
+        timeout_seconds: float = 30.0,
+        recorded_latency: bool = False
+    ):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.timeout_rate = timeout_rate
+        self.timeout_seconds = timeout_seconds
+        self.recorded_latency = recorded_latency
+
+    def updated(self, overrides: Dict[str, Any]) -> "Faults":
+        unknown = set(overrides) - set(self.FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown fault settings: {sorted(unknown)}")
+        return Faults(**{**self.as_dict(), **overrides})
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+
+class CassetteStore:
+    """Recorded responses, one JSON file per (provider, request key)"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._cassettes: Dict[str, Dict[str, Any]] = {}
+        for provider in PROVIDERS:
+            provider_dir = os.path.join(directory, provider)
+            if not os.path.isdir(provider_dir):
+                continue
+            for name in os.listdir(provider_dir):
+                if name.endswith(".json"):
+                    with open(os.path.join(provider_dir, name), "r", encoding="utf-8") as f:
+                        cassette = json.load(f)
+                    self._cassettes[self._id(provider, cassette["key"])] = cassette
+
+    @staticmethod
+    def _id(provider: str, key: str) -> str:
+        return hashlib.sha256(f"{provider}\n{key}".encode("utf-8")).hexdigest()[:32]
+
+    def get(self, provider: str, key: str) -> Optional[Dict[str, Any]]:
+        return self._cassettes.get(self._id(provider, key))
+
+    def put(self, provider: str, key: str, body: Any, elapsed_ms: float):
+        cassette_id = self._id(provider, key)
+        cassette = {
+            "provider": provider,
+            "key": key,
+            "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "elapsed_ms": round(elapsed_ms, 1),
+            "body": body,
+        }
+        provider_dir = os.path.join(self.directory, provider)
+        os.makedirs(provider_dir, exist_ok=True)
+        path = os.path.join(provider_dir, f"{cassette_id}.json")
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(cassette, f, indent=1, default=str)
+        os.replace(path + ".tmp", path)
+        self._cassettes[cassette_id] = cassette
+
+    def __len__(self) -> int:
+        return len(self._cassettes)
+
+
+def _query_key(params: Dict[str, str]) -> str:
+    """Sorted query string without API keys"""
+    return urlencode(sorted((k, v) for k, v in params.items() if k not in SECRET_PARAMS))
+
+
+def _throttled(provider: str, body: Any) -> bool:
+    """Alpha Vantage signals quota exhaustion with a 200 + Note/Information"""
+    return provider == ALPHA_VANTAGE and isinstance(body, dict) and ("Note" in body or "Information" in body)
+
+
+def _error_body(provider: str, message: str, code: str) -> Dict[str, Any]:
+    if provider == OPENAI:
+        return {"error": {"message": message, "type": code, "code": code}}
+    return {"error": message}
+
+
+def _chat_completion(model: str, content: str) -> Dict[str, Any]:
+    """OpenAI chat.completion envelope around the given message content"""
+    return {
+        "id": f"chatcmpl-standin-{hashlib.sha256(content.encode('utf-8')).hexdigest()[:12]}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": content},
+            "finish_reason": "stop",
+        }],
+        "usage": {"prompt_tokens": 600, "completion_tokens": 150, "total_tokens": 750},
+    }
+
+
+def create_app(
+    cassettes: CassetteStore,
+    mode: str,
+    faults: Dict[str, Faults],
+    on_miss: str = "error",
+    seed: Optional[int] = None
+) -> FastAPI:
+    upstream: Dict[str, httpx.AsyncClient] = {}
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        yield
+        if "client" in upstream:
+            await upstream["client"].aclose()
+
+    app = FastAPI(title="Alpha Oracle upstream stand-in", docs_url=None, redoc_url=None, lifespan=lifespan)
+    rng = random.Random(seed)
+    stats = {
+        provider: {"requests": 0, "hits": 0, "misses": 0, "recorded": 0, "injected_429": 0, "injected_timeouts": 0}
+        for provider in PROVIDERS
+    }
+
+    def upstream_client() -> httpx.AsyncClient:
+        if "client" not in upstream:
+            upstream["client"] = httpx.AsyncClient(timeout=120.0)
+        return upstream["client"]
+
+    async def inject(provider: str, cassette: Optional[Dict[str, Any]]) -> Optional[JSONResponse]:
+        """Applies the provider's faults; returns a response if the request should fail"""
+        fault = faults[provider]
+        delay_ms = fault.latency_ms + rng.uniform(-fault.jitter_ms, fault.jitter_ms)
+        if fault.recorded_latency and cassette:
+            delay_ms += cassette.get("elapsed_ms", 0.0)
+        if delay_ms > 0:
+            await asyncio.sleep(delay_ms / 1000)
+
+        roll = rng.random()
+        if roll < fault.timeout_rate:
+            stats[provider]["injected_timeouts"] += 1
+            await asyncio.sleep(fault.timeout_seconds)
+            return JSONResponse(_error_body(provider, "Injected timeout", "timeout"), status_code=504)
+        if roll < fault.timeout_rate + fault.error_rate:
+            stats[provider]["injected_429"] += 1
+            return JSONResponse(
+                _error_body(provider, "Injected rate limit", "rate_limit_exceeded"),
+                status_code=429,
+                headers={"Retry-After": "1"}
+            )
+        return None
+
+    async def serve(provider: str, key: str, record, fake) -> JSONResponse:
+        """Cassette if recorded, else record upstream / fake / 404 depending on mode"""
+        stats[provider]["requests"] += 1
+        cassette = cassettes.get(provider, key)
+        if cassette is not None:
+            stats[provider]["hits"] += 1
+        else:
+            stats[provider]["misses"] += 1
+
+        failure = await inject(provider, cassette)
+        if failure is not None:
+            return failure
+        if cassette is not None:
+            return JSONResponse(cassette["body"])
+
+        if mode == "record":
+            started = time.perf_counter()
+            status, body = await record()
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            if status == 200 and not _throttled(provider, body):
+                cassettes.put(provider, key, body, elapsed_ms)
+                stats[provider]["recorded"] += 1
+            return JSONResponse(body, status_code=status)
+        if on_miss == "fake":
+            return JSONResponse(await fake())
+        return JSONResponse(_error_body(provider, f"No cassette for {key}", "not_recorded"), status_code=404)
+
+    # Alpha Vantage / FRED: plain GET + query string
+
+    async def forward_get(provider: str, path: str, params: Dict[str, str]):
+        response = await upstream_client().get(f"{UPSTREAM_URLS[provider]}{path}", params=params)
+        return response.status_code, response.json()
+
+    async def fake_get(provider: str, path: str, params: Dict[str, str]):
+        from benchmarks import fakes
+        request = httpx.Request("GET", f"{UPSTREAM_URLS[provider]}{path}", params=params)
+        response = await fakes.upstream_transport(0.0).handle_async_request(request)
+        await response.aread()
+        return response.json()
+
+    @app.get("/alphavantage/query")
+    async def alpha_vantage(request: Request):
+        params = dict(request.query_params)
+        return await serve(
+            ALPHA_VANTAGE, _query_key(params),
+            lambda: forward_get(ALPHA_VANTAGE, "/query", params),
+            lambda: fake_get(ALPHA_VANTAGE, "/query", params)
+        )
+
+    @app.get("/fred/fred/series/observations")
+    async def fred(request: Request):
+        params = dict(request.query_params)
+        path = "/fred/series/observations"
+        return await serve(
+            FRED, _query_key(params),
+            lambda: forward_get(FRED, path, params),
+            lambda: fake_get(FRED, path, params)
+        )
+
+    # OpenAI: chat completions keyed on the full request body
+
+    @app.post("/openai/v1/chat/completions")
+    async def openai_chat(request: Request):
+        payload = await request.json()
+        key = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+
+        async def record():
+            response = await upstream_client().post(
+                f"{UPSTREAM_URLS[OPENAI]}/chat/completions",
+                json=payload,
+                headers={"Authorization": request.headers.get("authorization", "")}
+            )
+            return response.status_code, response.json()
+
+        async def fake():
+            from benchmarks import fakes
+            return _chat_completion(payload.get("model", ""), fakes.fake_analysis(payload["messages"][-1]["content"]))
+
+        return await serve(OPENAI, key, record, fake)
+
+    # yfinance: the app's YFINANCE_BASE_URL protocol (see market_data_service, price_history)
+
+    @app.get("/yfinance/info/{ticker}")
+    async def yfinance_info(ticker: str):
+        async def record():
+            import yfinance as yf
+            info = await asyncio.to_thread(lambda: yf.Ticker(ticker).info)
+            return 200, json.loads(json.dumps(info, default=str))
+
+        async def fake():
+            from benchmarks import fakes
+            return fakes.FakeTicker(ticker).info
+
+        return await serve(YFINANCE, f"info {ticker}", record, fake)
+
+    @app.get("/yfinance/download")
+    async def yfinance_download(tickers: str, period: str = "5d", interval: str = "1d"):
+        """
+        Latest close per ticker. Each ticker is its own cassette, so replay
+        works for any subset of the recorded watchlist.
+        """
+        symbols = [t for t in tickers.split(",") if t]
+
+        async def record():
+            from app.services.market_data_service import _download_latest_closes
+            closes = await asyncio.to_thread(_download_latest_closes, symbols)
+            return 200, {t: {"close": close, "date": day.isoformat()} for t, (close, day) in closes.items()}
+
+        async def fake():
+            from benchmarks import fakes
+            return {
+                t: {"close": fakes.FakeTicker(t).info["currentPrice"], "date": "2026-01-09"}
+                for t in symbols
+            }
+
+        # One batched upstream call covers every ticker not yet recorded
+        keys = {t: f"download {period} {interval} {t}" for t in symbols}
+        missing = [t for t in symbols if cassettes.get(YFINANCE, keys[t]) is None]
+        batch = {}
+        if missing and mode == "record":
+            started = time.perf_counter()
+            _, batch = await record()
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            for t, row in batch.items():
+                cassettes.put(YFINANCE, keys[t], row, elapsed_ms)
+                stats[YFINANCE]["recorded"] += 1
+        elif missing and on_miss == "fake":
+            batch = await fake()
+
+        stats[YFINANCE]["requests"] += 1
+        stats[YFINANCE]["hits"] += len(symbols) - len(missing)
+        stats[YFINANCE]["misses"] += len(missing)
+        failure = await inject(YFINANCE, None)
+        if failure is not None:
+            return failure
+
+        result = {}
+        for t in symbols:
+            cassette = cassettes.get(YFINANCE, keys[t])
+            row = cassette["body"] if cassette else batch.get(t)
+            if row:
+                result[t] = row
+        return JSONResponse(result)
+
+    @app.get("/yfinance/history")
+    async def yfinance_history(tickers: str, start: str, end: str):
+        """
+        Daily OHLCV columns from start to end (inclusive) per ticker. Each
+        ticker's cassette holds every bar recorded for it and is sliced to
+        the requested range on replay.
+        """
+        symbols = [t for t in tickers.split(",") if t]
+        stats[YFINANCE]["requests"] += 1
+
+        def since(columns: Dict[str, list]) -> Dict[str, list]:
+            keep = [i for i, day in enumerate(columns["date"]) if start <= day <= end]
+            return {field: [values[i] for i in keep] for field, values in columns.items()}
+
+        recorded = {t: cassettes.get(YFINANCE, f"history {t}") for t in symbols}
+        # A cassette covers the request if it was recorded over a range containing it
+        missing = [
+            t for t in symbols
+            if not recorded[t] or recorded[t]["body"]["start"] > start or recorded[t]["body"]["end"] < end
+        ]
+        stats[YFINANCE]["hits"] += len(symbols) - len(missing)
+        stats[YFINANCE]["misses"] += len(missing)
+
+        fetched: Dict[str, Dict[str, list]] = {}
+        if missing and mode == "record":
+            from app.services.price_history import _download_history
+            started = time.perf_counter()
+            history = await asyncio.to_thread(
+                _download_history, missing, date.fromisoformat(start), date.fromisoformat(end)
+            )
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            for t, bars in history.items():
+                fetched[t] = {
+                    "date": [str(d) for d in bars["date"]],
+                    **{field: bars[field].tolist() for field in ["open", "high", "low", "close", "volume"]},
+                }
+                # Replaces the previous cassette for t, which did not cover this range
+                cassettes.put(
+                    YFINANCE, f"history {t}", {"start": start, "end": end, "columns": fetched[t]}, elapsed_ms
+                )
+                stats[YFINANCE]["recorded"] += 1
+        elif missing and on_miss == "fake":
+            from benchmarks import fakes
+            fetched = {t: fakes.fake_history(t, start, end) for t in missing}
+
+        failure = await inject(YFINANCE, None)
+        if failure is not None:
+            return failure
+
+        result = {}
+        for t in symbols:
+            if t in fetched:
+                result[t] = fetched[t]
+            elif t not in missing:
+                result[t] = since(recorded[t]["body"]["columns"])
+        return JSONResponse(result)
+
+    # Control
+
+    @app.get("/_standin/stats")
+    async def get_stats():
+        return {"mode": mode, "on_miss": on_miss, "cassettes": len(cassettes), "providers": stats}
+
+    @app.get("/_standin/faults")
+    async def get_faults():
+        return {provider: fault.as_dict() for provider, fault in faults.items()}
+
+    @app.put("/_standin/faults")
+    async def put_faults(request: Request):
+        try:
+            faults.update(_merge_faults(faults, await request.json()))
+        except (TypeError, ValueError) as e:
+            return JSONResponse({"error": str(e)}, status_code=400)
+        return await get_faults()
+
+    return app
+
+
+def _merge_faults(faults: Dict[str, Faults], overrides: Dict[str, Dict[str, Any]]) -> Dict[str, Faults]:
+    """Applies {provider: {setting: value}} on top of faults; "*" targets every provider"""
+    unknown = set(overrides) - set(PROVIDERS) - {"*"}
+    if unknown:
+        raise ValueError(f"Unknown providers: {sorted(unknown)}")
+    merged = {provider: fault.updated(overrides.get("*", {})) for provider, fault in faults.items()}
+    return {
+        provider: fault.updated(overrides.get(provider, {}))
+        for provider, fault in merged.items()
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--mode", choices=["record", "replay"], default="replay")
+    parser.add_argument("--cassettes", default="./.cache/standin", help="cassette directory")
+    parser.add_argument("--on-miss", choices=["error", "fake"], default="error", help="replay without a cassette")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--recorded-latency", action="store_true", help="also wait the recorded upstream time")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 429")
+    parser.add_argument("--timeout-rate", type=float, default=0.0, help="fraction of requests held, then 504")
+    parser.add_argument("--timeout-seconds", type=float, default=30.0)
+    parser.add_argument("--faults", help="JSON file of per-provider overrides, e.g. {\"openai\": {\"latency_ms\": 4000}}")
+    parser.add_argument("--seed", type=int, help="seed for jitter and fault rolls")
+    args = parser.parse_args(argv)
+
+    default = Faults(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        timeout_rate=args.timeout_rate,
+        timeout_seconds=args.timeout_seconds,
+        recorded_latency=args.recorded_latency
+    )
+    faults = {provider: default for provider in PROVIDERS}
+    if args.faults:
+        with open(args.faults, "r", encoding="utf-8") as f:
+            faults = _merge_faults(faults, json.load(f))
+
+    cassettes = CassetteStore(args.cassettes)
+    print(f"Stand-in: {args.mode} mode, {len(cassettes)} cassettes in {args.cassettes}")
+
+    import uvicorn
+    uvicorn.run(
+        create_app(cassettes, args.mode, faults, args.on_miss, args.seed),
+        host=args.host,
+        port=args.port,
+        log_level="warning"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,20 @@
+"""
+Test environment: demo mode (no API keys) and throwaway storage, set
+before any app module reads its settings.
+
+Run from backend/:
+    python -m pytest -q
+"""
+import os
+import tempfile
+
+_workdir = tempfile.mkdtemp(prefix="alpha_oracle_tests_")
+os.environ.update({
+    "DB_URL": f"sqlite+aiosqlite:///{os.path.join(_workdir, 'test.db')}",
+    "AI_CACHE_DIR": os.path.join(_workdir, "ai_cache"),
+    "PRICE_HISTORY_DIR": os.path.join(_workdir, "price_history"),
+    "OPENAI_API_KEY": "",
+    "ALPHA_VANTAGE_API_KEY": "",
+    "FRED_API_KEY": "",
+    "BACKGROUND_REFRESH_ENABLED": "false",
+})
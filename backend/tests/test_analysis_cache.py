@@ -0,0 +1,108 @@
+"""
+Content-addressed AI analysis cache: key stability, the memory LRU bound,
+disk eviction order and byte accounting.
+"""
+import os
+import pytest
+from app.services.analysis_cache import AnalysisCache, cache_key
+
+STOCK = {"ticker": "MSFT", "current_price": 415.2, "pe_ratio": 35.1, "sector": "Technology"}
+
+
+def disk_usage(directory) -> int:
+    return sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, files in os.walk(directory) for name in files if name.endswith(".json")
+    )
+
+
+def age(cache: AnalysisCache, key: str, mtime: float):
+    os.utime(cache._path(key), (mtime, mtime))
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return AnalysisCache(str(tmp_path), max_memory_entries=3, max_disk_bytes=10_000)
+
+
+def test_key_is_stable_across_equivalent_inputs():
+    key = cache_key(STOCK, "v1", "gpt-4o")
+    assert key == cache_key(dict(reversed(list(STOCK.items()))), "v1", "gpt-4o")
+    assert key == cache_key({**STOCK, "sector": "  Technology "}, "v1", "gpt-4o")
+    assert key == cache_key({**STOCK, "current_price": 415.2000000001}, "v1", "gpt-4o")
+    assert len(key) == 64
+
+
+def test_key_changes_with_inputs_prompt_and_model():
+    key = cache_key(STOCK, "v1", "gpt-4o")
+    assert key != cache_key({**STOCK, "current_price": 415.21}, "v1", "gpt-4o")
+    assert key != cache_key(STOCK, "v2", "gpt-4o")
+    assert key != cache_key(STOCK, "v1", "gpt-4o-mini")
+
+
+def test_nan_and_none_hash_alike():
+    assert cache_key({**STOCK, "pe_ratio": float("nan")}, "v1", "m") == cache_key({**STOCK, "pe_ratio": None}, "v1", "m")
+
+
+def test_round_trip_through_memory_and_disk(cache, tmp_path):
+    cache.put("ab" + "0" * 62, {"recommendation": "BUY"})
+    assert cache.get("ab" + "0" * 62) == {"recommendation": "BUY"}
+
+    fresh = AnalysisCache(str(tmp_path), max_memory_entries=3, max_disk_bytes=10_000)
+    assert fresh.get("ab" + "0" * 62) == {"recommendation": "BUY"}
+    assert fresh.get("cd" + "0" * 62) is None
+    assert fresh.stats()["hits"] == 1 and fresh.stats()["misses"] == 1
+
+
+def test_returned_results_are_copies(cache):
+    cache.put("k1", {"recommendation": "BUY"})
+    cache.get("k1")["recommendation"] = "SELL"
+    assert cache.get("k1") == {"recommendation": "BUY"}
+
+
+def test_memory_lru_is_bounded(cache):
+    for i in range(3):
+        cache.put(f"k{i}", {"i": i})
+    cache.get("k0")  # most recent now
+    cache.put("k3", {"i": 3})
+
+    assert list(cache._memory) == ["k2", "k0", "k3"]
+    assert cache.stats()["memory_entries"] == 3
+    assert cache.get("k1") == {"i": 1}  # evicted from memory, still on disk
+
+
+def test_disk_eviction_removes_least_recently_used_first(tmp_path):
+    cache = AnalysisCache(str(tmp_path), max_memory_entries=100, max_disk_bytes=10_000)
+    payload = {"rationale": "x" * 1030}  # ~1050 bytes per file: the tenth crosses the budget
+    for i in range(9):
+        cache.put(f"k{i}", payload)
+        age(cache, f"k{i}", 1_000_000 + i)
+    age(cache, "k0", 2_000_000)  # recently read
+
+    cache.put("k9", payload)  # pushes usage past the budget
+
+    remaining = {key for key in (f"k{i}" for i in range(10)) if os.path.exists(cache._path(key))}
+    assert "k0" in remaining and "k9" in remaining
+    assert "k1" not in remaining and "k2" not in remaining
+    assert disk_usage(tmp_path) <= 9_000
+    assert cache.stats()["disk_bytes"] == disk_usage(tmp_path)
+
+
+def test_overwrite_counts_only_the_new_file(cache, tmp_path):
+    cache.put("k0", {"rationale": "seed"})
+    cache.put("k1", {"rationale": "x" * 3000})
+    cache.put("k1", {"rationale": "short"})
+    cache.put("k1", {"rationale": "y" * 1000})
+    assert cache.stats()["disk_bytes"] == disk_usage(tmp_path)
+
+    for _ in range(20):
+        cache.put("k1", {"rationale": "z" * 2000})
+    assert cache.stats()["disk_bytes"] == disk_usage(tmp_path)
+    assert os.path.exists(cache._path("k0"))  # repeated overwrites never trigger eviction
+
+
+def test_existing_files_are_counted_on_first_write(cache, tmp_path):
+    cache.put("k0", {"rationale": "x" * 500})
+    restarted = AnalysisCache(str(tmp_path), max_memory_entries=3, max_disk_bytes=10_000)
+    restarted.put("k1", {"rationale": "y" * 500})
+    assert restarted.stats()["disk_bytes"] == disk_usage(tmp_path)
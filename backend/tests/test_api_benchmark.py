@@ -0,0 +1,120 @@
+"""
+API benchmark: percentile and per-route measurement, threshold gating,
+and one short end-to-end run of both modes writing the JSON report.
+"""
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import httpx
+from fastapi import FastAPI
+from benchmarks import api_benchmark as bench
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def route_stats(p95_ms=5.0, rps=1000.0, errors=0):
+    return {"requests": 100, "errors": errors, "p50_ms": 1.0, "p95_ms": p95_ms, "p99_ms": p95_ms, "rps": rps}
+
+
+def test_percentile_is_nearest_rank():
+    values = [float(v) for v in range(1, 101)]
+    assert bench._percentile(values, 50) == 50.0
+    assert bench._percentile(values, 95) == 95.0
+    assert bench._percentile(values, 99) == 99.0
+    assert bench._percentile(values, 100) == 100.0
+    assert bench._percentile([7.0], 99) == 7.0
+    assert bench._percentile([], 50) == 0.0
+
+
+def test_measure_route_counts_requests_and_errors():
+    app = FastAPI()
+
+    @app.get("/ok")
+    async def ok():
+        return {"ok": True}
+
+    @app.get("/broken")
+    async def broken():
+        raise RuntimeError("boom")
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            return (
+                await bench._measure_route(client, "/ok", requests=40, concurrency=4, warmup=3),
+                await bench._measure_route(client, "/broken", requests=10, concurrency=2, warmup=0),
+            )
+
+    ok, broken = asyncio.run(scenario())
+    assert ok["requests"] == 40 and ok["errors"] == 0
+    assert 0 < ok["p50_ms"] <= ok["p95_ms"] <= ok["p99_ms"] <= ok["max_ms"]
+    assert ok["rps"] > 0
+    assert broken["requests"] == broken["errors"] == 10
+
+
+def test_thresholds_merge_route_limits_over_defaults():
+    thresholds = {"demo": {"default": {"p95_ms": 10, "min_rps": 100}, "/slow": {"p95_ms": 50}}}
+    results = {"demo": {"routes": {
+        "/fast": route_stats(p95_ms=9.0),
+        "/slow": route_stats(p95_ms=40.0),
+        "/too-slow": route_stats(p95_ms=11.0),
+        "/starved": route_stats(rps=50.0),
+        "/failing": route_stats(errors=2),
+    }}}
+
+    assert bench._check_thresholds(results, thresholds) == [
+        "demo /too-slow: p95 11.0ms > 10ms",
+        "demo /starved: 50.0 rps < 100 rps",
+        "demo /failing: 2 error responses",
+    ]
+
+
+def test_modes_without_limits_only_gate_on_errors():
+    results = {"live": {"routes": {"/a": route_stats(p95_ms=999.0, rps=1.0), "/b": route_stats(errors=1)}}}
+    assert bench._check_thresholds(results, {"demo": {"default": {"p95_ms": 1}}}) == ["live /b: 1 error responses"]
+
+
+def test_shipped_thresholds_cover_both_modes():
+    with open(os.path.join(BACKEND_DIR, "benchmarks", "thresholds.json"), encoding="utf-8") as f:
+        thresholds = json.load(f)
+    for mode in ("demo", "live"):
+        assert {"p95_ms", "min_rps"} <= set(thresholds[mode]["default"])
+
+
+def test_mode_environment_isolates_storage_and_keys(tmp_path):
+    demo = bench._mode_environment("demo", str(tmp_path), 5.0)
+    live = bench._mode_environment("live", str(tmp_path), 5.0, "http://127.0.0.1:8900")
+
+    assert demo["DB_URL"].endswith(os.path.join(str(tmp_path), "bench.db"))
+    assert demo["OPENAI_API_KEY"] == demo["FRED_API_KEY"] == ""
+    assert live["OPENAI_API_KEY"] and live["ALPHA_VANTAGE_API_KEY"] and live["FRED_API_KEY"]
+    assert live["OPENAI_BASE_URL"] == "http://127.0.0.1:8900/openai/v1"
+    assert live["YFINANCE_BASE_URL"] == "http://127.0.0.1:8900/yfinance"
+    assert "BENCH_UPSTREAM_URL" not in bench._mode_environment("live", str(tmp_path), 5.0)
+
+
+def test_short_run_writes_a_report_for_every_route(tmp_path):
+    output = tmp_path / "results.json"
+    # Live mode measures after the background refresher's first snapshot
+    env = {key: value for key, value in os.environ.items() if key != "BACKGROUND_REFRESH_ENABLED"}
+    result = subprocess.run(
+        [
+            sys.executable, "-m", "benchmarks.api_benchmark", "--modes", "demo", "live",
+            "--requests", "4", "--concurrency", "2", "--warmup", "1",
+            "--upstream-latency-ms", "1", "--output", str(output),
+        ],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, timeout=300
+    )
+    assert result.returncode == 0, result.stderr[-3000:]
+
+    report = json.loads(output.read_text())
+    assert report["config"]["requests"] == 4
+    for mode in ("demo", "live"):
+        routes = report["results"][mode]["routes"]
+        assert list(routes) == bench.ROUTES
+        assert all(stats["requests"] == 4 and stats["errors"] == 0 for stats in routes.values())
+    assert report["results"]["demo"]["upstream"]["openai_calls"] == 0
+    assert report["results"]["live"]["upstream"]["live_recommendations"] > 0
+    assert report["results"]["live"]["upstream"]["openai_calls"] > 0
@@ -0,0 +1,77 @@
+"""
+Demo datasets are built once and shared, so no caller may change what the
+next caller sees.
+"""
+import copy
+import json
+import pytest
+from pydantic import TypeAdapter, ValidationError
+from typing import List
+from app.models.schemas import SectorAnalysis, StockRecommendation
+from app.services import demo_data
+
+GETTERS = [
+    demo_data.get_demo_sector_analyses,
+    demo_data.get_demo_stock_recommendations,
+    demo_data.get_demo_geopolitical_risks,
+    lambda: demo_data.get_demo_portfolio_allocation("moderate"),
+]
+
+
+@pytest.mark.parametrize("getter", GETTERS)
+def test_snapshots_are_built_once(getter):
+    assert getter() is getter()
+
+
+@pytest.mark.parametrize("getter", GETTERS)
+@pytest.mark.parametrize("mutate", [
+    lambda data: data.append(data[0]),
+    lambda data: data.pop(),
+    lambda data: data.sort(key=str),
+    lambda data: data.__setitem__(0, data[1]),
+    lambda data: data.__delitem__(slice(0, 2)),
+    lambda data: data.__iadd__(data),
+])
+def test_lists_reject_in_place_changes(getter, mutate):
+    data = getter()
+    before = json.dumps([item.model_dump(mode="json") for item in data])
+    with pytest.raises(TypeError):
+        mutate(data)
+    assert json.dumps([item.model_dump(mode="json") for item in getter()]) == before
+
+
+def test_models_and_their_list_fields_are_frozen():
+    rec = demo_data.get_demo_stock_recommendations()[0]
+    with pytest.raises(ValidationError):
+        rec.conviction_score = 0
+    with pytest.raises(TypeError):
+        rec.headwinds.append("new headwind")
+    with pytest.raises(ValidationError):
+        demo_data.get_demo_macro_snapshot().vix = 80
+
+    assert demo_data.get_demo_stock_recommendations()[0].conviction_score == rec.conviction_score
+    assert "new headwind" not in demo_data.get_demo_stock_recommendations()[0].headwinds
+
+
+def test_derived_copies_are_independent():
+    sectors = demo_data.get_demo_sector_analyses()
+    count = len(sectors)
+
+    extended = list(sectors) + [sectors[0].model_copy(update={"sector": "Synthetic"})]
+    ranked = sorted(sectors, key=lambda s: s.score)
+    ranked.reverse()
+    changed = sectors[0].model_copy(update={"score": 1.0, "tailwinds": ["only"]})
+
+    assert len(extended) == count + 1
+    assert changed.score == 1.0 and changed.tailwinds == ["only"]
+    assert len(demo_data.get_demo_sector_analyses()) == count
+    assert demo_data.get_demo_sector_analyses()[0].score != 1.0
+    assert copy.deepcopy(sectors) == sectors
+
+
+def test_frozen_snapshots_serialize_like_the_schema_models():
+    recs = demo_data.get_demo_stock_recommendations()
+    plain = [StockRecommendation(**rec.model_dump()) for rec in recs]
+    adapter = TypeAdapter(List[StockRecommendation])
+    assert adapter.dump_json(recs) == adapter.dump_json(plain)
+    assert all(isinstance(sector, SectorAnalysis) for sector in demo_data.get_demo_sector_analyses())
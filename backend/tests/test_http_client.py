@@ -0,0 +1,137 @@
+"""
+Shared upstream HTTP client: pool limits, HTTP/2 negotiation, connection
+reuse accounting and its lifespan.
+"""
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from app.config import settings
+from app.main import app
+from app.services import http_client, metrics
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keeps connections open between requests
+
+    def do_GET(self):
+        status = 429 if "throttle" in self.path else 200
+        body = b'{"ok": true}'
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def upstream():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def client_state(monkeypatch):
+    """No shared client and empty connection stats; the global client is restored afterwards"""
+    monkeypatch.setattr(http_client, "_client", None)
+    monkeypatch.setattr(http_client, "_connection_stats", {})
+
+
+def pool(client):
+    return client._transport._pool
+
+
+def test_client_uses_the_configured_pool_limits(client_state, monkeypatch):
+    monkeypatch.setattr(settings, "HTTP_MAX_CONNECTIONS", 7)
+    monkeypatch.setattr(settings, "HTTP_MAX_KEEPALIVE_CONNECTIONS", 3)
+    monkeypatch.setattr(settings, "HTTP_KEEPALIVE_EXPIRY", 12.5)
+    monkeypatch.setattr(settings, "HTTP_TIMEOUT", 4.0)
+
+    client = http_client.get_http_client()
+    assert http_client.get_http_client() is client
+    assert pool(client)._max_connections == 7
+    assert pool(client)._max_keepalive_connections == 3
+    assert pool(client)._keepalive_expiry == 12.5
+    assert client.timeout.read == 4.0
+
+
+def test_http2_falls_back_without_h2(client_state, monkeypatch):
+    monkeypatch.setattr(http_client, "_http2_available", lambda: False)
+    assert pool(http_client.get_http_client())._http2 is False
+
+
+def test_http2_can_be_disabled(client_state, monkeypatch):
+    monkeypatch.setattr(settings, "HTTP2_ENABLED", False)
+    monkeypatch.setattr(http_client, "_http2_available", lambda: True)
+    assert pool(http_client.get_http_client())._http2 is False
+
+
+def test_http2_is_negotiated_when_h2_is_installed(client_state):
+    pytest.importorskip("h2")
+    assert pool(http_client.get_http_client())._http2 is True
+
+
+def test_sequential_requests_reuse_one_connection(client_state, upstream):
+    async def scenario():
+        await http_client.init_http_client()
+        for _ in range(5):
+            response = await http_client.get("alpha_vantage", f"{upstream}/query", {"symbol": "XLK"})
+            assert response.status_code == 200
+        await http_client.close_http_client()
+
+    asyncio.run(scenario())
+    assert http_client.get_connection_stats() == {"alpha_vantage": {
+        "requests": 5, "new_connections": 1, "reused_connections": 4, "reuse_ratio": 0.8
+    }}
+
+
+def test_stats_and_outcomes_are_kept_per_provider(client_state, upstream, monkeypatch):
+    outcomes = []
+    monkeypatch.setattr(metrics, "record_upstream_call", lambda provider, seconds, outcome: outcomes.append(
+        (provider, outcome)
+    ))
+
+    async def scenario():
+        await http_client.get("fred", f"{upstream}/series", {})
+        await http_client.get("alpha_vantage", f"{upstream}/throttle", {})
+        await http_client.get("alpha_vantage", f"{upstream}/query", {})
+        await http_client.close_http_client()
+
+    asyncio.run(scenario())
+    stats = http_client.get_connection_stats()
+    assert stats["fred"]["requests"] == 1 and stats["alpha_vantage"]["requests"] == 2
+    assert outcomes == [("fred", metrics.OK), ("alpha_vantage", metrics.THROTTLED), ("alpha_vantage", metrics.OK)]
+
+
+def test_failed_requests_are_recorded_as_errors(client_state, monkeypatch):
+    outcomes = []
+    monkeypatch.setattr(metrics, "record_upstream_call", lambda provider, seconds, outcome: outcomes.append(outcome))
+
+    async def scenario():
+        try:
+            await http_client.get("fred", "http://127.0.0.1:1/unreachable", {})
+        finally:
+            await http_client.close_http_client()
+
+    with pytest.raises(httpx.ConnectError):
+        asyncio.run(scenario())
+    assert outcomes == [metrics.ERROR]
+    assert http_client.get_connection_stats() == {}
+
+
+def test_lifespan_creates_and_closes_the_shared_client(client_state, monkeypatch):
+    monkeypatch.setattr(settings, "STARTUP_WARMUP_ENABLED", False)
+    with TestClient(app):
+        client = http_client._client
+        assert client is not None and not client.is_closed
+    assert client.is_closed
+    assert http_client._client is None
@@ -0,0 +1,39 @@
+"""
+Lazy imports: app.main loads no live-only dependency, and the import budget
+report parses `python -X importtime` output.
+"""
+import os
+import subprocess
+import sys
+from benchmarks import import_budget
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_importing_the_app_loads_no_live_only_dependency():
+    code = (
+        "import sys, app.main; "
+        f"print(','.join(m for m in {import_budget.LIVE_ONLY_MODULES!r} if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=BACKEND_DIR, env=dict(os.environ), capture_output=True, text=True
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+    assert result.stdout.strip() == ""
+
+
+def test_measure_reports_every_app_module_with_its_depth():
+    rows = import_budget.measure("app.main")
+    by_name = {name: (self_us, cumulative_us, depth) for name, self_us, cumulative_us, depth in rows}
+
+    assert by_name["app.main"][2] == 0
+    assert by_name["app.config"][2] > 0
+    assert all(0 <= self_us <= cumulative_us for self_us, cumulative_us, _ in by_name.values())
+    assert by_name["app.main"][1] == max(cumulative_us for _, cumulative_us, _ in by_name.values())
+    assert not set(import_budget.LIVE_ONLY_MODULES) & set(by_name)
+
+
+def test_importtime_line_format():
+    match = import_budget._LINE.match("import time:       579 |       1834 |     app.api.routes.metrics")
+    assert match.groups() == ("579", "1834", "     ", "app.api.routes.metrics")
+    assert import_budget._LINE.match("import time: self [us] | cumulative | imported package") is None
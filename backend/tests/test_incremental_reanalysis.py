@@ -0,0 +1,137 @@
+"""
+Incremental reanalysis: tickers whose inputs barely moved are repriced
+from their previous recommendation instead of calling the LLM again.
+"""
+import asyncio
+import pytest
+from app.config import settings
+from app.models.schemas import Recommendation
+from app.services import live_recommendations_service as lrs
+
+BASE = {
+    "ticker": "MSFT",
+    "company_name": "Microsoft",
+    "sector": "Technology",
+    "current_price": 100.0,
+    "target_mean_price": 120.0,
+    "market_cap_billions": 3000,
+    "pe_ratio": 30.0,
+    "analyst_count": 40,
+    "analyst_recommendation": "buy",
+}
+
+
+def changed(**update) -> dict:
+    return {**BASE, **update}
+
+
+@pytest.mark.parametrize("current", [
+    changed(),
+    changed(current_price=100.0 * (1 + (settings.REANALYSIS_PRICE_CHANGE_PCT - 0.5) / 100)),
+    changed(current_price=100.0 * (1 - (settings.REANALYSIS_PRICE_CHANGE_PCT - 0.5) / 100)),
+    changed(pe_ratio=30.0 * (1 + (settings.REANALYSIS_PE_CHANGE_PCT - 0.5) / 100)),
+    changed(target_mean_price=120.0 * (1 + (settings.REANALYSIS_TARGET_CHANGE_PCT - 0.5) / 100)),
+    changed(company_name="Microsoft Corp", market_cap_billions=3100),
+])
+def test_small_moves_are_not_material(current):
+    assert not lrs._is_material_change(BASE, current)
+
+
+@pytest.mark.parametrize("current", [
+    changed(current_price=100.0 * (1 + (settings.REANALYSIS_PRICE_CHANGE_PCT + 0.5) / 100)),
+    changed(current_price=100.0 * (1 - (settings.REANALYSIS_PRICE_CHANGE_PCT + 0.5) / 100)),
+    changed(current_price=None),
+    changed(pe_ratio=30.0 * (1 + (settings.REANALYSIS_PE_CHANGE_PCT + 0.5) / 100)),
+    changed(pe_ratio=None),
+    changed(target_mean_price=120.0 * (1 - (settings.REANALYSIS_TARGET_CHANGE_PCT + 0.5) / 100)),
+    changed(analyst_count=41),
+    changed(analyst_recommendation="hold"),
+])
+def test_large_moves_are_material(current):
+    assert lrs._is_material_change(BASE, current)
+
+
+def test_pe_appearing_is_material():
+    assert lrs._is_material_change(changed(pe_ratio=None), BASE)
+
+
+def test_reprice_recomputes_price_dependent_fields():
+    rec = lrs._build_recommendation(BASE, {"fair_value_estimate": 130, "recommendation": "BUY"})
+    repriced = lrs._reprice_recommendation(rec, 104.0)
+
+    assert repriced.current_price == 104.0
+    assert repriced.upside_potential_pct == round((130 - 104.0) / 104.0 * 100, 1)
+    assert repriced.fair_value_estimate == rec.fair_value_estimate
+    assert repriced.recommendation == rec.recommendation
+    assert repriced.conviction_score == rec.conviction_score
+    assert rec.current_price == 100.0
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    """Fake market data (one mutable price per ticker) and a counting fake LLM"""
+    prices = {"MSFT": 100.0, "AAPL": 200.0}
+    analyzed = []
+
+    def fake_fetch(ticker, price=None):
+        return changed(ticker=ticker, company_name=ticker, current_price=prices[ticker])
+
+    async def fake_analyze(stock_data):
+        analyzed.append(stock_data["ticker"])
+        return {"fair_value_estimate": stock_data["current_price"] * 1.2, "recommendation": "BUY", "conviction_score": 70}
+
+    monkeypatch.setattr(lrs, "fetch_stock_data", fake_fetch)
+    monkeypatch.setattr(lrs, "fetch_watchlist_prices", lambda tickers: {})
+    monkeypatch.setattr(lrs, "analyze_stock_with_ai_async", fake_analyze)
+    monkeypatch.setattr(lrs, "_last_analysis", {})
+    return prices, analyzed
+
+
+def run_pipeline(incremental: bool):
+    return asyncio.run(lrs._run_ingestion_pipeline(["MSFT", "AAPL"], incremental=incremental))
+
+
+def test_small_move_reprices_without_an_llm_call(upstream):
+    prices, analyzed = upstream
+    first = run_pipeline(incremental=True)
+    assert analyzed == ["MSFT", "AAPL"]
+
+    prices["MSFT"] = 101.0
+    second = run_pipeline(incremental=True)
+    assert analyzed == ["MSFT", "AAPL"]
+    assert [rec.ticker for rec in second] == ["MSFT", "AAPL"]
+    assert second[0].current_price == 101.0
+    assert second[0].fair_value_estimate == first[0].fair_value_estimate
+    assert second[0].upside_potential_pct == round((120.0 - 101.0) / 101.0 * 100, 1)
+    assert second[1] == first[1]
+
+
+def test_material_move_is_reanalyzed(upstream):
+    prices, analyzed = upstream
+    run_pipeline(incremental=True)
+
+    prices["MSFT"] = 110.0
+    result = run_pipeline(incremental=True)
+    assert analyzed == ["MSFT", "AAPL", "MSFT"]
+    assert result[0].fair_value_estimate == 132.0
+    assert result[0].recommendation == Recommendation.BUY
+
+
+def test_reuse_compares_against_the_last_analysis(upstream):
+    prices, analyzed = upstream
+    run_pipeline(incremental=True)
+
+    # Two small steps that add up to a material move since the last analysis
+    step = settings.REANALYSIS_PRICE_CHANGE_PCT * 0.6 / 100
+    prices["MSFT"] = 100.0 * (1 + step)
+    run_pipeline(incremental=True)
+    prices["MSFT"] = 100.0 * (1 + 2 * step)
+    run_pipeline(incremental=True)
+    assert analyzed == ["MSFT", "AAPL", "MSFT"]
+
+
+def test_full_refresh_always_reanalyzes(upstream):
+    prices, analyzed = upstream
+    run_pipeline(incremental=True)
+    run_pipeline(incremental=False)
+    assert analyzed == ["MSFT", "AAPL", "MSFT", "AAPL"]
@@ -0,0 +1,104 @@
+"""
+Ingestion pipeline: yfinance fetches bounded by the shared pool, fetches
+overlapping with AI analyses, and results kept in watchlist order.
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from app.config import settings
+from app.services import live_recommendations_service as lrs
+
+FETCH_WORKERS = 2
+FETCH_SECONDS = 0.05
+ANALYSIS_SECONDS = 0.05
+TICKERS = [f"T{i}" for i in range(8)]
+
+
+class Upstream:
+    """Blocking fake yfinance fetches and async fake analyses, with timings"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.fetching = 0
+        self.max_fetching = 0
+        self.fetch_ends = []
+        self.analysis_starts = []
+        self.fetch_delay = {}
+        self.missing = set()
+        self.failing = set()
+
+    def fetch(self, ticker, price=None):
+        with self.lock:
+            self.fetching += 1
+            self.max_fetching = max(self.max_fetching, self.fetching)
+        try:
+            time.sleep(self.fetch_delay.get(ticker, FETCH_SECONDS))
+            if ticker in self.failing:
+                raise ConnectionError("yfinance unavailable")
+            if ticker in self.missing:
+                return None
+            return {
+                "ticker": ticker, "company_name": ticker, "sector": "Technology", "current_price": 100.0,
+                "target_mean_price": 110.0, "market_cap_billions": 10.0, "pe_ratio": 20.0,
+            }
+        finally:
+            with self.lock:
+                self.fetching -= 1
+                self.fetch_ends.append(time.perf_counter())
+
+    async def analyze(self, stock_data):
+        self.analysis_starts.append(time.perf_counter())
+        await asyncio.sleep(ANALYSIS_SECONDS)
+        return {"fair_value_estimate": 120.0, "recommendation": "BUY", "conviction_score": 70}
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    fake = Upstream()
+    pool = ThreadPoolExecutor(max_workers=FETCH_WORKERS)
+    monkeypatch.setattr(lrs, "_fetch_pool", pool)
+    monkeypatch.setattr(lrs, "fetch_stock_data", fake.fetch)
+    monkeypatch.setattr(lrs, "analyze_stock_with_ai_async", fake.analyze)
+    monkeypatch.setattr(lrs, "_last_analysis", {})
+    monkeypatch.setattr(settings, "SPLIT_INGESTION", False)
+    yield fake
+    pool.shutdown()
+
+
+def run_pipeline(tickers=TICKERS):
+    started = time.perf_counter()
+    results = asyncio.run(lrs._run_ingestion_pipeline(tickers))
+    return results, time.perf_counter() - started
+
+
+def test_fetches_are_bounded_by_the_pool(upstream):
+    results, _ = run_pipeline()
+    assert len(results) == len(TICKERS)
+    assert upstream.max_fetching == FETCH_WORKERS
+
+
+def test_wall_clock_scales_with_concurrency_not_watchlist_length(upstream):
+    _, elapsed = run_pipeline()
+    serial = len(TICKERS) * (FETCH_SECONDS + ANALYSIS_SECONDS)
+    pipelined = len(TICKERS) / FETCH_WORKERS * FETCH_SECONDS + ANALYSIS_SECONDS
+    assert elapsed < (serial + pipelined) / 2
+
+
+def test_analyses_overlap_with_later_fetches(upstream):
+    run_pipeline()
+    assert min(upstream.analysis_starts) < max(upstream.fetch_ends)
+
+
+def test_results_keep_watchlist_order(upstream):
+    upstream.fetch_delay = {ticker: 0.08 - 0.01 * i for i, ticker in enumerate(TICKERS)}  # later tickers finish first
+    results, _ = run_pipeline()
+    assert [rec.ticker for rec in results] == TICKERS
+
+
+def test_failed_tickers_are_skipped(upstream):
+    upstream.missing = {"T1"}
+    upstream.failing = {"T4"}
+    results, _ = run_pipeline()
+    assert [rec.ticker for rec in results] == [t for t in TICKERS if t not in ("T1", "T4")]
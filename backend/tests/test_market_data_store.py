@@ -0,0 +1,162 @@
+"""
+Persistent market data cache: SQLite round-trip, per-field-class TTLs and
+seeding the in-process fundamentals cache from stored rows.
+"""
+import time
+from datetime import date, timedelta
+import pytest
+from sqlalchemy import create_engine, inspect, text
+from app.config import settings
+from app.services import market_data_service, market_data_store as store
+
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    """An empty SQLite database per test; yields the sync URL"""
+    path = tmp_path / "store.db"
+    monkeypatch.setattr(settings, "DB_URL", f"sqlite+aiosqlite:///{path}")
+    monkeypatch.setattr(settings, "MARKET_DATA_PERSISTENCE", True)
+    monkeypatch.setattr(store, "_engine", None)
+    yield f"sqlite:///{path}"
+    if store._engine is not None:
+        store._engine.dispose()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Shifts the store's notion of now (fetched_at on save, the cutoff on load)"""
+    offset = {"seconds": 0}
+    real_utcnow = store._utcnow
+    monkeypatch.setattr(store, "_utcnow", lambda: real_utcnow() + timedelta(seconds=offset["seconds"]))
+    return offset
+
+
+def test_save_and_load_round_trip(database):
+    payload = {"symbol": "MSFT", "price": "415.20", "nested": {"list": [1, 2.5, None]}}
+    store.save(store.QUOTE, "MSFT", payload, price=415.2, change_percent=-0.64,
+               volume=21_000_000, market_cap=3_100_000_000_000, pe_ratio=35.1, data_date=date(2026, 10, 16))
+
+    assert store.load(store.QUOTE, "MSFT") == payload
+    assert store.load(store.OVERVIEW, "MSFT") is None
+    assert store.load(store.QUOTE, "AAPL") is None
+
+    with create_engine(database).connect() as conn:
+        row = conn.execute(text(
+            "SELECT price, change_percent, volume, market_cap, pe_ratio, data_date FROM market_data_cache"
+        )).one()
+    assert tuple(row) == (415.2, -0.64, 21_000_000, 3_100_000_000_000, 35.1, "2026-10-16")
+
+
+def test_save_upserts_per_key_and_field_class(database):
+    store.save(store.QUOTE, "MSFT", {"v": 1})
+    store.save(store.QUOTE, "MSFT", {"v": 2})
+    store.save(store.OVERVIEW, "MSFT", {"v": 3})
+
+    assert store.load(store.QUOTE, "MSFT") == {"v": 2}
+    assert store.load(store.OVERVIEW, "MSFT") == {"v": 3}
+    with create_engine(database).connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM market_data_cache")).scalar() == 2
+
+
+def test_load_many_returns_only_stored_keys(database):
+    for ticker in ["MSFT", "AAPL"]:
+        store.save(store.PRICE, ticker, {"ticker": ticker})
+    assert store.load_many(store.PRICE, ["MSFT", "AAPL", "NVDA"]) == {
+        "MSFT": {"ticker": "MSFT"}, "AAPL": {"ticker": "AAPL"}
+    }
+    assert store.load_many(store.PRICE, []) == {}
+
+
+@pytest.mark.parametrize("field_class, ttl_setting", [
+    (store.PRICE, "QUOTE_CACHE_TTL"),
+    (store.QUOTE, "QUOTE_CACHE_TTL"),
+    (store.OVERVIEW, "OVERVIEW_CACHE_TTL"),
+    (store.FUNDAMENTALS, "FUNDAMENTALS_REFRESH_INTERVAL"),
+    (store.FRED, "FRED_CACHE_TTL"),
+])
+def test_each_field_class_expires_after_its_own_ttl(database, clock, field_class, ttl_setting):
+    ttl = getattr(settings, ttl_setting)
+    store.save(field_class, "KEY", {"v": 1})
+
+    clock["seconds"] = ttl - 5
+    assert store.load(field_class, "KEY") == {"v": 1}
+    clock["seconds"] = ttl + 5
+    assert store.load(field_class, "KEY") is None
+
+
+def test_max_age_overrides_the_ttl(database, clock):
+    store.save(store.OVERVIEW, "MSFT", {"v": 1})
+    clock["seconds"] = 120
+    assert store.load(store.OVERVIEW, "MSFT", max_age=60) is None
+    assert store.load(store.OVERVIEW, "MSFT", max_age=300) == {"v": 1}
+
+    fetched_at, payload = store.load_timestamped(store.OVERVIEW, "MSFT", max_age=300)
+    assert payload == {"v": 1}
+    assert abs(fetched_at - time.time()) < 10  # saved at the real now; only the cutoff moved
+
+
+def test_disabled_persistence_reads_and_writes_nothing(database, monkeypatch):
+    monkeypatch.setattr(settings, "MARKET_DATA_PERSISTENCE", False)
+    store.save(store.QUOTE, "MSFT", {"v": 1})
+    assert store.load(store.QUOTE, "MSFT") is None
+    assert store._engine is None
+
+
+def test_works_next_to_the_supabase_market_data_table(database):
+    # A database provisioned from database/schema.sql already has market_data
+    with create_engine(database).begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE market_data (id TEXT PRIMARY KEY, ticker TEXT NOT NULL, price REAL, "
+            "data_date DATE NOT NULL, UNIQUE (ticker, data_date))"
+        ))
+
+    store.save(store.QUOTE, "MSFT", {"v": 1})
+    assert store.load(store.QUOTE, "MSFT") == {"v": 1}
+    assert {"market_data", "market_data_cache"} <= set(inspect(create_engine(database)).get_table_names())
+
+
+@pytest.fixture
+def upstream_info(database, monkeypatch):
+    """Counts yfinance .info calls made by fetch_fundamentals"""
+    calls = []
+
+    def fake_fetch_info(ticker):
+        calls.append(ticker)
+        return {"ticker": ticker}
+
+    def fake_fundamentals(ticker, info):
+        return {"ticker": ticker, "info_price": 100.0, "market_cap_billions": 50.0, "pe_ratio": 20.0}
+
+    monkeypatch.setattr(market_data_service, "_fetch_info", fake_fetch_info)
+    monkeypatch.setattr(market_data_service, "_fundamentals_from_info", fake_fundamentals)
+    monkeypatch.setattr(market_data_service, "_fundamentals_cache", {})
+    return calls
+
+
+def test_fundamentals_are_served_from_the_database_and_cached_in_memory(upstream_info, clock):
+    clock["seconds"] = -100  # stored 100s ago
+    store.save(store.FUNDAMENTALS, "MSFT", {"ticker": "MSFT", "pe_ratio": 31.0})
+    clock["seconds"] = 0
+
+    assert market_data_service.fetch_fundamentals("MSFT")["pe_ratio"] == 31.0
+    assert upstream_info == []
+
+    fetched_at, cached = market_data_service._fundamentals_cache["MSFT"]
+    assert cached["pe_ratio"] == 31.0
+    assert time.time() - 110 < fetched_at < time.time() - 90  # keeps the row's fetch time
+
+    store.save(store.FUNDAMENTALS, "MSFT", {"ticker": "MSFT", "pe_ratio": 99.0})
+    assert market_data_service.fetch_fundamentals("MSFT")["pe_ratio"] == 31.0  # memory hit, no DB read
+
+
+def test_fundamentals_max_age_applies_to_database_rows(upstream_info, clock):
+    clock["seconds"] = -100
+    store.save(store.FUNDAMENTALS, "MSFT", {"ticker": "MSFT", "pe_ratio": 31.0})
+    clock["seconds"] = 0
+
+    assert market_data_service.fetch_fundamentals("MSFT", max_age=50)["pe_ratio"] == 20.0
+    assert upstream_info == ["MSFT"]
+    assert store.load(store.FUNDAMENTALS, "MSFT")["pe_ratio"] == 20.0  # refreshed row written back
+
+    assert market_data_service.fetch_fundamentals("MSFT", max_age=0)["pe_ratio"] == 20.0
+    assert upstream_info == ["MSFT", "MSFT"]
@@ -0,0 +1,146 @@
+"""
+Prometheus /metrics: text format of the registry, per-route latency
+histograms, upstream and cache counters, and snapshot ages.
+"""
+import asyncio
+import re
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.services import http_client, metrics, snapshots
+from app.services.response_cache import response_cache
+
+SAMPLE = re.compile(r"^(\w+(?:\{.*\})?) (\S+)$")
+
+
+def scrape(client) -> dict:
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    samples = {}
+    for line in response.text.splitlines():
+        if not line.startswith("#"):
+            series, value = SAMPLE.match(line).groups()
+            samples[series] = float(value.replace("+Inf", "inf"))
+    return samples
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = metrics.Histogram("probe_seconds", "Probe latency", ("route",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, route="/a")
+    histogram.observe(0.5, route="/a")
+    histogram.observe(5.0, route="/a")
+
+    assert histogram.render() == [
+        "# HELP alpha_oracle_probe_seconds Probe latency",
+        "# TYPE alpha_oracle_probe_seconds histogram",
+        'alpha_oracle_probe_seconds_bucket{route="/a",le="0.1"} 1',
+        'alpha_oracle_probe_seconds_bucket{route="/a",le="1"} 2',
+        'alpha_oracle_probe_seconds_bucket{route="/a",le="+Inf"} 3',
+        'alpha_oracle_probe_seconds_sum{route="/a"} 5.55',
+        'alpha_oracle_probe_seconds_count{route="/a"} 3',
+    ]
+
+
+def test_counters_gauges_and_label_escaping():
+    counter = metrics.Counter("probe", "Probe calls", ("name",))
+    counter.inc(name='say "hi"\n')
+    counter.inc(2, name='say "hi"\n')
+    gauge = metrics.Gauge("probe_depth", "Probe depth")
+    gauge.inc(3)
+    gauge.dec()
+
+    assert counter.render()[1:] == [
+        "# TYPE alpha_oracle_probe_total counter",
+        'alpha_oracle_probe_total{name="say \\"hi\\"\\n"} 3',
+    ]
+    assert gauge.render()[2:] == ["alpha_oracle_probe_depth 2"]
+
+
+def test_requests_are_timed_by_route_template(client):
+    series = 'alpha_oracle_http_request_duration_seconds_count{method="GET",route="/api/recommendations/{ticker}",status="%s"}'
+    before = scrape(client)
+    client.get("/api/recommendations/MSFT")
+    client.get("/api/recommendations/AAPL")
+    client.get("/api/recommendations/NOSUCHTICKER")
+    after = scrape(client)
+
+    assert after[series % "200"] - before.get(series % "200", 0) == 2
+    assert after[series % "404"] - before.get(series % "404", 0) == 1
+    assert not any("MSFT" in name for name in after)
+    assert after["alpha_oracle_http_requests_in_flight"] == 1  # the scrape itself
+
+
+def test_unmatched_paths_share_one_series(client):
+    series = 'alpha_oracle_http_request_duration_seconds_count{method="GET",route="unmatched",status="404"}'
+    before = scrape(client).get(series, 0)
+    client.get("/no/such/page")
+    client.get("/another/missing/page")
+    assert scrape(client)[series] - before == 2
+
+
+def test_upstream_calls_are_counted_by_outcome(client, monkeypatch):
+    responses = iter([httpx.Response(200, json={}), httpx.Response(429), httpx.Response(500)])
+
+    def handler(request):
+        response = next(responses, None)
+        if response is None:
+            raise httpx.ConnectError("refused", request=request)
+        return response
+
+    monkeypatch.setattr(http_client, "_connection_stats", {})
+    monkeypatch.setattr(http_client, "_client", None)
+
+    async def scenario():
+        await http_client.init_http_client(transport=httpx.MockTransport(handler))
+        try:
+            for _ in range(3):
+                await http_client.get(metrics.FRED, "http://fred.test/series", {})
+            with pytest.raises(httpx.ConnectError):
+                await http_client.get(metrics.FRED, "http://fred.test/series", {})
+        finally:
+            await http_client.close_http_client()
+
+    series = 'alpha_oracle_upstream_requests_total{provider="fred",outcome="%s"}'
+    before = scrape(client)
+    asyncio.run(scenario())
+    after = scrape(client)
+
+    for outcome, count in ((metrics.OK, 1), (metrics.THROTTLED, 1), (metrics.ERROR, 2)):
+        assert after[series % outcome] - before.get(series % outcome, 0) == count
+    latency = 'alpha_oracle_upstream_request_duration_seconds_count{provider="fred"}'
+    assert after[latency] - before.get(latency, 0) == 4
+
+
+def test_cache_totals_are_mirrored_with_hit_ratios(client):
+    response_cache.clear()
+    client.get("/api/recommendations", params={"limit": 3})
+    client.get("/api/recommendations", params={"limit": 3})
+    stats = response_cache.stats()
+    samples = scrape(client)
+
+    assert samples['alpha_oracle_cache_lookups_total{cache="response",result="hit"}'] == stats["hits"]
+    assert samples['alpha_oracle_cache_lookups_total{cache="response",result="miss"}'] == stats["misses"]
+    assert samples['alpha_oracle_cache_hit_ratio{cache="response"}'] == round(
+        stats["hits"] / (stats["hits"] + stats["misses"]), 4
+    )
+    assert 'alpha_oracle_cache_entries{cache="ai_analysis"}' in samples
+
+
+def test_snapshot_ages_and_versions(client):
+    snapshot = snapshots.publish(snapshots.SECTOR_PERFORMANCE, {"XLK": {}})
+    samples = scrape(client)
+
+    assert samples['alpha_oracle_snapshot_version{snapshot="sector_performance"}'] == snapshot.version
+    assert 0 <= samples['alpha_oracle_snapshot_age_seconds{snapshot="sector_performance"}'] < 5
+    assert 'alpha_oracle_openai_tokens_total{kind="prompt"}' in samples
+
+
+def test_metrics_are_not_in_the_api_schema(client):
+    assert "/metrics" not in client.get("/openapi.json").json()["paths"]
@@ -0,0 +1,214 @@
+"""
+OpenAI calls: the process-wide concurrency cap (across event loops), slot
+hand-off on cancellation, and retry/backoff on throttling and 5xx errors.
+"""
+import asyncio
+import threading
+import time
+import httpx
+import pytest
+from openai import BadRequestError, InternalServerError, RateLimitError
+from app.config import settings
+from app.services import ai_analysis_service as ai
+
+CAP = 3
+
+
+def api_error(error_class, status: int, headers: dict = None):
+    response = httpx.Response(status, headers=headers, request=httpx.Request("POST", "https://api.openai.test"))
+    return error_class(f"HTTP {status}", response=response, body=None)
+
+
+class Usage:
+    prompt_tokens = 10
+    completion_tokens = 5
+    total_tokens = 15
+
+
+class Completion:
+    usage = Usage()
+
+
+class FakeClient:
+    """Stands in for AsyncOpenAI: each create() fails with the next scripted error, then succeeds"""
+
+    def __init__(self, errors=(), latency: float = 0.01):
+        self.errors = list(errors)
+        self.latency = latency
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        self.chat = self
+        self.completions = self
+
+    async def create(self, **kwargs):
+        with self._lock:
+            self.calls += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            error = self.errors.pop(0) if self.errors else None
+        try:
+            await asyncio.sleep(self.latency)
+            if error is not None:
+                raise error
+            return Completion()
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+@pytest.fixture(autouse=True)
+def limiter(monkeypatch):
+    slots = ai._SlotLimiter(CAP)
+    monkeypatch.setattr(ai, "_slots", slots)
+    monkeypatch.setattr(ai, "_usage", dict(ai._usage, calls=0, retries=0))
+    monkeypatch.setattr(settings, "OPENAI_MAX_RETRIES", 3)
+    monkeypatch.setattr(settings, "OPENAI_BACKOFF_BASE", 0.01)
+    monkeypatch.setattr(settings, "OPENAI_BACKOFF_MAX", 0.5)
+    return slots
+
+
+def complete(client, count: int = 1):
+    async def run():
+        return await asyncio.gather(*(ai._create_completion(client, "TEST", "prompt") for _ in range(count)))
+    return asyncio.run(run())
+
+
+def test_cap_holds_within_a_loop(limiter):
+    client = FakeClient()
+    complete(client, 20)
+    assert client.calls == 20
+    assert client.max_in_flight == CAP
+    assert limiter._free == CAP
+
+
+def test_cap_holds_across_event_loops(limiter):
+    client = FakeClient(latency=0.02)
+    threads = [threading.Thread(target=complete, args=(client, 15)) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert client.calls == 45
+    assert client.max_in_flight == CAP
+    assert limiter._free == CAP and not limiter._waiters
+
+
+@pytest.mark.parametrize("error", [
+    api_error(RateLimitError, 429),
+    api_error(InternalServerError, 500),
+    api_error(InternalServerError, 503),
+])
+def test_throttling_and_server_errors_are_retried(error):
+    client = FakeClient(errors=[error, error])
+    [response] = complete(client)
+    assert isinstance(response, Completion)
+    assert client.calls == 3
+    assert ai.get_usage_stats()["retries"] == 2
+    assert ai.get_usage_stats()["calls"] == 1
+
+
+def test_retries_give_up_after_the_limit():
+    client = FakeClient(errors=[api_error(RateLimitError, 429)] * 10)
+    with pytest.raises(RateLimitError):
+        complete(client)
+    assert client.calls == settings.OPENAI_MAX_RETRIES + 1
+
+
+def test_client_errors_raise_immediately(limiter):
+    client = FakeClient(errors=[api_error(BadRequestError, 400)])
+    with pytest.raises(BadRequestError):
+        complete(client)
+    assert client.calls == 1
+    assert ai.get_usage_stats()["retries"] == 0
+    assert limiter._free == CAP
+
+
+def test_backoff_grows_exponentially_and_honors_retry_after():
+    error = api_error(InternalServerError, 500)
+    for attempt in range(3):
+        expected = settings.OPENAI_BACKOFF_BASE * 2 ** attempt
+        assert expected * 0.8 <= ai._backoff_seconds(error, attempt) <= expected * 1.2
+    assert ai._backoff_seconds(error, 20) <= settings.OPENAI_BACKOFF_MAX * 1.2
+
+    assert ai._backoff_seconds(api_error(RateLimitError, 429, {"retry-after": "0.25"}), 0) == 0.25
+    assert ai._backoff_seconds(api_error(RateLimitError, 429, {"retry-after": "3600"}), 0) == settings.OPENAI_BACKOFF_MAX
+
+
+def test_backoff_does_not_hold_a_slot(monkeypatch):
+    monkeypatch.setattr(ai, "_slots", ai._SlotLimiter(1))
+    monkeypatch.setattr(settings, "OPENAI_BACKOFF_BASE", 0.3)
+    flaky = FakeClient(errors=[api_error(RateLimitError, 429)])
+    healthy = FakeClient()
+
+    async def scenario():
+        retrying = asyncio.ensure_future(ai._create_completion(flaky, "FLAKY", "prompt"))
+        await asyncio.sleep(0.05)  # first attempt failed; now backing off
+        started = time.perf_counter()
+        await ai._create_completion(healthy, "OK", "prompt")
+        other_call = time.perf_counter() - started
+        await retrying
+        return other_call
+
+    assert asyncio.run(scenario()) < 0.15
+    assert flaky.calls == 2
+
+
+def test_cancelled_waiters_do_not_leak_slots(limiter):
+    client = FakeClient(latency=0.05)
+
+    async def scenario():
+        tasks = [asyncio.ensure_future(ai._create_completion(client, "T", "prompt")) for _ in range(CAP * 3)]
+        await asyncio.sleep(0.01)
+        for task in tasks[CAP:CAP * 2]:
+            task.cancel()
+        return await asyncio.gather(*tasks, return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert sum(isinstance(result, asyncio.CancelledError) for result in results) == CAP
+    assert client.calls == CAP * 2
+    assert limiter._free == CAP and not limiter._waiters
+
+
+def test_slot_granted_to_a_cancelled_waiter_is_passed_on(limiter):
+    async def scenario():
+        for _ in range(CAP):
+            await limiter.acquire()
+        first = asyncio.ensure_future(limiter.acquire())
+        second = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+        limiter.release()  # hands the slot to first (scheduled on the loop)...
+        first.cancel()     # ...which is cancelled before it runs
+        await asyncio.wait_for(second, timeout=1)
+        for _ in range(CAP):
+            limiter.release()
+
+    asyncio.run(scenario())
+    assert limiter._free == CAP and not limiter._waiters
+
+
+def test_one_client_per_loop_closed_by_close_client(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(ai, "_clients", {})
+
+    async def scenario():
+        client = ai._get_client()
+        assert ai._get_client() is client
+        await ai.close_client()
+        return client
+
+    first, second = asyncio.run(scenario()), asyncio.run(scenario())
+    assert first is not second
+    assert first.is_closed() and second.is_closed()
+    assert ai._clients == {}
+
+
+def test_no_client_without_an_api_key(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "")
+
+    async def scenario():
+        return ai._get_client()
+
+    assert asyncio.run(scenario()) is None
@@ -0,0 +1,183 @@
+"""
+Append-only price history: appends, torn-record recovery, incremental
+start dates and rebuilds of restated (split/dividend re-adjusted) series.
+"""
+import os
+from datetime import date
+import numpy as np
+import pytest
+from app.config import settings
+from app.services import price_history as ph
+
+WEDNESDAY = date(2026, 10, 21)
+
+
+def make_bars(start: str, count: int, base: float = 100.0) -> np.ndarray:
+    """count consecutive business-day bars from start, closes rising by 1"""
+    bars = np.zeros(count, dtype=ph.BAR_DTYPE)
+    bars["date"] = np.busday_offset(np.datetime64(start, "D"), np.arange(count), roll="forward")
+    bars["close"] = base + np.arange(count)
+    bars["open"] = bars["high"] = bars["low"] = bars["close"]
+    bars["volume"] = 1000
+    return bars
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "PRICE_HISTORY_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "PRICE_HISTORY_BACKFILL_DAYS", 30)
+    monkeypatch.setattr(settings, "YFINANCE_BASE_URL", None)
+    monkeypatch.setattr(ph, "_maps", {})
+    return tmp_path
+
+
+@pytest.fixture
+def market(store, monkeypatch):
+    """
+    Fake yfinance: a fixed series per symbol, returned for [start, end] plus a
+    few later bars (as if today's session were already forming), recording calls.
+    """
+    series = {"MSFT": make_bars("2026-08-03", 80, 400.0), "XLK": make_bars("2026-08-03", 80, 200.0)}
+    calls = []
+
+    def fake_download(symbols, start, end):
+        calls.append((sorted(symbols), start, end))
+        first, last = np.datetime64(start, "D"), np.datetime64(end, "D") + 3
+        return {
+            symbol: series[symbol][(series[symbol]["date"] >= first) & (series[symbol]["date"] <= last)]
+            for symbol in symbols if symbol in series
+        }
+
+    monkeypatch.setattr(ph, "_download_history", fake_download)
+    return series, calls
+
+
+def test_append_and_zero_copy_read(store):
+    bars = make_bars("2026-10-01", 10)
+    assert ph.append_bars("MSFT", bars) == 10
+
+    stored = ph.read_bars("MSFT")
+    assert isinstance(stored, np.memmap)
+    assert not stored.flags.writeable
+    assert np.shares_memory(stored["close"], stored)
+    assert np.array_equal(stored, bars)
+    assert ph.last_date("MSFT") == date(2026, 10, 14)
+    assert os.path.getsize(ph._path("MSFT")) == 10 * ph.BAR_DTYPE.itemsize
+
+
+def test_reappending_an_overlap_writes_only_new_bars(store):
+    ph.append_bars("MSFT", make_bars("2026-10-01", 10))
+    assert ph.append_bars("MSFT", make_bars("2026-10-01", 10)) == 0
+
+    later = make_bars("2026-10-08", 10)
+    shuffled = np.concatenate([later[::-1], later[-2:]])  # unsorted, with repeated dates
+    assert ph.append_bars("MSFT", shuffled) == 5
+
+    stored = ph.read_bars("MSFT")
+    assert len(stored) == 15
+    assert np.all(np.diff(stored["date"].astype(np.int64)) > 0)
+
+
+def test_empty_and_invalid_symbols(store):
+    assert len(ph.read_bars("MSFT")) == 0
+    assert ph.last_date("MSFT") is None
+    assert ph.append_bars("MSFT", np.empty(0, dtype=ph.BAR_DTYPE)) == 0
+    with pytest.raises(ValueError):
+        ph.read_bars("../etc/passwd")
+
+
+def test_torn_record_is_ignored_then_truncated(store):
+    ph.append_bars("XLK", make_bars("2026-10-01", 10))
+    with open(ph._path("XLK"), "ab") as f:
+        f.write(b"\x01" * 20)  # an interrupted write
+
+    assert len(ph.read_bars("XLK")) == 10
+    assert ph.last_date("XLK") == date(2026, 10, 14)
+
+    assert ph.append_bars("XLK", make_bars("2026-10-15", 3, base=110.0)) == 3
+    assert os.path.getsize(ph._path("XLK")) == 13 * ph.BAR_DTYPE.itemsize
+    stored = ph.read_bars("XLK")
+    assert stored["close"].tolist() == [100.0 + i for i in range(10)] + [110.0, 111.0, 112.0]
+
+
+def test_map_key_is_case_insensitive(store):
+    ph.append_bars("MSFT", make_bars("2026-10-01", 5))
+    assert ph.read_bars("msft") is ph.read_bars("MSFT")
+    assert list(ph._maps) == ["MSFT"]
+
+
+def test_backfill_stops_at_the_last_closed_session(market):
+    series, calls = market
+    written = ph.update_history(["MSFT", "XLK"], today=WEDNESDAY)
+
+    assert calls == [(["MSFT", "XLK"], date(2026, 9, 21), date(2026, 10, 20))]
+    assert ph.last_date("MSFT") == date(2026, 10, 20)  # today's forming bar is not stored
+    assert written["MSFT"] == written["XLK"] == len(ph.read_bars("MSFT")) > 0
+
+
+def test_incremental_update_starts_at_the_last_stored_date(market):
+    series, calls = market
+    ph.update_history(["MSFT", "XLK"], today=WEDNESDAY)
+    calls.clear()
+
+    written = ph.update_history(["msft", "xlk"], today=date(2026, 10, 23))
+    assert calls == [(["MSFT", "XLK"], date(2026, 10, 20), date(2026, 10, 22))]
+    assert written == {"MSFT": 2, "XLK": 2}
+    assert ph.last_date("MSFT") == date(2026, 10, 22)
+
+
+def test_current_history_is_not_fetched(market):
+    series, calls = market
+    ph.update_history(["MSFT"], today=date(2026, 10, 24))  # Saturday: Friday closed
+    calls.clear()
+
+    assert ph.update_history(["MSFT"], today=date(2026, 10, 26)) == {"MSFT": 0}  # Monday
+    assert calls == []
+
+
+def test_symbols_are_batched_by_start_date(market):
+    series, calls = market
+    ph.update_history(["MSFT"], today=date(2026, 10, 16))
+    ph.update_history(["XLK"], today=WEDNESDAY)
+    calls.clear()
+
+    ph.update_history(["MSFT", "XLK"], today=date(2026, 10, 23))
+    assert calls == [
+        (["MSFT"], date(2026, 10, 15), date(2026, 10, 22)),
+        (["XLK"], date(2026, 10, 20), date(2026, 10, 22)),
+    ]
+    assert ph.last_date("MSFT") == ph.last_date("XLK") == date(2026, 10, 22)
+
+
+def test_restated_series_is_rebuilt(market):
+    series, calls = market
+    ph.update_history(["MSFT", "XLK"], today=WEDNESDAY)
+    first_stored = ph.read_bars("MSFT")["date"][0].astype(date)
+    before = len(ph.read_bars("MSFT"))
+    calls.clear()
+
+    # A 2:1 split re-adjusts MSFT's whole history
+    for field in ("open", "high", "low", "close"):
+        series["MSFT"][field] /= 2
+
+    written = ph.update_history(["MSFT", "XLK"], today=date(2026, 10, 23))
+    assert calls == [
+        (["MSFT", "XLK"], date(2026, 10, 20), date(2026, 10, 22)),
+        (["MSFT"], min(first_stored, date(2026, 9, 23)), date(2026, 10, 22)),
+    ]
+    assert written == {"MSFT": before + 2, "XLK": 2}
+
+    stored = ph.read_bars("MSFT")
+    expected = series["MSFT"][series["MSFT"]["date"] <= np.datetime64("2026-10-22")]
+    expected = expected[expected["date"] >= stored["date"][0]]
+    assert np.array_equal(stored, expected)
+    assert stored["date"][0].astype(date) == first_stored
+
+
+def test_failed_download_writes_nothing(store, monkeypatch):
+    def failing_download(symbols, start, end):
+        raise ConnectionError("offline")
+
+    monkeypatch.setattr(ph, "_download_history", failing_download)
+    assert ph.update_history(["MSFT"], today=WEDNESDAY) == {"MSFT": 0}
+    assert ph.last_date("MSFT") is None
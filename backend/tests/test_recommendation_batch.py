@@ -0,0 +1,61 @@
+"""
+generate_stock_recommendations_batch must produce exactly what
+generate_stock_recommendation produces per ticker.
+"""
+import numpy as np
+import pytest
+from app.models.schemas import Recommendation
+from app.services import demo_data
+from app.services.analysis_engine import AnalysisEngine
+from benchmarks.recommendation_batch import make_universe, run_scalar
+
+engine = AnalysisEngine()
+MACRO = demo_data.get_demo_macro_snapshot()
+
+
+@pytest.mark.parametrize("seed", [0, 1, 42])
+def test_batch_equals_per_ticker(seed):
+    universe = make_universe(500, seed)
+    scalar = run_scalar(engine, universe, MACRO)
+    batch = engine.generate_stock_recommendations_batch(**universe)
+    assert [rec.model_dump() for rec in batch] == [rec.model_dump() for rec in scalar]
+
+
+def test_recommendation_level_boundaries():
+    # Upsides exactly on and either side of each threshold
+    upsides = [30, 20, 19.99, 10, 9.99, 0, -5, -5.01, -15, -15.01, -40]
+    universe = make_universe(len(upsides), seed=7)
+    universe["current_prices"] = [100.0] * len(upsides)
+    universe["fair_values"] = [100.0 + upside for upside in upsides]
+
+    scalar = run_scalar(engine, universe, MACRO)
+    batch = engine.generate_stock_recommendations_batch(**universe)
+    assert [rec.recommendation for rec in batch] == [rec.recommendation for rec in scalar]
+    assert batch[0].recommendation == Recommendation.STRONG_BUY
+    assert batch[-1].recommendation == Recommendation.STRONG_SELL
+
+
+def test_conviction_scores_match_scalar():
+    rng = np.random.default_rng(3)
+    discounts = rng.uniform(-80, 80, 200)
+    tailwinds = rng.integers(0, 6, 200)
+    headwinds = rng.integers(0, 6, 200)
+    alignment = rng.uniform(0, 100, 200)
+
+    batch = engine.calculate_conviction_scores(discounts, tailwinds, headwinds, alignment)
+    for i in range(200):
+        expected = engine.calculate_conviction_score(
+            ticker="T", sector_score=alignment[i], valuation_discount=discounts[i],
+            tailwind_count=int(tailwinds[i]), headwind_count=int(headwinds[i]),
+            macro_alignment=alignment[i]
+        )
+        assert round(float(batch[i]), 1) == expected
+
+
+def test_zero_price_raises_like_the_scalar_path():
+    universe = make_universe(3, seed=1)
+    universe["current_prices"][1] = 0.0
+    with pytest.raises(ZeroDivisionError):
+        run_scalar(engine, universe, MACRO)
+    with pytest.raises(FloatingPointError):
+        engine.generate_stock_recommendations_batch(**universe)
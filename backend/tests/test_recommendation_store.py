@@ -0,0 +1,152 @@
+"""
+The columnar RecommendationStore behind RecommendationEngine must select and
+order exactly like the list-based screens it replaced (stable sorted(...,
+reverse=True)), including ties, missing ratios and top-k cut-offs.
+"""
+import random
+import numpy as np
+import pytest
+from app.models.schemas import Strategy
+from app.services import demo_data
+from app.services.recommendation_engine import RecommendationEngine, DEFENSIVE_SECTORS, GROWTH_SECTORS
+from app.services.recommendation_store import RecommendationStore
+
+SECTORS = ["Technology", "technology", "Healthcare", "Utilities", "Consumer Staples",
+           "Energy", "Financials", "Communication Services", "Consumer Discretionary"]
+
+
+def make_recommendations(count: int, seed: int):
+    """Demo recommendations with shuffled fields; small value pools force ties"""
+    rng = random.Random(seed)
+    templates = demo_data.get_demo_stock_recommendations()
+    recs = []
+    for i in range(count):
+        template = rng.choice(templates)
+        recs.append(template.model_copy(update={
+            "ticker": f"T{i:03d}",
+            "sector": rng.choice(SECTORS),
+            "conviction_score": float(rng.choice([40, 55, 70, 70, 85, 90])),
+            "upside_potential_pct": rng.choice([-5.0, 8.0, 12.0, 12.0, 18.0, 30.0]),
+            "pe_ratio": rng.choice([None, 0.0, 12.0, 19.9, 20.0, 35.0]),
+            "peg_ratio": rng.choice([None, 0.0, 1.2, 2.9, 3.0, 4.5]),
+            "dividend_yield": rng.choice([None, 0.0, 1.5, 2.0, 2.5, 4.0]),
+            "tailwinds": ["t"] * rng.randint(0, 5),
+            "headwinds": ["h"] * rng.randint(0, 4),
+        }))
+    return recs
+
+
+# Reference implementation: the list-based screens the store replaced
+
+def by_conviction(recs):
+    return sorted(recs, key=lambda x: x.conviction_score, reverse=True)
+
+
+def reference_defensive(recs):
+    return sorted(
+        [rec for rec in recs
+         if rec.sector in DEFENSIVE_SECTORS or (rec.dividend_yield and rec.dividend_yield > 2.0)],
+        key=lambda x: x.conviction_score + (x.dividend_yield or 0) * 5,
+        reverse=True
+    )
+
+
+def reference_growth(recs):
+    return [
+        rec for rec in by_conviction(recs)
+        if rec.sector in GROWTH_SECTORS and rec.peg_ratio and rec.peg_ratio < 3.0 and len(rec.tailwinds) >= 3
+    ]
+
+
+def reference_value(recs):
+    return sorted(
+        [rec for rec in recs if rec.pe_ratio and rec.pe_ratio < 20 and rec.upside_potential_pct > 10],
+        key=lambda x: x.upside_potential_pct,
+        reverse=True
+    )
+
+
+def reference_contrarian(recs):
+    return sorted(
+        [rec for rec in recs if rec.upside_potential_pct > 15 and len(rec.tailwinds) > len(rec.headwinds)],
+        key=lambda x: x.upside_potential_pct,
+        reverse=True
+    )
+
+
+REFERENCE_STRATEGIES = {
+    Strategy.GROWTH: reference_growth,
+    Strategy.VALUE: reference_value,
+    Strategy.DEFENSIVE: reference_defensive,
+    Strategy.CONTRARIAN: reference_contrarian,
+}
+
+
+def reference_filter(recs, strategy, sector, min_conviction, limit):
+    if strategy in REFERENCE_STRATEGIES:
+        filtered = REFERENCE_STRATEGIES[strategy](recs)[:limit]
+    else:
+        filtered = recs
+    if sector:
+        filtered = [rec for rec in filtered if rec.sector.lower() == sector.lower()]
+    if min_conviction:
+        filtered = [rec for rec in filtered if rec.conviction_score >= min_conviction]
+    return by_conviction(filtered)[:limit]
+
+
+def tickers(recs):
+    return [rec.ticker for rec in recs]
+
+
+@pytest.fixture(params=[0, 1, 2])
+def recs(request):
+    return make_recommendations(120, seed=request.param)
+
+
+@pytest.mark.parametrize("n", [0, 1, 5, 10, 500])
+def test_strategy_screens_match_the_list_engine(recs, n):
+    engine = RecommendationEngine(recs)
+    assert tickers(engine.get_top_opportunities(n)) == tickers(by_conviction(recs)[:n])
+    assert tickers(engine.get_defensive_picks(n)) == tickers(reference_defensive(recs)[:n])
+    assert tickers(engine.get_growth_picks(n)) == tickers(reference_growth(recs)[:n])
+    assert tickers(engine.get_value_picks(n)) == tickers(reference_value(recs)[:n])
+    assert tickers(engine.get_contrarian_picks(n)) == tickers(reference_contrarian(recs)[:n])
+
+
+@pytest.mark.parametrize("sector", ["Technology", "TECHNOLOGY", "Energy", "Real Estate"])
+def test_sector_opportunities_match_the_list_engine(recs, sector):
+    engine = RecommendationEngine(recs)
+    expected = [rec for rec in by_conviction(recs) if rec.sector.lower() == sector.lower()]
+    assert tickers(engine.get_sector_opportunities(sector, 5)) == tickers(expected[:5])
+
+
+@pytest.mark.parametrize("strategy", list(Strategy))
+@pytest.mark.parametrize("sector", [None, "Healthcare", "technology"])
+@pytest.mark.parametrize("min_conviction", [None, 70.0])
+@pytest.mark.parametrize("limit", [3, 20])
+def test_filter_matches_the_list_engine(recs, strategy, sector, min_conviction, limit):
+    engine = RecommendationEngine(recs)
+    result = engine.filter_recommendations(strategy, sector, min_conviction, limit)
+    assert tickers(result) == tickers(reference_filter(recs, strategy, sector, min_conviction, limit))
+
+
+def test_results_are_the_original_objects(recs):
+    engine = RecommendationEngine(recs)
+    ids = {id(rec) for rec in recs}
+    assert all(id(rec) in ids for rec in engine.get_top_opportunities(20))
+    assert engine.get_recommendation_by_ticker("t005") is recs[5]
+
+
+@pytest.mark.parametrize("k", [None, 0, 1, 7, 50, 200])
+def test_rank_is_a_stable_descending_top_k(k):
+    key = np.array([3.0, 1.0, 3.0, 2.0, -1.0, 2.0, 3.0, 1.0] * 10)
+    indices = np.arange(len(key))[key != 1.0]
+    expected = sorted(indices.tolist(), key=lambda i: key[i], reverse=True)
+    expected = expected if k is None else expected[:k]
+    assert RecommendationStore.rank(indices, key, k).tolist() == expected
+
+
+def test_empty_store():
+    engine = RecommendationEngine([])
+    assert engine.get_top_opportunities() == []
+    assert engine.filter_recommendations(Strategy.VALUE, "Energy", 50.0) == []
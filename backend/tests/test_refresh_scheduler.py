@@ -0,0 +1,92 @@
+"""
+Background refresh jobs: which jobs are scheduled for the configured sources,
+and sector / macro snapshots publishing without touching the response cache.
+"""
+import asyncio
+import pytest
+from app.config import settings
+from app.services import refresh_scheduler, response_cache, snapshots
+from app.services import live_recommendations_service as lrs
+from app.services.response_cache import ResponseCache
+
+SECTORS = {"XLK": {"10. change percent": "1.2%"}}
+INDICATORS = {"GDP": {"value": 29000.0}}
+
+
+@pytest.fixture
+def provider(monkeypatch):
+    """Fake MarketDataProvider results, counting calls"""
+    calls = []
+
+    async def sector_performance(self):
+        calls.append("sectors")
+        return SECTORS
+
+    async def economic_indicators(self):
+        calls.append("indicators")
+        return INDICATORS
+
+    monkeypatch.setattr(refresh_scheduler.MarketDataProvider, "get_sector_performance", sector_performance)
+    monkeypatch.setattr(refresh_scheduler.MarketDataProvider, "get_economic_indicators", economic_indicators)
+    monkeypatch.setattr(snapshots, "_snapshots", {})
+    return calls
+
+
+def test_sector_and_macro_jobs_publish_their_snapshots(provider):
+    asyncio.run(refresh_scheduler.refresh_sector_performance())
+    asyncio.run(refresh_scheduler.refresh_economic_indicators())
+
+    assert provider == ["sectors", "indicators"]
+    assert snapshots.get(snapshots.SECTOR_PERFORMANCE).data is SECTORS
+    assert snapshots.get(snapshots.ECONOMIC_INDICATORS).data is INDICATORS
+    assert set(snapshots.status()) == {snapshots.SECTOR_PERFORMANCE, snapshots.ECONOMIC_INDICATORS}
+
+
+def test_sector_and_macro_publishes_keep_the_response_cache(provider, monkeypatch):
+    cache = ResponseCache(max_entries=16)
+    monkeypatch.setattr(response_cache, "response_cache", cache)
+    cache.put(("/api/recommendations", (), response_cache.data_version()), b"[]")
+    version = response_cache.data_version()
+
+    asyncio.run(refresh_scheduler.refresh_sector_performance())
+    asyncio.run(refresh_scheduler.refresh_economic_indicators())
+
+    assert response_cache.data_version() == version
+    assert cache.get(("/api/recommendations", (), version)) is not None
+    assert cache.stats()["invalidations"] == 0
+
+    snapshots.publish(snapshots.RECOMMENDATIONS, [])
+    assert cache.stats()["entries"] == 0
+
+
+@pytest.mark.parametrize("live, keys, expected", [
+    (False, False, []),
+    (True, False, ["refresh_recommendations", "refresh_price_history"]),
+    (False, True, [
+        "refresh_sector_performance", "refresh_economic_indicators", "refresh_price_history"
+    ]),
+    (True, True, [
+        "refresh_recommendations", "refresh_sector_performance",
+        "refresh_economic_indicators", "refresh_price_history"
+    ]),
+])
+def test_jobs_follow_the_configured_sources(monkeypatch, live, keys, expected):
+    monkeypatch.setattr(settings, "BACKGROUND_REFRESH_ENABLED", True)
+    monkeypatch.setattr(settings, "PRICE_HISTORY_ENABLED", True)
+    monkeypatch.setattr(settings, "ALPHA_VANTAGE_API_KEY", "av-key" if keys else "")
+    monkeypatch.setattr(settings, "FRED_API_KEY", "fred-key" if keys else "")
+    monkeypatch.setattr(lrs, "is_live_mode", lambda: live)
+    monkeypatch.setattr(lrs, "_background_refresh", False)
+
+    async def scenario():
+        refresh_scheduler.start_refresh_scheduler()
+        scheduler = refresh_scheduler._scheduler
+        jobs = [job.id for job in scheduler.get_jobs()] if scheduler else []
+        background = lrs._background_refresh
+        refresh_scheduler.stop_refresh_scheduler()
+        return jobs, background
+
+    jobs, background = asyncio.run(scenario())
+    assert jobs == expected
+    assert background is live
+    assert refresh_scheduler._scheduler is None
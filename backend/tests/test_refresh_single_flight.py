@@ -0,0 +1,105 @@
+"""
+Single-flight refreshes: concurrent callers share one pipeline run, and a
+cancelled caller does not abort it.
+"""
+import asyncio
+import threading
+import pytest
+from app.services import demo_data, snapshots
+from app.services import live_recommendations_service as lrs
+
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    """Replaces the ingestion pipeline with a slow fake that counts its runs"""
+    calls = []
+    results = demo_data.get_demo_stock_recommendations()[:3]
+
+    async def fake_pipeline(ticker_list, incremental=False, trace=None):
+        calls.append(list(ticker_list))
+        await asyncio.sleep(0.2)
+        return results
+
+    monkeypatch.setattr(lrs, "_run_ingestion_pipeline", fake_pipeline)
+    monkeypatch.setattr(lrs, "_refresh_task", None)
+    monkeypatch.setattr(snapshots, "_snapshots", {})
+    monkeypatch.setattr(lrs, "_refresh_stats", {stat: 0 for stat in lrs._refresh_stats})
+    return calls, results
+
+
+def test_concurrent_callers_share_one_refresh(pipeline):
+    calls, results = pipeline
+
+    async def scenario():
+        return await asyncio.gather(*(lrs.refresh_live_recommendations_async() for _ in range(5)))
+
+    outcomes = asyncio.run(scenario())
+    assert len(calls) == 1
+    assert all(outcome is results for outcome in outcomes)
+    assert lrs.get_refresh_stats()["refreshes"] == 1
+    assert lrs.get_refresh_stats()["coalesced_waiters"] == 4
+    assert snapshots.get(snapshots.RECOMMENDATIONS).data is results
+
+
+def test_cancelled_caller_does_not_abort_the_refresh(pipeline):
+    calls, results = pipeline
+
+    async def scenario():
+        first = asyncio.ensure_future(lrs.refresh_live_recommendations_async())
+        await asyncio.sleep(0.05)
+        second = asyncio.ensure_future(lrs.refresh_live_recommendations_async())
+        await asyncio.sleep(0)
+        first.cancel()
+        outcome = await second
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return outcome
+
+    assert asyncio.run(scenario()) is results
+    assert len(calls) == 1
+    assert snapshots.get(snapshots.RECOMMENDATIONS).data is results
+
+
+def test_fresh_snapshot_skips_an_unforced_refresh(pipeline):
+    calls, results = pipeline
+    asyncio.run(lrs.refresh_live_recommendations_async())
+    asyncio.run(lrs.refresh_live_recommendations_async(force=False))
+    assert len(calls) == 1
+
+
+def test_blocking_caller_waits_on_the_running_refresh(pipeline):
+    calls, results = pipeline
+    outcome = {}
+
+    async def scenario():
+        refresh = asyncio.ensure_future(lrs.refresh_live_recommendations_async())
+        await asyncio.sleep(0.05)
+        thread = threading.Thread(
+            target=lambda: outcome.setdefault("blocking", lrs.refresh_live_recommendations())
+        )
+        thread.start()
+        await refresh
+        await asyncio.to_thread(thread.join)
+
+    asyncio.run(scenario())
+    assert len(calls) == 1
+    assert outcome["blocking"] is results
+
+
+def test_cancelled_waiter_does_not_leak_the_refresh_lock(pipeline):
+    calls, results = pipeline
+
+    async def scenario():
+        lrs._refresh_lock.acquire()  # a blocking refresh running in another thread
+        waiter = asyncio.ensure_future(lrs._refresh(None, True, None))
+        await asyncio.sleep(0.05)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        lrs._refresh_lock.release()  # the other refresh finishes
+        await asyncio.sleep(0.05)
+        assert not lrs._refresh_lock.locked()
+        return await asyncio.wait_for(lrs.refresh_live_recommendations_async(), timeout=2)
+
+    assert asyncio.run(scenario()) is results
+    assert len(calls) == 1
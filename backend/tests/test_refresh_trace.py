@@ -0,0 +1,119 @@
+"""
+Refresh tracing: per-ticker spans kept apart across concurrent tasks,
+the aggregated report, and the /api/debug/refreshes history.
+"""
+import asyncio
+from collections import deque
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.api.routes import debug
+from app.config import settings
+from app.main import app
+from app.services import live_recommendations_service as lrs, refresh_trace
+
+
+@pytest.fixture(autouse=True)
+def history(monkeypatch):
+    reports = deque(maxlen=3)
+    monkeypatch.setattr(refresh_trace, "_reports", reports)
+    return reports
+
+
+def test_spans_outside_a_refresh_are_no_ops():
+    with refresh_trace.span(refresh_trace.FETCH):
+        pass
+    refresh_trace.record(refresh_trace.LLM, 1.0)
+    assert refresh_trace.reports() == []
+
+
+def test_report_aggregates_stages_and_ranks_slowest_tickers(monkeypatch):
+    monkeypatch.setattr(settings, "REFRESH_TRACE_SLOWEST", 2)
+    trace = refresh_trace.RefreshTrace(tickers=3, incremental=True)
+    with trace.stage("prices"):
+        pass
+    for ticker, llm_seconds, status in (("MSFT", 0.3, "analyzed"), ("AAPL", 0.1, "reused"), ("NVDA", 0.2, None)):
+        with trace.ticker(ticker) as ticker_trace:
+            refresh_trace.record(refresh_trace.LLM, llm_seconds)
+            refresh_trace.record(refresh_trace.FETCH, 0.05)
+            if status:
+                ticker_trace.status = status
+        ticker_trace.seconds = llm_seconds  # deterministic ranking
+    with pytest.raises(RuntimeError):
+        with trace.ticker("TSLA"):
+            raise RuntimeError("boom")
+
+    report = trace.finish("published")
+    assert report["outcome"] == "published" and report["incremental"] is True
+    assert report["tickers"] == 3
+    assert report["ticker_status"] == {"analyzed": 1, "reused": 1, "done": 1, "error": 1}
+    assert list(report["refresh_stages"]) == ["prices"]
+    assert list(report["stages"]) == [refresh_trace.FETCH, refresh_trace.LLM]  # pipeline order
+    assert report["stages"][refresh_trace.LLM] == {
+        "count": 3, "total_seconds": 0.6, "mean_seconds": 0.2, "max_seconds": 0.3
+    }
+    assert [t["ticker"] for t in report["slowest_tickers"]] == ["MSFT", "NVDA"]
+    assert report["slowest_tickers"][0]["stages"] == {refresh_trace.LLM: 0.3, refresh_trace.FETCH: 0.05}
+    assert refresh_trace.reports() == [report]
+
+
+def test_concurrent_tickers_keep_their_own_spans(monkeypatch):
+    def fetch(ticker, price=None):
+        return {
+            "ticker": ticker, "company_name": ticker, "sector": "Technology", "current_price": 100.0,
+            "target_mean_price": 110.0, "market_cap_billions": 10.0, "pe_ratio": 20.0,
+        } if ticker != "GONE" else None
+
+    async def analyze(stock_data):
+        # Interleave with the other tickers' tasks before and after the span
+        await asyncio.sleep(0)
+        with refresh_trace.span(refresh_trace.LLM):
+            await asyncio.sleep(0.01 * len(stock_data["ticker"]))
+        refresh_trace.record(refresh_trace.PARSE, 0.001)
+        return {"fair_value_estimate": 120.0, "recommendation": "BUY", "conviction_score": 70}
+
+    monkeypatch.setattr(lrs, "fetch_stock_data", fetch)
+    monkeypatch.setattr(lrs, "analyze_stock_with_ai_async", analyze)
+    monkeypatch.setattr(lrs, "_last_analysis", {})
+    monkeypatch.setattr(settings, "SPLIT_INGESTION", False)
+
+    trace = refresh_trace.RefreshTrace(4, incremental=False)
+    asyncio.run(lrs._run_ingestion_pipeline(["A", "BBBBB", "CC", "GONE"], trace=trace))
+    traces = {t.ticker: t for t in trace.tickers}
+
+    assert {ticker: t.status for ticker, t in traces.items()} == {
+        "A": "analyzed", "BBBBB": "analyzed", "CC": "analyzed", "GONE": "no_data"
+    }
+    for ticker in ("A", "BBBBB", "CC"):
+        stages = traces[ticker].stages
+        assert set(stages) == {refresh_trace.FETCH, refresh_trace.LLM, refresh_trace.PARSE, refresh_trace.BUILD}
+        assert stages[refresh_trace.PARSE] == 0.001
+        assert stages[refresh_trace.LLM] >= 0.01 * len(ticker)
+    llm = [traces[ticker].stages[refresh_trace.LLM] for ticker in ("A", "CC", "BBBBB")]
+    assert llm == sorted(llm)
+    assert set(traces["GONE"].stages) == {refresh_trace.FETCH}
+
+
+def test_history_is_bounded_and_newest_first():
+    for outcome in ("published", "empty", "error", "published"):
+        refresh_trace.RefreshTrace(0, incremental=False).finish(outcome)
+    assert [r["outcome"] for r in refresh_trace.reports()] == ["published", "error", "empty"]
+    assert len(refresh_trace.reports(1)) == 1
+
+
+def test_debug_endpoint_returns_latest_reports():
+    for outcome in ("empty", "published"):
+        refresh_trace.RefreshTrace(0, incremental=False).finish(outcome)
+    debug_app = FastAPI()
+    debug_app.include_router(debug.router)
+    client = TestClient(debug_app)
+
+    assert [r["outcome"] for r in client.get("/api/debug/refreshes").json()] == ["published", "empty"]
+    assert [r["outcome"] for r in client.get("/api/debug/refreshes", params={"limit": 1}).json()] == ["published"]
+    assert client.get("/api/debug/refreshes", params={"limit": 0}).status_code == 422
+    assert "/api/debug/refreshes" not in client.get("/openapi.json").json()["paths"]
+
+
+def test_debug_endpoints_are_off_by_default():
+    assert not settings.DEBUG and not settings.DEBUG_ENDPOINTS_ENABLED
+    assert TestClient(app).get("/api/debug/refreshes").status_code == 404
@@ -0,0 +1,182 @@
+"""
+Token-bucket pacing of upstream calls (request_scheduler).
+"""
+import asyncio
+import threading
+import time
+import pytest
+from app.services import request_scheduler
+from app.services.request_scheduler import (
+    TokenBucket, ProviderQueue, PRIORITY_INTERACTIVE, PRIORITY_REFRESH
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(request_scheduler.time, "monotonic", fake)
+    return fake
+
+
+def test_bucket_starts_full_and_holds_at_most_capacity(clock):
+    bucket = TokenBucket(rate_per_minute=5)
+    assert bucket.available() == 5
+    clock.now += 3600
+    assert bucket.available() == 5
+
+
+def test_bucket_refills_at_the_configured_rate(clock):
+    bucket = TokenBucket(rate_per_minute=60, capacity=1)
+    bucket.consume()
+    assert bucket.delay_until_available() == pytest.approx(1.0)
+
+    clock.now += 0.25
+    assert bucket.delay_until_available() == pytest.approx(0.75)
+    clock.now += 0.75
+    assert bucket.delay_until_available() == 0.0
+
+
+def test_drain_empties_the_bucket(clock):
+    bucket = TokenBucket(rate_per_minute=120)
+    bucket.drain()
+    assert bucket.available() == 0
+    assert bucket.delay_until_available() == pytest.approx(0.5)
+
+
+def test_queue_spaces_calls_at_the_quota():
+    async def scenario():
+        queue = ProviderQueue("test", TokenBucket(rate_per_minute=1200, capacity=1))  # one every 50ms
+        granted = []
+
+        async def call():
+            await queue.acquire()
+            granted.append(time.perf_counter())
+
+        await asyncio.gather(*(call() for _ in range(5)))
+        return granted, queue
+
+    granted, queue = asyncio.run(scenario())
+    gaps = [b - a for a, b in zip(granted, granted[1:])]
+    assert len(granted) == 5
+    assert min(gaps) >= 0.04
+    assert queue.status()["granted"] == 5
+
+
+def test_queue_serves_interactive_callers_first():
+    async def scenario():
+        queue = ProviderQueue("test", TokenBucket(rate_per_minute=1200, capacity=1))
+        queue.bucket.drain()
+        order = []
+
+        async def call(name: str, priority: int):
+            await queue.acquire(priority)
+            order.append(name)
+
+        refresh = [asyncio.ensure_future(call(f"refresh{i}", PRIORITY_REFRESH)) for i in range(3)]
+        await asyncio.sleep(0)
+        interactive = asyncio.ensure_future(call("interactive", PRIORITY_INTERACTIVE))
+        await asyncio.gather(*refresh, interactive)
+        return order
+
+    assert asyncio.run(scenario()) == ["interactive", "refresh0", "refresh1", "refresh2"]
+
+
+def test_cancelled_waiter_does_not_consume_a_token():
+    async def scenario():
+        queue = ProviderQueue("test", TokenBucket(rate_per_minute=1200, capacity=1))
+        queue.bucket.drain()
+        cancelled = asyncio.ensure_future(queue.acquire())
+        waiting = asyncio.ensure_future(queue.acquire())
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        await asyncio.wait_for(waiting, timeout=1)
+        return queue.status()
+
+    status = asyncio.run(scenario())
+    assert status["granted"] == 1
+    assert status["queued"] == 0
+
+
+def test_report_throttled_pauses_the_queue():
+    async def scenario():
+        queue = ProviderQueue("test", TokenBucket(rate_per_minute=600, capacity=5))
+        await queue.acquire()
+        queue.report_throttled()
+        started = time.perf_counter()
+        await queue.acquire()
+        return time.perf_counter() - started, queue.status()
+
+    waited, status = asyncio.run(scenario())
+    assert waited >= 0.08  # a full token at 10/s, despite 4 tokens left before the throttle
+    assert status["throttled"] == 1
+
+
+def test_queue_is_shared_safely_across_event_loops():
+    queue = ProviderQueue("test", TokenBucket(rate_per_minute=1200, capacity=1))  # one every 50ms
+    queue.bucket.drain()
+    granted, errors = [], []
+
+    def run_loop():
+        async def call():
+            await asyncio.wait_for(queue.acquire(), timeout=5)
+            granted.append(time.perf_counter())
+
+        async def calls():
+            await asyncio.gather(*(call() for _ in range(3)))
+
+        try:
+            asyncio.run(calls())
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run_loop) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len(granted) == 9
+    times = sorted(granted)
+    assert min(b - a for a, b in zip(times, times[1:])) >= 0.04
+    assert queue.status()["granted"] == 9 and queue.status()["queued"] == 0
+
+
+def test_waiter_is_woken_on_its_own_loop():
+    queue = ProviderQueue("test", TokenBucket(rate_per_minute=1, capacity=1))  # next token in a minute
+    queue.bucket.drain()
+
+    def grant_from_another_thread():
+        queue.bucket.tokens = 1.0
+        queue._dispatch()  # e.g. another loop's timer fired
+
+    async def scenario():
+        waiting = asyncio.ensure_future(queue.acquire())
+        await asyncio.sleep(0.01)
+        started = time.perf_counter()
+        threading.Timer(0.05, grant_from_another_thread).start()
+        await asyncio.wait_for(waiting, timeout=2)
+        return time.perf_counter() - started
+
+    assert asyncio.run(scenario()) < 1  # the grant wakes the loop, not an unrelated timeout
+    assert queue.status()["granted"] == 1
+
+
+def test_grant_for_a_closed_loop_is_refunded():
+    queue = ProviderQueue("test", TokenBucket(rate_per_minute=60, capacity=1))
+    loop = asyncio.new_event_loop()
+    queue._waiters.append((PRIORITY_REFRESH, 0, loop.create_future()))
+    loop.close()
+
+    queue._dispatch()
+    assert queue.granted == 0
+    assert queue.bucket.available() == pytest.approx(1.0, abs=0.01)
+    assert queue.status()["queued"] == 0
@@ -0,0 +1,197 @@
+"""
+Response cache: ETag / 304 handling, invalidation when a recommendations
+snapshot publish bumps the data version, and the headers of the app's cached routes.
+"""
+from typing import List
+import pytest
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.testclient import TestClient
+from app.config import settings
+from app.main import app
+from app.models.schemas import StockRecommendation
+from app.services import demo_data, response_cache, snapshots
+from app.services.response_cache import ResponseCache, cached_json_response
+
+RECOMMENDATIONS = demo_data.get_demo_stock_recommendations()
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    """A fresh cache in place of the global one (the publish listener looks it up by name)"""
+    fresh = ResponseCache(max_entries=16)
+    monkeypatch.setattr(response_cache, "response_cache", fresh)
+    monkeypatch.setattr(snapshots, "_snapshots", {})
+    monkeypatch.setattr(settings, "RESPONSE_CACHE_ENABLED", True)
+    return fresh
+
+
+@pytest.fixture
+def served(cache):
+    """A test app whose route serves served["data"] through the cache, counting builds"""
+    state = {"data": RECOMMENDATIONS[:3], "builds": 0}
+    test_app = FastAPI()
+
+    @test_app.get("/items", response_model=List[StockRecommendation])
+    async def items(request: Request):
+        async def build():
+            state["builds"] += 1
+            return state["data"]
+        return await cached_json_response(request, build, List[StockRecommendation])
+
+    @test_app.get("/missing")
+    async def missing(request: Request):
+        async def build():
+            state["builds"] += 1
+            raise HTTPException(status_code=404, detail="not found")
+        return await cached_json_response(request, build, StockRecommendation)
+
+    state["client"] = TestClient(test_app)
+    return state
+
+
+def test_repeat_requests_are_served_from_cache(served, cache):
+    client = served["client"]
+    first = client.get("/items")
+    second = client.get("/items")
+
+    assert first.status_code == second.status_code == 200
+    assert first.content == second.content
+    assert first.headers["etag"] == second.headers["etag"]
+    assert first.headers["cache-control"] == "no-cache"
+    assert served["builds"] == 1
+    assert cache.stats()["hits"] == 1
+
+
+def test_query_order_does_not_split_entries(served):
+    client = served["client"]
+    client.get("/items?a=1&b=2")
+    client.get("/items?b=2&a=1")
+    client.get("/items?a=1&b=3")
+    assert served["builds"] == 2
+
+
+@pytest.mark.parametrize("header", ['{etag}', 'W/{etag}', '*', '"other", {etag}'])
+def test_matching_if_none_match_gets_304(served, cache, header):
+    client = served["client"]
+    etag = client.get("/items").headers["etag"]
+
+    response = client.get("/items", headers={"If-None-Match": header.format(etag=etag)})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+    assert cache.stats()["not_modified"] == 1
+
+
+def test_stale_if_none_match_gets_the_body(served):
+    client = served["client"]
+    response = client.get("/items", headers={"If-None-Match": '"0123456789abcdef0123456789abcdef"'})
+    assert response.status_code == 200
+    assert len(response.json()) == 3
+
+
+def test_publish_invalidates_cached_bodies(served, cache):
+    client = served["client"]
+    old = client.get("/items")
+    version = response_cache.data_version()
+
+    served["data"] = RECOMMENDATIONS[:2]
+    snapshots.publish(snapshots.RECOMMENDATIONS, served["data"])
+    assert response_cache.data_version() > version
+    assert cache.stats()["entries"] == 0
+    assert cache.stats()["invalidations"] == 1
+
+    response = client.get("/items", headers={"If-None-Match": old.headers["etag"]})
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+    assert response.headers["etag"] != old.headers["etag"]
+    assert served["builds"] == 2
+
+
+@pytest.mark.parametrize("name", [snapshots.SECTOR_PERFORMANCE, snapshots.ECONOMIC_INDICATORS])
+def test_other_snapshots_leave_cached_bodies(served, cache, name):
+    client = served["client"]
+    client.get("/items")
+    version = response_cache.data_version()
+
+    snapshots.publish(name, {"XLK": {"change_percent": 1.2}})
+    assert response_cache.data_version() == version
+    assert client.get("/items").status_code == 200
+    assert served["builds"] == 1
+    assert cache.stats()["invalidations"] == 0
+
+
+def test_unchanged_body_keeps_its_etag_across_versions(served):
+    client = served["client"]
+    etag = client.get("/items").headers["etag"]
+    snapshots.publish(snapshots.RECOMMENDATIONS, served["data"])
+
+    response = client.get("/items", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert served["builds"] == 2
+
+
+def test_errors_are_not_cached(served, cache):
+    client = served["client"]
+    assert client.get("/missing").status_code == 404
+    assert client.get("/missing").status_code == 404
+    assert served["builds"] == 2
+    assert cache.stats()["entries"] == 0
+
+
+def test_disabled_cache_builds_every_time(served, monkeypatch):
+    monkeypatch.setattr(settings, "RESPONSE_CACHE_ENABLED", False)
+    client = served["client"]
+    first = client.get("/items")
+    client.get("/items")
+    assert "etag" not in first.headers
+    assert served["builds"] == 2
+
+
+def test_recommendations_route_revalidates(cache):
+    client = TestClient(app)
+    first = client.get("/api/recommendations", params={"limit": 5})
+    assert first.status_code == 200
+    assert len(first.json()) == 5
+
+    repeat = client.get("/api/recommendations", params={"limit": 5}, headers={"If-None-Match": first.headers["etag"]})
+    assert repeat.status_code == 304
+
+    assert client.get("/api/recommendations/NOSUCHTICKER").status_code == 404
+
+
+CACHED_ROUTES = [
+    "/api/dashboard",
+    "/api/recommendations?limit=50",
+    "/api/recommendations/screaming-buys",
+    "/api/recommendations/MSFT",
+    "/api/portfolio/recommendations",
+    "/api/sectors",
+    "/api/sectors/Technology",
+]
+
+
+@pytest.mark.parametrize("path", CACHED_ROUTES)
+def test_cached_routes_send_validators_and_cors_headers(cache, path):
+    client = TestClient(app)
+    origin = {"Origin": settings.CORS_ORIGINS[0]}
+    first = client.get(path, headers=origin)
+
+    assert first.status_code == 200
+    assert first.headers["content-type"] == "application/json"
+    assert first.headers["content-length"] == str(len(first.content))
+    assert first.headers["cache-control"] == "no-cache"
+    assert first.headers["etag"].startswith('"') and first.headers["etag"].endswith('"')
+    assert first.headers["access-control-allow-origin"] == settings.CORS_ORIGINS[0]
+
+    repeat = client.get(path, headers={**origin, "If-None-Match": first.headers["etag"]})
+    assert repeat.status_code == 304
+    assert repeat.content == b""
+    assert repeat.headers["etag"] == first.headers["etag"]
+    assert repeat.headers["cache-control"] == "no-cache"
+    assert repeat.headers["access-control-allow-origin"] == settings.CORS_ORIGINS[0]
+
+
+def test_uncached_routes_send_no_validators(cache):
+    response = TestClient(app).get("/api/portfolio/allocation")
+    assert response.status_code == 200
+    assert "etag" not in response.headers and "cache-control" not in response.headers
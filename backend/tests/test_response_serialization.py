@@ -0,0 +1,68 @@
+"""
+render_json (one TypeAdapter pass) must produce the same JSON as FastAPI's
+default response_model validation + jsonable_encoder path it replaced.
+"""
+import json
+from typing import Any, List
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.models.schemas import DashboardSummary, MacroSnapshot, SectorAnalysis, StockRecommendation
+from app.services import demo_data
+from app.services.response_cache import render_json
+
+RECOMMENDATIONS = demo_data.get_demo_stock_recommendations()
+
+
+def awkward_recommendation() -> StockRecommendation:
+    """Non-ASCII text, tiny and long floats, missing optionals"""
+    return RECOMMENDATIONS[0].model_copy(update={
+        "company_name": "Société Générale — Ünïcode ✓",
+        "conviction_score": 0.1 + 0.2,
+        "upside_potential_pct": -1e-7,
+        "pe_ratio": None,
+        "peg_ratio": 123456789.123,
+        "dividend_yield": None,
+        "headwinds": [],
+    })
+
+
+def dashboard() -> DashboardSummary:
+    return DashboardSummary(
+        macro_snapshot=demo_data.get_demo_macro_snapshot(),
+        top_recommendations=RECOMMENDATIONS[:5],
+        sector_rankings=demo_data.get_demo_sector_analyses(),
+        geopolitical_risks=demo_data.get_demo_geopolitical_risks(),
+        suggested_allocation=demo_data.get_demo_portfolio_allocation("moderate"),
+        market_regime=demo_data.get_demo_market_regime(),
+        data_source="demo"
+    )
+
+
+def fastapi_json(payload: Any, response_type: Any) -> Any:
+    """The body FastAPI itself would send for payload under response_model=response_type"""
+    reference = FastAPI()
+
+    @reference.get("/", response_model=response_type)
+    async def route():
+        return payload
+
+    return TestClient(reference).get("/").json()
+
+
+@pytest.mark.parametrize("payload, response_type", [
+    (RECOMMENDATIONS, List[StockRecommendation]),
+    ([], List[StockRecommendation]),
+    (RECOMMENDATIONS[0], StockRecommendation),
+    (awkward_recommendation(), StockRecommendation),
+    (demo_data.get_demo_sector_analyses(), List[SectorAnalysis]),
+    (demo_data.get_demo_macro_snapshot(), MacroSnapshot),
+    (dashboard(), DashboardSummary),
+])
+def test_render_json_matches_fastapi(payload, response_type):
+    assert json.loads(render_json(payload, response_type)) == fastapi_json(payload, response_type)
+
+
+def test_render_json_is_compact_utf8():
+    body = render_json(awkward_recommendation(), StockRecommendation)
+    assert '"company_name":"Société Générale — Ünïcode ✓","sector"'.encode() in body
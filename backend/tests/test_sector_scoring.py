@@ -0,0 +1,83 @@
+"""
+Vectorized sector scoring must equal AnalysisEngine.score_sector for every
+(sector, cycle phase, macro scenario) cell, including the threshold edges.
+"""
+import itertools
+import pytest
+from app.models.schemas import EconomicCycle, Outlook
+from app.services import demo_data
+from app.services.analysis_engine import AnalysisEngine
+
+engine = AnalysisEngine()
+MACRO = demo_data.get_demo_macro_snapshot()
+
+# Each macro condition just below, at and above its threshold
+MACRO_SCENARIOS = [
+    MACRO.model_copy(update={"fed_funds_rate": rate, "inflation_rate": inflation, "vix": vix})
+    for rate, inflation, vix in itertools.product([4.0, 4.5, 4.51], [2.9, 3.0, 3.2], [15.0, 20.0, 28.0])
+]
+
+
+def sector_data():
+    """Demo sectors plus synthetic ones covering every outlook, clamped winds and an unknown sector"""
+    demo = list(demo_data.get_demo_sector_analyses())
+    return demo + [
+        demo[0].model_copy(update={
+            "sector": f"Synthetic {i}",
+            "outlook": outlook,
+            "tailwinds": ["t"] * (7 * i),
+            "headwinds": ["h"] * (7 - 3 * i),
+        })
+        for i, outlook in enumerate(Outlook)
+    ]
+
+
+def test_batch_equals_per_sector_scores():
+    sectors = sector_data()
+    scores = engine.score_sectors(sectors, MACRO_SCENARIOS)
+    assert scores.total.shape == (len(MACRO_SCENARIOS), len(EconomicCycle), len(sectors))
+
+    for scenario, macro in enumerate(MACRO_SCENARIOS):
+        for phase in EconomicCycle:
+            for data in sectors:
+                expected = engine.score_sector(data.sector, phase, macro, data)
+                assert scores.score(data.sector, phase, scenario) == expected, (data.sector, phase, macro)
+
+
+def test_scalar_macro_inputs_and_phase_subset():
+    sectors = sector_data()
+    phases = [EconomicCycle.PEAK, EconomicCycle.TROUGH]
+    scores = engine.score_sectors_batch(
+        sectors, MACRO.fed_funds_rate, MACRO.inflation_rate, MACRO.vix, cycle_phases=phases
+    )
+    assert scores.total.shape == (1, 2, len(sectors))
+    for phase in phases:
+        for data in sectors:
+            assert scores.score(data.sector, phase) == engine.score_sector(data.sector, phase, MACRO, data)
+
+
+@pytest.mark.parametrize("phase", list(EconomicCycle))
+def test_ranking_orders_scalar_scores(phase):
+    sectors = sector_data()
+    scores = engine.score_sectors(sectors, [MACRO])
+    expected = sorted(
+        ((data.sector, engine.score_sector(data.sector, phase, MACRO, data)) for data in sectors),
+        key=lambda x: x[1],
+        reverse=True
+    )
+    assert scores.ranking(phase) == expected
+
+
+def test_components_recompose_the_total():
+    sectors = sector_data()
+    scores = engine.score_sectors(sectors, MACRO_SCENARIOS)
+    for data in sectors:
+        parts = scores.components(data.sector, EconomicCycle.EXPANSION, scenario=5)
+        composite = parts["cycle"] * 0.40 + parts["valuation"] * 0.25 + parts["wind"] * 0.20 + parts["macro"] * 0.15
+        assert parts["total"] == round(min(100, max(0, composite)), 1)
+        assert 0 <= parts["wind"] <= 100
+
+
+def test_mismatched_scenario_lengths_are_rejected():
+    with pytest.raises(ValueError):
+        engine.score_sectors_batch(sector_data(), [4.0, 5.0], [2.0, 3.5, 4.0], 18.0)
@@ -0,0 +1,141 @@
+"""
+Split ingestion: one batched price download for the whole watchlist, and
+fundamentals (.info) refreshed on their own, much longer cycle.
+"""
+import asyncio
+import pandas as pd
+import pytest
+from app.config import settings
+from app.services import market_data_service as mds, market_data_store as store
+from app.services import live_recommendations_service as lrs
+
+TICKERS = ["MSFT", "AAPL", "NVDA"]
+
+
+class Yahoo:
+    """Fake yfinance: batched closes and per-ticker .info, counting calls"""
+
+    def __init__(self):
+        self.downloads = []
+        self.info_calls = []
+        self.closes = {"MSFT": 410.0, "AAPL": 230.0, "NVDA": 130.0}
+
+    def download(self, tickers):
+        self.downloads.append(list(tickers))
+        return {t: (self.closes[t], pd.Timestamp("2026-10-16").date()) for t in tickers if t in self.closes}
+
+    def info(self, ticker):
+        self.info_calls.append(ticker)
+        return {
+            "currentPrice": 400.0, "longName": ticker, "sector": "Technology", "marketCap": 4e11,
+            "trailingPE": 30.0, "targetMeanPrice": 450.0, "longBusinessSummary": "x" * 2000,
+        }
+
+
+@pytest.fixture
+def yahoo(monkeypatch):
+    fake = Yahoo()
+    monkeypatch.setattr(mds, "_download_latest_closes", fake.download)
+    monkeypatch.setattr(mds, "_fetch_info", fake.info)
+    monkeypatch.setattr(mds, "_fundamentals_cache", {})
+    monkeypatch.setattr(settings, "YFINANCE_BASE_URL", None)
+    monkeypatch.setattr(settings, "MARKET_DATA_PERSISTENCE", False)
+    return fake
+
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "DB_URL", f"sqlite+aiosqlite:///{tmp_path / 'store.db'}")
+    monkeypatch.setattr(settings, "MARKET_DATA_PERSISTENCE", True)
+    monkeypatch.setattr(store, "_engine", None)
+    yield
+    if store._engine is not None:
+        store._engine.dispose()
+
+
+def test_prices_come_from_one_batched_download(yahoo):
+    assert mds.fetch_watchlist_prices(TICKERS + ["DELISTED"]) == {"MSFT": 410.0, "AAPL": 230.0, "NVDA": 130.0}
+    assert yahoo.downloads == [TICKERS + ["DELISTED"]]
+    assert yahoo.info_calls == []
+    assert mds.fetch_watchlist_prices([]) == {}
+    assert len(yahoo.downloads) == 1
+
+
+def test_stored_prices_are_not_downloaded_again(yahoo, database):
+    mds.fetch_watchlist_prices(["MSFT"])
+    assert mds.fetch_watchlist_prices(TICKERS) == {"MSFT": 410.0, "AAPL": 230.0, "NVDA": 130.0}
+    assert yahoo.downloads == [["MSFT"], ["AAPL", "NVDA"]]
+
+    mds.fetch_watchlist_prices(TICKERS)
+    assert len(yahoo.downloads) == 2
+
+
+def test_failed_download_keeps_stored_prices(yahoo, database, monkeypatch):
+    mds.fetch_watchlist_prices(["MSFT"])
+
+    def offline(tickers):
+        raise ConnectionError("offline")
+
+    monkeypatch.setattr(mds, "_download_latest_closes", offline)
+    assert mds.fetch_watchlist_prices(TICKERS) == {"MSFT": 410.0}
+
+
+def test_multi_ticker_frame_is_parsed(monkeypatch):
+    import yfinance as yf
+    index = pd.to_datetime(["2026-10-15", "2026-10-16"])
+    columns = pd.MultiIndex.from_product([["MSFT", "AAPL"], ["Close", "Volume"]])
+    frame = pd.DataFrame([[410.0, 1, 230.0, 1], [412.5, 1, None, 1]], index=index, columns=columns)
+    monkeypatch.setattr(yf, "download", lambda *args, **kwargs: frame)
+
+    closes = mds._download_latest_closes(["MSFT", "AAPL", "NVDA"])
+    assert closes == {
+        "MSFT": (412.5, pd.Timestamp("2026-10-16").date()),
+        "AAPL": (230.0, pd.Timestamp("2026-10-15").date()),
+    }
+
+
+def test_fundamentals_refresh_on_their_own_cycle(yahoo):
+    first = mds.fetch_stock_data("MSFT", current_price=410.0)
+    second = mds.fetch_stock_data("MSFT", current_price=420.0)
+
+    assert yahoo.info_calls == ["MSFT"]
+    assert first["current_price"] == 410.0 and second["current_price"] == 420.0
+    assert second["market_cap_billions"] == pytest.approx(400.0 * 420.0 / 400.0)
+    assert second["pe_ratio"] == 30.0
+    assert len(second["description"]) == mds.MAX_DESCRIPTION_LENGTH
+    assert "info_price" not in second
+
+
+def test_without_a_batched_price_info_is_always_fetched(yahoo):
+    mds.fetch_stock_data("MSFT", current_price=410.0)
+    data = mds.fetch_stock_data("MSFT")
+    assert yahoo.info_calls == ["MSFT", "MSFT"]
+    assert data["current_price"] == 400.0
+
+
+def test_expired_fundamentals_are_refetched(yahoo):
+    mds.fetch_stock_data("MSFT", current_price=410.0)
+    fetched_at, fundamentals = mds._fundamentals_cache["MSFT"]
+    mds._fundamentals_cache["MSFT"] = (fetched_at - settings.FUNDAMENTALS_REFRESH_INTERVAL - 1, fundamentals)
+    mds.fetch_stock_data("MSFT", current_price=410.0)
+    assert yahoo.info_calls == ["MSFT", "MSFT"]
+
+
+def test_refresh_upstream_calls_drop_to_one_per_cycle(yahoo, monkeypatch):
+    async def analyze(stock_data):
+        return {"fair_value_estimate": 500.0, "recommendation": "BUY"}
+
+    monkeypatch.setattr(settings, "SPLIT_INGESTION", True)
+    monkeypatch.setattr(lrs, "analyze_stock_with_ai_async", analyze)
+    monkeypatch.setattr(lrs, "fetch_stock_data", mds.fetch_stock_data)
+    monkeypatch.setattr(lrs, "fetch_watchlist_prices", mds.fetch_watchlist_prices)
+    monkeypatch.setattr(lrs, "_last_analysis", {})
+
+    first = asyncio.run(lrs._run_ingestion_pipeline(TICKERS))
+    assert (len(yahoo.downloads), len(yahoo.info_calls)) == (1, len(TICKERS))
+
+    yahoo.closes["MSFT"] = 415.0
+    second = asyncio.run(lrs._run_ingestion_pipeline(TICKERS))
+    assert (len(yahoo.downloads), len(yahoo.info_calls)) == (2, len(TICKERS))
+    assert [rec.current_price for rec in first] == [410.0, 230.0, 130.0]
+    assert [rec.current_price for rec in second] == [415.0, 230.0, 130.0]
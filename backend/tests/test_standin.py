@@ -0,0 +1,172 @@
+"""
+Upstream stand-in: recording cassettes without secrets, replay, fault
+injection, and the app's live code paths pointed at it via the base URL settings.
+"""
+import asyncio
+import json
+import time
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from app.config import settings
+from app.services import data_provider, http_client
+from app.services.data_provider import MarketDataProvider, SECTOR_ETFS
+from app.services.request_scheduler import RequestScheduler
+from benchmarks import standin
+from benchmarks.standin import CassetteStore, Faults, create_app
+
+QUOTE = {"Global Quote": {"01. symbol": "XLK", "05. price": "210.50", "10. change percent": "0.4%"}}
+QUOTE_PARAMS = {"function": "GLOBAL_QUOTE", "symbol": "XLK"}
+
+
+def faults(**settings_) -> dict:
+    return {provider: Faults(**settings_) for provider in standin.PROVIDERS}
+
+
+def stats(client) -> dict:
+    return client.get("/_standin/stats").json()["providers"]
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    """Fake real upstream behind record mode, remembering the requests it got"""
+    seen = []
+    real_client = httpx.AsyncClient
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        if request.url.params.get("symbol") == "THROTTLED":
+            return httpx.Response(200, json={"Note": "API call frequency exceeded"})
+        return httpx.Response(200, json=QUOTE)
+
+    monkeypatch.setattr(standin.httpx, "AsyncClient", lambda **kwargs: real_client(
+        transport=httpx.MockTransport(handler), **kwargs
+    ))
+    return seen
+
+
+def test_record_then_replay_without_secrets(tmp_path, upstream):
+    recorder = TestClient(create_app(CassetteStore(str(tmp_path)), "record", faults()))
+    first = recorder.get("/alphavantage/query", params={**QUOTE_PARAMS, "apikey": "secret-1"})
+    again = recorder.get("/alphavantage/query", params={**QUOTE_PARAMS, "apikey": "secret-2"})
+
+    assert first.json() == again.json() == QUOTE
+    assert len(upstream) == 1
+    assert upstream[0].url.params["apikey"] == "secret-1"  # forwarded to the real upstream
+    assert stats(recorder)["alpha_vantage"] == {
+        "requests": 2, "hits": 1, "misses": 1, "recorded": 1, "injected_429": 0, "injected_timeouts": 0
+    }
+
+    [cassette] = (tmp_path / "alpha_vantage").iterdir()
+    assert "secret" not in cassette.read_text()
+    assert json.loads(cassette.read_text())["key"] == "function=GLOBAL_QUOTE&symbol=XLK"
+
+    replay = TestClient(create_app(CassetteStore(str(tmp_path)), "replay", faults()))
+    assert replay.get("/alphavantage/query", params={**QUOTE_PARAMS, "apikey": "other"}).json() == QUOTE
+    assert len(upstream) == 1
+
+
+def test_throttled_responses_are_not_recorded(tmp_path, upstream):
+    recorder = TestClient(create_app(CassetteStore(str(tmp_path)), "record", faults()))
+    response = recorder.get("/alphavantage/query", params={"function": "GLOBAL_QUOTE", "symbol": "THROTTLED"})
+    assert "Note" in response.json()
+    assert stats(recorder)["alpha_vantage"]["recorded"] == 0
+    assert not (tmp_path / "alpha_vantage").exists()
+
+
+def test_replay_miss_is_a_404_or_a_fake(tmp_path):
+    strict = TestClient(create_app(CassetteStore(str(tmp_path)), "replay", faults()))
+    assert strict.get("/alphavantage/query", params=QUOTE_PARAMS).status_code == 404
+
+    lenient = TestClient(create_app(CassetteStore(str(tmp_path)), "replay", faults(), on_miss="fake"))
+    assert lenient.get("/alphavantage/query", params=QUOTE_PARAMS).json()["Global Quote"]["01. symbol"] == "XLK"
+    completion = lenient.post("/openai/v1/chat/completions", json={
+        "model": "gpt-4o", "messages": [{"role": "user", "content": "Analyze MSFT"}]
+    }).json()
+    assert completion["object"] == "chat.completion"
+    assert json.loads(completion["choices"][0]["message"]["content"])
+    assert list(tmp_path.iterdir()) == []  # fakes are never recorded
+
+
+def test_injected_429s_and_timeouts(tmp_path):
+    cassettes = CassetteStore(str(tmp_path))
+    cassettes.put(standin.ALPHA_VANTAGE, "function=GLOBAL_QUOTE&symbol=XLK", QUOTE, 120.0)
+
+    throttling = TestClient(create_app(cassettes, "replay", faults(error_rate=1.0)))
+    response = throttling.get("/alphavantage/query", params=QUOTE_PARAMS)
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "1"
+
+    timing_out = TestClient(create_app(cassettes, "replay", faults(timeout_rate=1.0, timeout_seconds=0.05)))
+    assert timing_out.get("/alphavantage/query", params=QUOTE_PARAMS).status_code == 504
+    assert stats(timing_out)["alpha_vantage"]["injected_timeouts"] == 1
+
+
+def test_latency_including_recorded_upstream_time(tmp_path):
+    cassettes = CassetteStore(str(tmp_path))
+    cassettes.put(standin.ALPHA_VANTAGE, "function=GLOBAL_QUOTE&symbol=XLK", QUOTE, 100.0)
+    client = TestClient(create_app(cassettes, "replay", faults(latency_ms=50, recorded_latency=True)))
+
+    started = time.perf_counter()
+    assert client.get("/alphavantage/query", params=QUOTE_PARAMS).status_code == 200
+    assert time.perf_counter() - started >= 0.15
+
+
+def test_faults_can_be_changed_per_provider_at_runtime(tmp_path):
+    client = TestClient(create_app(CassetteStore(str(tmp_path)), "replay", faults()))
+    updated = client.put("/_standin/faults", json={"*": {"latency_ms": 5}, "openai": {"error_rate": 0.5}}).json()
+
+    assert updated["fred"]["latency_ms"] == 5 and updated["fred"]["error_rate"] == 0.0
+    assert updated["openai"]["latency_ms"] == 5 and updated["openai"]["error_rate"] == 0.5
+    assert client.put("/_standin/faults", json={"nasdaq": {}}).status_code == 400
+    assert client.put("/_standin/faults", json={"fred": {"packet_loss": 1}}).status_code == 400
+    assert client.get("/_standin/faults").json() == updated
+
+
+@pytest.fixture
+def live_provider(tmp_path, monkeypatch):
+    """MarketDataProvider in live mode, its base URLs pointed at an in-process stand-in"""
+    app = create_app(CassetteStore(str(tmp_path)), "replay", faults(), on_miss="fake")
+    monkeypatch.setattr(settings, "ALPHA_VANTAGE_API_KEY", "key")
+    monkeypatch.setattr(settings, "FRED_API_KEY", "key")
+    monkeypatch.setattr(settings, "ALPHA_VANTAGE_BASE_URL", "http://standin/alphavantage")
+    monkeypatch.setattr(settings, "FRED_BASE_URL", "http://standin/fred")
+    monkeypatch.setattr(settings, "ALPHA_VANTAGE_CALLS_PER_MINUTE", 100_000)
+    monkeypatch.setattr(settings, "FRED_CALLS_PER_MINUTE", 100_000)
+    monkeypatch.setattr(settings, "UPSTREAM_MAX_RETRIES", 1)
+    monkeypatch.setattr(settings, "MARKET_DATA_PERSISTENCE", False)
+    monkeypatch.setattr(data_provider, "request_scheduler", RequestScheduler())
+    monkeypatch.setattr(http_client, "_connection_stats", {})
+    monkeypatch.setattr(http_client, "_client", None)
+    return app
+
+
+def run_with_standin(app, call):
+    async def scenario():
+        await http_client.init_http_client(transport=httpx.ASGITransport(app=app))
+        try:
+            return await call(MarketDataProvider())
+        finally:
+            await http_client.close_http_client()
+    return asyncio.run(scenario())
+
+
+def test_live_paths_go_through_the_configured_base_urls(live_provider):
+    sectors = run_with_standin(live_provider, lambda provider: provider.get_sector_performance())
+    indicators = run_with_standin(live_provider, lambda provider: provider.get_economic_indicators())
+
+    assert sorted(sectors) == sorted(SECTOR_ETFS)
+    assert sectors["XLK"]["01. symbol"] == "XLK"
+    assert set(indicators) == {"gdp", "cpi", "unemployment", "fed_funds"}
+    usage = TestClient(live_provider).get("/_standin/stats").json()["providers"]
+    assert usage["alpha_vantage"]["requests"] == len(SECTOR_ETFS)
+    assert usage["fred"]["requests"] == 4
+
+
+def test_injected_throttling_is_retried_then_given_up(live_provider):
+    TestClient(live_provider).put("/_standin/faults", json={"alpha_vantage": {"error_rate": 1.0}})
+    sectors = run_with_standin(live_provider, lambda provider: provider.get_sector_performance())
+
+    assert sectors == MarketDataProvider()._get_demo_sector_performance()
+    usage = TestClient(live_provider).get("/_standin/stats").json()["providers"]["alpha_vantage"]
+    assert usage["injected_429"] == len(SECTOR_ETFS) * (settings.UPSTREAM_MAX_RETRIES + 1)
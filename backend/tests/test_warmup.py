@@ -0,0 +1,68 @@
+"""
+Startup warmup: which paths are requested, and skipping live-data routes
+while an on-demand recommendations refresh is due.
+"""
+import asyncio
+import pytest
+from fastapi import FastAPI, Request
+from app.config import settings
+from app.services import warmup
+from app.services import live_recommendations_service as lrs
+
+PATHS = [
+    "/api/dashboard",
+    "/api/recommendations",
+    "/api/recommendations?limit=50",
+    "/api/recommendations/screaming-buys",
+    "/api/sectors",
+    "/api/macro",
+    "/api/portfolio/allocation",
+    "/api/portfolio/recommendations",
+]
+
+
+@pytest.fixture
+def requested(monkeypatch):
+    """Runs the warmup against a stand-in app; returns the paths it requested"""
+    monkeypatch.setattr(settings, "STARTUP_WARMUP_ENABLED", True)
+    monkeypatch.setattr(settings, "STARTUP_WARMUP_PATHS", PATHS)
+    paths = []
+    app = FastAPI()
+
+    @app.get("/{path:path}")
+    async def record(request: Request):
+        paths.append(str(request.url.path) + (f"?{request.url.query}" if request.url.query else ""))
+        return {}
+
+    def run(due: bool):
+        monkeypatch.setattr(lrs, "needs_refresh", lambda: due)
+        asyncio.run(warmup.run_warmup(app))
+        return paths
+
+    return run
+
+
+def test_all_paths_are_warmed_when_no_refresh_is_due(requested):
+    assert requested(False) == PATHS
+
+
+def test_live_paths_are_skipped_while_a_refresh_is_due(requested):
+    assert requested(True) == ["/api/macro", "/api/portfolio/allocation"]
+
+
+@pytest.mark.parametrize("path, live", [
+    ("/api/recommendations", True),
+    ("/api/recommendations/", True),
+    ("/api/recommendations?limit=50", True),
+    ("/api/recommendations/MSFT", True),
+    ("/api/recommendationsx", False),
+    ("/api/portfolio/allocation", False),
+    ("/api/macro/cycle", False),
+])
+def test_live_path_matching(path, live):
+    assert warmup._is_live_path(path) is live
+
+
+def test_disabled_warmup_requests_nothing(requested, monkeypatch):
+    monkeypatch.setattr(settings, "STARTUP_WARMUP_ENABLED", False)
+    assert requested(False) == []